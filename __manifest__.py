@@ -24,9 +24,22 @@
     'depends': ['base', 'web'],
     'data': [
         'security/ir.model.access.csv',
+        'data/price_band_data.xml',
         'data/material_data.xml',
+        'data/stock_data.xml',
+        'data/outbox_data.xml',
+        'data/catalog_data.xml',
+        'data/audit_data.xml',
+        'data/integrity_data.xml',
         'views/supplier_views.xml',
         'views/material_views.xml',
+        'views/price_band_views.xml',
+        'views/currency_rate_views.xml',
+        'views/stock_views.xml',
+        'views/webhook_views.xml',
+        'views/audit_views.xml',
+        'views/profile_views.xml',
+        'views/integrity_views.xml',
         'views/menu_views.xml',
     ],
     'demo': [
@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+
+import argparse
+import bisect
+import itertools
+import logging
+import math
+import random
+import time
+
+import odoo
+from odoo import api, SUPERUSER_ID
+from odoo.cli import Command
+from odoo.tools import config
+
+from ..models.material import equivalence_key
+
+_logger = logging.getLogger(__name__)
+
+MATERIAL_TYPES = ('fabric', 'jeans', 'cotton')
+
+
+class _IteratorFile(object):
+    """Read-only file object over an iterator of text lines, for COPY ... FROM STDIN.
+
+    Rows are generated lazily, so memory use does not grow with the dataset.
+    """
+
+    def __init__(self, lines):
+        self._lines = lines
+        self._buffer = ''
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buffer) < size:
+            chunk = ''.join(itertools.islice(self._lines, 1000))
+            if not chunk:
+                break
+            self._buffer += chunk
+        if size < 0:
+            data, self._buffer = self._buffer, ''
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+def _copy_text(value):
+    """Escape a value for PostgreSQL COPY text format."""
+    if value is None or value is False:
+        return '\\N'
+    return str(value).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+
+def parse_weights(spec, keys):
+    """Parse "a=3,b=1" into weights aligned with ``keys`` (missing keys weigh 0)."""
+    weights = dict.fromkeys(keys, 0.0)
+    for item in spec.split(','):
+        key, _sep, weight = item.partition('=')
+        if key.strip() not in weights:
+            raise ValueError(f'Unknown key "{key.strip()}", expected one of: {", ".join(keys)}')
+        weights[key.strip()] = float(weight or 1)
+    if not any(weights.values()):
+        raise ValueError('At least one weight must be positive')
+    return [weights[k] for k in keys]
+
+
+def price_sampler(spec, rng, minimum=100.0):
+    """Return a function drawing buy prices according to ``spec``.
+
+    ``uniform:LOW:HIGH`` or ``lognormal:MU:SIGMA``; prices are clamped to
+    ``minimum`` so that generated rows satisfy the model constraint.
+    """
+    kind, *params = spec.split(':')
+    params = [float(p) for p in params]
+    if kind == 'uniform':
+        low, high = params if params else (minimum, 2000.0)
+        draw = lambda: rng.uniform(low, high)
+    elif kind == 'lognormal':
+        mu, sigma = params if params else (6.0, 0.8)
+        draw = lambda: rng.lognormvariate(mu, sigma)
+    else:
+        raise ValueError('price distribution must be uniform:LOW:HIGH or lognormal:MU:SIGMA')
+    return lambda: round(max(minimum, draw()), 2)
+
+
+def supplier_sampler(count, spec, rng):
+    """Return a function drawing a supplier index in [0, count).
+
+    ``uniform`` spreads materials evenly; ``zipf:S`` gives a few suppliers
+    most of the materials, like real catalogs.
+    """
+    kind, *params = spec.split(':')
+    if kind == 'uniform':
+        return lambda: rng.randrange(count)
+    if kind == 'zipf':
+        exponent = float(params[0]) if params else 1.1
+        cumulative = list(itertools.accumulate(1.0 / math.pow(rank, exponent) for rank in range(1, count + 1)))
+        total = cumulative[-1]
+        return lambda: bisect.bisect_left(cumulative, rng.random() * total)
+    raise ValueError('materials per supplier must be uniform or zipf:S')
+
+
+def seed_dataset(env, suppliers, materials, prefix='SEED', type_weights='fabric=1,jeans=1,cotton=1',
+                 price_distribution='uniform:100:2000', per_supplier='uniform', seed=None):
+    """Bulk-load ``suppliers`` suppliers and ``materials`` materials with COPY.
+
+    Stored derived values are filled without going through the ORM:
+    ``supplier_name``, ``currency_id`` (all suppliers quote in the base
+    currency), ``price_band_id`` (which backs ``price_category``) and
+    ``equivalence_key`` are computed while the rows are streamed, so each
+    row is written once.
+    ``material_count`` and the supplier price aggregates are then filled by
+    one set-based UPDATE. Returns a dict of counts and timings.
+    """
+    rng = random.Random(seed)
+    cr = env.cr
+    like_prefix = prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    cr.execute("SELECT 1 FROM material_registration WHERE material_code LIKE %s LIMIT 1", (like_prefix + '-%',))
+    if cr.fetchone():
+        raise ValueError(f'Materials with prefix "{prefix}" already exist, choose another prefix')
+    # Seeded suppliers are found back by name, so existing ones would be mixed in
+    cr.execute("SELECT 1 FROM material_supplier WHERE name LIKE %s LIMIT 1", (like_prefix + ' Supplier %',))
+    if cr.fetchone():
+        raise ValueError(f'Suppliers with prefix "{prefix}" already exist, choose another prefix')
+    started = time.monotonic()
+    env['base'].flush()
+    cr.execute("SELECT (now() at time zone 'UTC')")
+    now = cr.fetchone()[0]
+    uid = env.uid
+    currency_id = env['material.currency.rate']._get_base_currency().id
+
+    # Suppliers
+    supplier_names = [f'{prefix} Supplier {i:07d}' for i in range(suppliers)]
+    lines = (
+        '\t'.join(map(_copy_text, (
+            name, f'contact{i}@{prefix.lower()}.example.com', f'+1-555-{i % 10000:04d}',
+            f'{i} Seed Street', currency_id, 0, uid, now, uid, now,
+        ))) + '\n'
+        for i, name in enumerate(supplier_names)
+    )
+    cr.copy_expert(
+        "COPY material_supplier (name, email, phone, address, currency_id, material_count, "
+        "create_uid, create_date, write_uid, write_date) FROM STDIN",
+        _IteratorFile(lines)
+    )
+    cr.execute(
+        "SELECT id, name FROM material_supplier WHERE name LIKE %s ORDER BY id DESC LIMIT %s",
+        (like_prefix + ' Supplier %', suppliers)
+    )
+    supplier_rows = sorted(cr.fetchall())
+    supplier_copied = time.monotonic()
+
+    # Materials
+    Band = env['material.price.band']
+    band_table = Band._get_band_table()
+
+    def band_for(price):
+        for min_price, band_id in band_table:
+            if price >= min_price:
+                return band_id
+        return None
+
+    type_cum_weights = list(itertools.accumulate(parse_weights(type_weights, MATERIAL_TYPES)))
+    pick_type = lambda: rng.choices(MATERIAL_TYPES, cum_weights=type_cum_weights)[0]
+    pick_price = price_sampler(price_distribution, rng)
+    pick_supplier = supplier_sampler(len(supplier_rows), per_supplier, rng) if supplier_rows else None
+
+    def material_lines():
+        for i in range(materials):
+            supplier_id, supplier_name = supplier_rows[pick_supplier()]
+            material_type = pick_type()
+            material_name = f'{material_type.title()} Material {i}'
+            price = pick_price()
+            yield '\t'.join(map(_copy_text, (
+                f'{prefix}-{i:08d}', material_name, material_type, price, supplier_id, supplier_name,
+                currency_id, band_for(price), equivalence_key(material_name, material_type), 't',
+                uid, now, uid, now,
+            ))) + '\n'
+
+    if materials and supplier_rows:
+        cr.copy_expert(
+            "COPY material_registration (material_code, material_name, material_type, material_buy_price, "
+            "supplier_id, supplier_name, currency_id, price_band_id, equivalence_key, active, "
+            "create_uid, create_date, write_uid, write_date) "
+            "FROM STDIN",
+            _IteratorFile(material_lines())
+        )
+    materials_copied = time.monotonic()
+
+    # Set-based derived values
+    env['material.supplier']._rebuild_price_aggregates()
+    env['base'].invalidate_cache()
+    cr.execute("ANALYZE material_supplier")
+    cr.execute("ANALYZE material_registration")
+    finished = time.monotonic()
+
+    return {
+        'suppliers': len(supplier_rows),
+        'materials': materials if supplier_rows else 0,
+        'supplier_copy_s': round(supplier_copied - started, 3),
+        'material_copy_s': round(materials_copied - supplier_copied, 3),
+        'derived_s': round(finished - materials_copied, 3),
+        'total_s': round(finished - started, 3),
+    }
+
+
+class MaterialSeed(Command):
+    """Bulk-load suppliers and materials for demo and performance datasets"""
+
+    def run(self, cmdargs):
+        parser = argparse.ArgumentParser(
+            prog='odoo-bin materialseed',
+            description=self.__doc__,
+            epilog='Other options (e.g. -c, --db_host) are passed to the Odoo configuration.'
+        )
+        parser.add_argument('-d', '--database', required=True, help='Database to load into')
+        parser.add_argument('--suppliers', type=int, default=1000, help='Number of suppliers (default: 1000)')
+        parser.add_argument('--materials', type=int, default=100000, help='Number of materials (default: 100000)')
+        parser.add_argument('--prefix', default='SEED', help='Prefix for generated codes and names')
+        parser.add_argument('--types', default='fabric=1,jeans=1,cotton=1',
+                            help='Material type weights (default: fabric=1,jeans=1,cotton=1)')
+        parser.add_argument('--prices', default='uniform:100:2000',
+                            help='Price distribution: uniform:LOW:HIGH or lognormal:MU:SIGMA')
+        parser.add_argument('--per-supplier', default='uniform',
+                            help='Materials per supplier distribution: uniform or zipf:S')
+        parser.add_argument('--seed', type=int, help='Random seed for a reproducible dataset')
+        opts, odoo_args = parser.parse_known_args(cmdargs)
+        config.parse_config(odoo_args + ['-d', opts.database])
+
+        registry = odoo.registry(opts.database)
+        with api.Environment.manage(), registry.cursor() as cr:
+            env = api.Environment(cr, SUPERUSER_ID, {})
+            result = seed_dataset(
+                env, opts.suppliers, opts.materials, prefix=opts.prefix, type_weights=opts.types,
+                price_distribution=opts.prices, per_supplier=opts.per_supplier, seed=opts.seed,
+            )
+        _logger.info(
+            "Seeded %(suppliers)d suppliers and %(materials)d materials in %(total_s)ss "
+            "(suppliers %(supplier_copy_s)ss, materials %(material_copy_s)ss, derived values %(derived_s)ss)",
+            result
+        )
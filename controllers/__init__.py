@@ -1,4 +1,10 @@
 # -*- coding: utf-8 -*-
 
 from . import material_controller
-from . import supplier_controller 
\ No newline at end of file
+from . import supplier_controller
+from . import batch_controller
+from . import openapi_controller
+from . import stock_controller
+from . import stream_controller
+from . import profile_controller
+from . import integrity_controller
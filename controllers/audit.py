@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+
+import atexit
+import collections
+import datetime
+import functools
+import json
+import logging
+import os
+import threading
+import time
+
+from odoo.http import request
+from odoo.sql_db import db_connect
+from odoo.tools import config
+
+from ..models.audit import insert_audit_entries
+from .common import json_body
+
+_logger = logging.getLogger(__name__)
+
+# Defaults of the material_audit_* options of the Odoo config file
+DEFAULT_BUFFER_SIZE = 10000
+DEFAULT_FLUSH_SIZE = 500
+DEFAULT_FLUSH_INTERVAL = 5.0
+DEFAULT_DROP_POLICY = 'drop_oldest'
+DROP_POLICIES = ('drop_oldest', 'drop_newest', 'block')
+
+# Longest serialized parameters kept per entry
+MAX_PARAMS_LENGTH = 2000
+
+
+def _option(name, default, cast):
+    try:
+        return cast(config.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def audit_settings():
+    """Buffering options, read from the Odoo config file:
+
+        [options]
+        material_audit_buffer_size = 10000
+        material_audit_flush_size = 500
+        material_audit_flush_interval = 5
+        material_audit_drop_policy = drop_oldest
+
+    When the buffer is full, ``drop_oldest`` discards the oldest buffered
+    entry, ``drop_newest`` discards the new one, and ``block`` makes the
+    request write the buffer itself before going on.
+    """
+    policy = config.get('material_audit_drop_policy') or DEFAULT_DROP_POLICY
+    return {
+        'buffer_size': max(1, _option('material_audit_buffer_size', DEFAULT_BUFFER_SIZE, int)),
+        'flush_size': max(1, _option('material_audit_flush_size', DEFAULT_FLUSH_SIZE, int)),
+        'flush_interval': max(0.1, _option('material_audit_flush_interval', DEFAULT_FLUSH_INTERVAL, float)),
+        'drop_policy': policy if policy in DROP_POLICIES else DEFAULT_DROP_POLICY,
+    }
+
+
+class AuditBuffer(object):
+    """Bounded per-process buffer of audit entries, written in bulk by a background thread.
+
+    The thread wakes up every ``flush_interval`` seconds, or as soon as
+    ``flush_size`` entries are waiting, and writes each database's entries
+    with one INSERT on its own connection. It is started lazily, so worker
+    processes forked by the prefork server each get their own.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = collections.deque()
+        self._wakeup = threading.Event()
+        self._pid = None
+        self.dropped = 0
+
+    def add(self, dbname, entry):
+        settings = audit_settings()
+        overflow = None
+        with self._lock:
+            self._ensure_flusher()
+            if len(self._entries) >= settings['buffer_size']:
+                if settings['drop_policy'] == 'drop_newest':
+                    self._count_dropped(1)
+                    return
+                if settings['drop_policy'] == 'drop_oldest':
+                    self._entries.popleft()
+                    self._count_dropped(1)
+                else:
+                    overflow = self._take()
+            self._entries.append((dbname, entry))
+            if len(self._entries) >= settings['flush_size']:
+                self._wakeup.set()
+        if overflow:
+            self._write(overflow)
+
+    def flush(self):
+        """Write every buffered entry now."""
+        with self._lock:
+            entries = self._take()
+        self._write(entries)
+
+    def _count_dropped(self, count):
+        self.dropped += count
+        # Log the first drop, then every thousandth, not every request
+        if self.dropped == count or self.dropped // 1000 != (self.dropped - count) // 1000:
+            _logger.warning("API audit buffer full, %d entries dropped so far", self.dropped)
+
+    def _take(self):
+        entries, self._entries = list(self._entries), collections.deque()
+        return entries
+
+    def _ensure_flusher(self):
+        if self._pid == os.getpid():
+            return
+        # First entry in this process: forked workers do not inherit threads
+        self._pid = os.getpid()
+        self._entries = collections.deque()
+        threading.Thread(target=self._run, name='material.audit.flusher', daemon=True).start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(audit_settings()['flush_interval'])
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                _logger.error(f"API audit flush failed: {str(e)}")
+
+    def _write(self, entries):
+        by_db = collections.defaultdict(list)
+        for dbname, entry in entries:
+            by_db[dbname].append(entry)
+        for dbname, db_entries in by_db.items():
+            try:
+                with db_connect(dbname).cursor() as cr:
+                    insert_audit_entries(cr, db_entries)
+            except Exception as e:
+                _logger.error(f"Could not write {len(db_entries)} API audit entries to {dbname}: {str(e)}")
+
+
+audit_buffer = AuditBuffer()
+atexit.register(audit_buffer.flush)
+
+
+def _request_params(kwargs):
+    params = dict(kwargs)
+    body = getattr(request, 'jsonrequest', None)
+    if body is None and request.httprequest.mimetype == 'application/json':
+        try:
+            body = json_body()
+        except ValueError:
+            body = request.httprequest.get_data(as_text=True)
+    if body is not None:
+        params['body'] = body
+    text = json.dumps(params, default=str)
+    return text if len(text) <= MAX_PARAMS_LENGTH else text[:MAX_PARAMS_LENGTH] + '...'
+
+
+def audited(func):
+    """Route decorator: record who called the endpoint, with which parameters and outcome.
+
+    Must be placed directly below ``@http.route``. Entries are buffered and
+    written in bulk; under test, they are written at once on the request
+    cursor so that they roll back with the test.
+    """
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        started = time.monotonic()
+        status = 500
+        try:
+            response = func(self, *args, **kwargs)
+            status = getattr(response, 'status_code', 200)
+            return response
+        finally:
+            try:
+                entry = {
+                    'date': datetime.datetime.utcnow(),
+                    'user_id': request.uid,
+                    'login': request.session.login,
+                    'method': request.httprequest.method,
+                    'path': request.httprequest.path,
+                    'params': _request_params(kwargs),
+                    'status': status,
+                    'duration_ms': round((time.monotonic() - started) * 1000, 1),
+                    'remote_addr': request.httprequest.remote_addr,
+                }
+                if request.registry.in_test_mode():
+                    insert_audit_entries(request.env.cr, [entry])
+                else:
+                    audit_buffer.add(request.db, entry)
+            except Exception as e:
+                _logger.error(f"Could not record API audit entry: {str(e)}")
+    return wrapper
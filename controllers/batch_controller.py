@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+
+import logging
+from odoo import http, _
+from odoo.http import request
+from odoo.exceptions import ValidationError
+
+from .common import json_body, json_response
+from .replica import primary_write
+from .schemas import SCHEMAS
+
+_logger = logging.getLogger(__name__)
+
+# Models and methods that can be used in a batch
+BATCH_MODELS = ('material.registration', 'material.supplier')
+BATCH_METHODS = ('create', 'write', 'unlink')
+
+# Upper bound on the number of operations in a single batch
+MAX_BATCH_OPERATIONS = 500
+
+
+class BatchController(http.Controller):
+    """REST API Controller running several operations in one transaction."""
+
+    @http.route('/api/batch', type='http', auth='user', methods=['POST'], csrf=False)
+    @primary_write
+    def batch(self, **kwargs):
+        """
+        POST /api/batch - Run an ordered list of operations in one transaction
+
+        Request Body (JSON):
+        {
+            "operations": [
+                {"ref": "sup", "model": "material.supplier", "method": "create",
+                 "values": {"name": "ABC Textiles"}},
+                {"model": "material.registration", "method": "create",
+                 "values": {"material_code": "FAB001", ..., "supplier_id": "$sup"}},
+                {"model": "material.registration", "method": "write", "id": 7,
+                 "values": {"material_buy_price": 250.0}},
+                {"model": "material.supplier", "method": "unlink", "id": 3}
+            ]
+        }
+
+        A value or "id" of the form "$<ref>" is replaced by the ID of the record
+        created by the earlier operation carrying that "ref". If any operation
+        fails, the whole batch is rolled back.
+        """
+        index = None
+        try:
+            body = json_body()
+            operations = body.get('operations') if isinstance(body, dict) else None
+            if not isinstance(operations, list) or not operations:
+                raise ValidationError('Field "operations" must be a non-empty list')
+            if len(operations) > MAX_BATCH_OPERATIONS:
+                raise ValidationError(f'At most {MAX_BATCH_OPERATIONS} operations are allowed per batch')
+
+            refs = {}
+            results = []
+            with request.env.cr.savepoint():
+                for index, operation in enumerate(operations):
+                    results.append(self._run_operation(operation, refs))
+            index = None
+
+            response_data = {
+                'success': True,
+                'data': results,
+                'message': f'Executed {len(results)} operations successfully'
+            }
+
+            return json_response(response_data)
+
+        except (ValueError, ValidationError) as e:
+            _logger.warning(f"Validation error in batch operation {index}: {str(e)}")
+            return json_response(
+                {'success': False, 'error': str(e), 'error_type': 'validation', 'operation_index': index}, 400)
+        except Exception as e:
+            _logger.error(f"Error in batch operation {index}: {str(e)}")
+            return json_response(
+                {'success': False, 'error': str(e), 'error_type': 'server', 'operation_index': index}, 500)
+
+    def _run_operation(self, operation, refs):
+        """Execute one batch operation and return its result entry."""
+        if not isinstance(operation, dict):
+            raise ValidationError('Each operation must be an object')
+        model_name = operation.get('model')
+        method = operation.get('method')
+        if model_name not in BATCH_MODELS:
+            raise ValidationError(f'model must be one of: {", ".join(BATCH_MODELS)}')
+        if method not in BATCH_METHODS:
+            raise ValidationError(f'method must be one of: {", ".join(BATCH_METHODS)}')
+
+        Model = request.env[model_name]
+        values = self._resolve_refs(operation.get('values') or {}, refs)
+        if method in SCHEMAS[model_name]:
+            values = SCHEMAS[model_name][method].validate(values)
+        result = {'model': model_name, 'method': method}
+
+        if method == 'create':
+            record = Model.create(values)
+            if operation.get('ref'):
+                refs[operation['ref']] = record.id
+                result['ref'] = operation['ref']
+        else:
+            record_id = self._resolve_ref(operation.get('id'), refs)
+            if not isinstance(record_id, int):
+                raise ValidationError(f'Field "id" is required for {method}')
+            record = Model.browse(record_id).exists()
+            if not record:
+                raise ValidationError(f'Record {model_name} with ID {record_id} not found')
+            if method == 'write':
+                record.write(values)
+            else:
+                record.unlink()
+
+        result['id'] = record.id
+        return result
+
+    def _resolve_refs(self, values, refs):
+        """Replace "$<ref>" placeholders in ``values`` with created record IDs."""
+        if not isinstance(values, dict):
+            raise ValidationError('Field "values" must be an object')
+        return {key: self._resolve_ref(value, refs) for key, value in values.items()}
+
+    def _resolve_ref(self, value, refs):
+        if isinstance(value, str) and value.startswith('$'):
+            if value[1:] not in refs:
+                raise ValidationError(f'Unknown reference "{value}"')
+            return refs[value[1:]]
+        return value
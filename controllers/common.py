@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""Helpers shared by the REST API controllers."""
+
+import json
+
+from odoo.http import request
+
+# Upper bound on the number of IDs accepted by a single multi-record request
+MAX_IDS_PER_REQUEST = 1000
+
+
+def parse_ids(ids_param, limit=MAX_IDS_PER_REQUEST, name='ids'):
+    """Parse a comma-separated ID list, dropping duplicates but keeping order.
+
+    Raises ValueError on a malformed list or one longer than ``limit``.
+    """
+    try:
+        ids = [int(i) for i in ids_param.split(',') if i.strip()]
+    except ValueError:
+        raise ValueError(f'{name} must be a comma-separated list of integers')
+    if limit and len(ids) > limit:
+        raise ValueError(f'At most {limit} {name} can be requested at once')
+    return list(dict.fromkeys(ids))
+
+
+def json_body():
+    """Return the decoded JSON body of a ``type='http'`` request ({} when empty).
+
+    Routes that answer with their own status codes are declared
+    ``type='http'``: a ``type='json'`` route wraps whatever it returns in a
+    JSON-RPC envelope sent with status 200.
+    """
+    data = request.httprequest.get_data(as_text=True)
+    if not data:
+        return {}
+    try:
+        return json.loads(data)
+    except ValueError:
+        raise ValueError('Request body must be valid JSON')
+
+
+def json_response(data, status_code=200):
+    """Return ``data`` serialized as a JSON response."""
+    response = request.make_response(json.dumps(data), headers=[('Content-Type', 'application/json')])
+    response.status_code = status_code
+    return response
+
+
+def error_response(message, status_code=400):
+    """Return the JSON error body used by every endpoint."""
+    return json_response({'success': False, 'error': message}, status_code)
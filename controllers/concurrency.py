@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+
+from werkzeug.http import parse_date, quote_etag, unquote_etag
+
+
+def etag_for(record):
+    """Return the ETag header value for a record, based on its version."""
+    version = record.get_version()
+    return quote_etag(version) if version else None
+
+
+def parse_preconditions(headers):
+    """Extract the version from If-Match and the date from If-Unmodified-Since.
+
+    Returns ``(version, unmodified_since)``; either may be None. A date is
+    returned as a naive UTC datetime, like Odoo's write_date.
+    """
+    version = None
+    if_match = headers.get('If-Match')
+    if if_match and if_match.strip() != '*':
+        version, _weak = unquote_etag(if_match.split(',')[0].strip())
+    unmodified_since = parse_date(headers.get('If-Unmodified-Since'))
+    if unmodified_since is not None and unmodified_since.tzinfo is not None:
+        unmodified_since = unmodified_since.replace(tzinfo=None) - unmodified_since.utcoffset()
+    return version, unmodified_since
+
+
+def wants_minimal(headers):
+    """Return True if the client sent ``Prefer: return=minimal``."""
+    return 'return=minimal' in (headers.get('Prefer') or '').replace(' ', '')
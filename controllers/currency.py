@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+
+
+def requested_currency(env, params):
+    """Return the res.currency named by the ``currency`` query parameter, or None.
+
+    Raises a ValidationError for an unknown code.
+    """
+    if not params.get('currency'):
+        return None
+    return env['material.currency.rate']._get_currency(params['currency'])
+
+
+def convert_page(env, items, currency_ids, price_keys, to_currency):
+    """Convert ``price_keys`` of every item to ``to_currency`` in place.
+
+    ``currency_ids`` gives the currency each item is quoted in. The whole
+    page is converted with one rate lookup, and each item's ``currency`` is
+    set to the target currency.
+    """
+    amounts = [item[key] for item in items for key in price_keys]
+    item_currency_ids = [currency_id for currency_id in currency_ids for _key in price_keys]
+    converted = iter(env['material.currency.rate']._convert_amounts(amounts, item_currency_ids, to_currency))
+    for item in items:
+        for key in price_keys:
+            item[key] = next(converted)
+        item['currency'] = to_currency.name
+    return items
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+
+import logging
+from odoo import http
+from odoo.http import request
+
+from ..models.integrity import REPAIR_CHUNK_SIZE
+from .common import error_response, json_response
+
+_logger = logging.getLogger(__name__)
+
+# Bounds of the parameters of POST /api/integrity/repair
+MAX_CHUNK_SIZE = 50000
+MAX_TIME_BUDGET = 60
+
+
+class IntegrityController(http.Controller):
+    """Repair of the stored denormalized material and supplier fields, for administrators."""
+
+    @http.route('/api/integrity', type='http', auth='user', methods=['GET'], csrf=False)
+    def get_integrity_run(self, **kwargs):
+        """
+        GET /api/integrity - Progress and report of the latest repair run
+        """
+        try:
+            if not request.env.user._is_system():
+                return error_response('Only administrators can repair stored fields', 403)
+            run = request.env['material.integrity.run'].search([], limit=1)
+            if not run:
+                return error_response('No repair run yet', 404)
+            return json_response({'success': True, 'data': run._get_api_data()})
+        except Exception as e:
+            _logger.error(f"Error reading integrity run: {str(e)}")
+            return error_response(str(e), 500)
+
+    @http.route('/api/integrity/repair', type='http', auth='user', methods=['POST'], csrf=False)
+    def repair(self, **kwargs):
+        """
+        POST /api/integrity/repair - Continue (or start) the repair of stored fields
+
+        Checks supplier_name and price_band_id of materials and material_count
+        of suppliers, fixing inconsistent rows chunk by chunk. Each chunk is
+        committed, so a call cut short loses nothing; call again until the
+        state is "done".
+
+        Query Parameters:
+        - restart: 1 to abandon the unfinished run and start a new pass
+        - chunk_size: Rows compared per statement (default: 5000)
+        - time_budget: Seconds to spend before answering (default and maximum: 60)
+        """
+        try:
+            if not request.env.user._is_system():
+                return error_response('Only administrators can repair stored fields', 403)
+            try:
+                chunk_size = int(kwargs.get('chunk_size', REPAIR_CHUNK_SIZE))
+                time_budget = float(kwargs.get('time_budget', MAX_TIME_BUDGET))
+            except ValueError:
+                return error_response('chunk_size and time_budget must be numbers', 400)
+            if not 1 <= chunk_size <= MAX_CHUNK_SIZE:
+                return error_response(f'chunk_size must be between 1 and {MAX_CHUNK_SIZE}', 400)
+            time_budget = min(max(time_budget, 0), MAX_TIME_BUDGET)
+
+            # Runs are only ever written by the repair itself, like the cron does
+            Run = request.env['material.integrity.run'].sudo()
+            run = Run._get_or_start(restart=kwargs.get('restart') in ('1', 'true'))
+            run._run(chunk_size, time_budget, auto_commit=not request.registry.in_test_mode())
+            return json_response({'success': True, 'data': run._get_api_data()})
+        except Exception as e:
+            _logger.error(f"Error repairing stored fields: {str(e)}")
+            return error_response(str(e), 500)
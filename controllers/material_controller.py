@@ -6,6 +6,15 @@ from odoo import http, _
 from odoo.http import request
 from odoo.exceptions import ValidationError, AccessError
 
+from ..models.material import equivalence_key
+from .audit import audited
+from .common import MAX_IDS_PER_REQUEST, error_response, json_body, json_response, parse_ids
+from .concurrency import etag_for, parse_preconditions, wants_minimal
+from .currency import convert_page, requested_currency
+from .profiling import profiled
+from .replica import replica_read, primary_write
+from .schemas import MATERIAL_CREATE, MATERIAL_UPDATE
+
 _logger = logging.getLogger(__name__)
 
 
@@ -13,28 +22,45 @@ class MaterialController(http.Controller):
     """REST API Controller for Material CRUD operations."""
 
     @http.route('/api/materials', type='http', auth='user', methods=['GET'], csrf=False)
+    @audited
+    @profiled
+    @replica_read
     def get_materials(self, **kwargs):
         """
         GET /api/materials - Retrieve all materials with optional filtering
         
         Query Parameters:
         - material_type: Filter by material type (fabric, jeans, cotton)
+        - price_category: Filter by price band code (e.g. budget, standard, premium)
+        - archived: "exclude" (default), "include" or "only"
         - limit: Number of records to return (default: 100)
         - offset: Number of records to skip (default: 0)
+        - currency: ISO code (e.g. EUR); buy prices are converted to it
+        - ids: Comma-separated material IDs; fetches exactly these materials
+          in the given order and reports missing IDs (other parameters ignored
+          except currency)
         """
         try:
+            to_currency = requested_currency(request.env, kwargs)
+            if kwargs.get('ids'):
+                return self._get_materials_by_ids(kwargs['ids'], to_currency)
+
             # Get query parameters
             material_type = kwargs.get('material_type')
             limit = int(kwargs.get('limit', 100))
             offset = int(kwargs.get('offset', 0))
 
+            archived = kwargs.get('archived', 'exclude')
+            if archived not in ('exclude', 'include', 'only'):
+                return error_response('archived must be one of: exclude, include, only', 400)
+
             # Build domain for filtering
-            domain = []
-            if material_type and material_type in ['fabric', 'jeans', 'cotton']:
-                domain = [('material_type', '=', material_type)]
+            Material = request.env['material.registration']
+            domain = Material._get_api_domain(material_type, kwargs.get('price_category'), archived)
 
             # Search materials
-            Material = request.env['material.registration']
+            if archived != 'exclude':
+                Material = Material.with_context(active_test=False)
             materials = Material.search(domain, limit=limit, offset=offset)
             total_count = Material.search_count(domain)
 
@@ -47,12 +73,17 @@ class MaterialController(http.Controller):
                     'material_name': material.material_name,
                     'material_type': material.material_type,
                     'material_buy_price': material.material_buy_price,
+                    'currency': material.currency_id.name,
                     'supplier_id': material.supplier_id.id,
                     'supplier_name': material.supplier_name,
                     'price_category': material.price_category,
+                    'active': material.active,
                     'create_date': material.create_date.isoformat() if material.create_date else None,
                     'write_date': material.write_date.isoformat() if material.write_date else None,
                 })
+            if to_currency:
+                convert_page(request.env, materials_data, [m.currency_id.id for m in materials],
+                             ['material_buy_price'], to_currency)
 
             response_data = {
                 'success': True,
@@ -68,25 +99,30 @@ class MaterialController(http.Controller):
                 headers=[('Content-Type', 'application/json')]
             )
 
+        except ValidationError as e:
+            return error_response(str(e), 400)
         except Exception as e:
             _logger.error(f"Error retrieving materials: {str(e)}")
-            return self._error_response(str(e), 500)
+            return error_response(str(e), 500)
 
     @http.route('/api/materials/<int:material_id>', type='http', auth='user', methods=['GET'], csrf=False)
+    @audited
+    @profiled
+    @replica_read
     def get_material(self, material_id, **kwargs):
         """GET /api/materials/{id} - Retrieve a specific material by ID."""
         try:
             Material = request.env['material.registration']
             material = Material.browse(material_id)
             if not material.exists():
-                return self._error_response(f'Material with ID {material_id} not found', 404)
+                return error_response(f'Material with ID {material_id} not found', 404)
             try:
                 material_data = material.get_material_summary()
                 # Cek field penting None atau error
                 if not material_data or not material_data.get('material_code') or not material_data.get('material_name') or not material_data.get('supplier_name'):
-                    return self._error_response(f'Material with ID {material_id} not found', 404)
+                    return error_response(f'Material with ID {material_id} not found', 404)
             except Exception:
-                return self._error_response(f'Material with ID {material_id} not found', 404)
+                return error_response(f'Material with ID {material_id} not found', 404)
             response_data = {
                 'success': True,
                 'data': material_data,
@@ -94,18 +130,52 @@ class MaterialController(http.Controller):
             }
             return request.make_response(
                 json.dumps(response_data),
-                headers=[('Content-Type', 'application/json')]
+                headers=[('Content-Type', 'application/json'), ('ETag', etag_for(material))]
             )
         except Exception as e:
             _logger.error(f"Error retrieving material {material_id}: {str(e)}")
-            return self._error_response(str(e), 500)
+            return error_response(str(e), 500)
+
+    @http.route('/api/materials/autocomplete', type='http', auth='user', methods=['GET'], csrf=False)
+    @audited
+    @profiled
+    @replica_read
+    def autocomplete_materials(self, **kwargs):
+        """
+        GET /api/materials/autocomplete - Prefix lookup on material code and name
+
+        Query Parameters:
+        - q: Prefix to match (case-insensitive)
+        - limit: Maximum number of suggestions (default: 10, max: 50)
+        """
+        try:
+            limit = min(int(kwargs.get('limit', 10)), 50)
+            suggestions = request.env['material.registration'].autocomplete(kwargs.get('q', ''), limit=limit)
 
-    @http.route('/api/materials', type='json', auth='user', methods=['POST'], csrf=False)
+            response_data = {
+                'success': True,
+                'data': suggestions,
+                'message': f'Retrieved {len(suggestions)} suggestions successfully'
+            }
+
+            return request.make_response(
+                json.dumps(response_data),
+                headers=[('Content-Type', 'application/json')]
+            )
+
+        except Exception as e:
+            _logger.error(f"Error autocompleting materials: {str(e)}")
+            return error_response(str(e), 500)
+
+    @http.route('/api/materials', type='http', auth='user', methods=['POST'], csrf=False)
+    @audited
+    @profiled
+    @primary_write
     def create_material(self, **kwargs):
         """
-        POST /api/materials - Create a new material
+        POST /api/materials - Create a new material, or several at once
         
-        Request Body (JSON):
+        Request Body (JSON), or a list of such objects:
         {
             "material_code": "string",
             "material_name": "string",
@@ -115,120 +185,100 @@ class MaterialController(http.Controller):
         }
         """
         try:
-            data = request.jsonrequest
-            
-            # Validate required fields
-            required_fields = ['material_code', 'material_name', 'material_type', 
-                             'material_buy_price', 'supplier_id']
-            for field in required_fields:
-                if field not in data or not data[field]:
-                    raise ValidationError(f'Field "{field}" is required')
-
-            # Validate material_type
-            if data['material_type'] not in ['fabric', 'jeans', 'cotton']:
-                raise ValidationError('material_type must be one of: fabric, jeans, cotton')
-
-            # Validate price
-            if float(data['material_buy_price']) < 100:
-                raise ValidationError('material_buy_price must be at least 100')
-
-            # Validate supplier exists
-            Supplier = request.env['material.supplier']
-            supplier = Supplier.browse(data['supplier_id'])
-            if not supplier.exists():
-                raise ValidationError(f'Supplier with ID {data["supplier_id"]} not found')
-
-            # Create material
+            data = json_body()
+            is_bulk = isinstance(data, list)
+
+            # Validate every payload in one pass against the compiled schema
+            vals_list = MATERIAL_CREATE.validate_many(data if is_bulk else [data])
+            self._check_suppliers_exist(vals_list)
+
+            # Create material(s): all of them or none
             Material = request.env['material.registration']
-            material = Material.create(data)
+            with request.env.cr.savepoint():
+                materials = Material.create(vals_list)
 
             response_data = {
                 'success': True,
-                'data': material.get_material_summary(),
-                'message': 'Material created successfully'
+                'data': [m.get_material_summary() for m in materials] if is_bulk else materials.get_material_summary(),
+                'message': f'{len(materials)} materials created successfully' if is_bulk else 'Material created successfully'
             }
 
-            return request.make_response(
-                json.dumps(response_data),
-                headers=[('Content-Type', 'application/json')]
-            )
+            return json_response(response_data)
 
-        except ValidationError as e:
+        except (ValueError, ValidationError) as e:
             _logger.warning(f"Validation error creating material: {str(e)}")
-            return request.make_response(
-                json.dumps({'success': False, 'error': str(e), 'error_type': 'validation'}),
-                status=400,
-                headers=[('Content-Type', 'application/json')]
-            )
+            return json_response({'success': False, 'error': str(e), 'error_type': 'validation'}, 400)
         except Exception as e:
             _logger.error(f"Error creating material: {str(e)}")
-            return request.make_response(
-                json.dumps({'success': False, 'error': str(e), 'error_type': 'server'}),
-                status=500,
-                headers=[('Content-Type', 'application/json')]
-            )
+            return json_response({'success': False, 'error': str(e), 'error_type': 'server'}, 500)
 
-    @http.route('/api/materials/<int:material_id>', type='json', auth='user', methods=['PUT'], csrf=False)
+    @http.route('/api/materials/<int:material_id>', type='http', auth='user', methods=['PUT'], csrf=False)
+    @audited
+    @profiled
+    @primary_write
     def update_material(self, material_id, **kwargs):
         """
         PUT /api/materials/{id} - Update an existing material
         
         Request Body (JSON): Any of the material fields to update
+
+        Headers:
+        - If-Match: ETag from a previous response; fails with 412 if the
+          material changed since (or is being changed right now)
+        - If-Unmodified-Since: HTTP date; same, based on the last write time
+        - Prefer: return=minimal to get only the new version back
         """
         try:
-            data = request.jsonrequest
+            data = json_body()
             
             Material = request.env['material.registration']
             material = Material.browse(material_id)
             
             if not material.exists():
-                return {'success': False, 'error': f'Material with ID {material_id} not found', 'error_type': 'not_found'}
-
-            # Validate material_type if provided
-            if 'material_type' in data and data['material_type'] not in ['fabric', 'jeans', 'cotton']:
-                raise ValidationError('material_type must be one of: fabric, jeans, cotton')
-
-            # Validate price if provided
-            if 'material_buy_price' in data and float(data['material_buy_price']) < 100:
-                raise ValidationError('material_buy_price must be at least 100')
-
-            # Validate supplier if provided
-            if 'supplier_id' in data:
-                Supplier = request.env['material.supplier']
-                supplier = Supplier.browse(data['supplier_id'])
-                if not supplier.exists():
-                    raise ValidationError(f'Supplier with ID {data["supplier_id"]} not found')
-
-            # Update material
-            material.write(data)
+                return error_response(f'Material with ID {material_id} not found', 404)
+
+            # Validate provided fields against the compiled schema
+            vals = MATERIAL_UPDATE.validate(data)
+            self._check_suppliers_exist([vals])
+
+            # Check If-Match / If-Unmodified-Since and lock the row in one statement
+            headers = request.httprequest.headers
+            version, unmodified_since = parse_preconditions(headers)
+            if (version or unmodified_since) and not material._lock_if_unmodified(version, unmodified_since):
+                return error_response(f'Material with ID {material_id} was modified concurrently', 412)
+
+            # Update material; a failed constraint leaves the row untouched
+            with request.env.cr.savepoint():
+                material.write(vals)
+                material.flush()
+            material.invalidate_cache(['write_date'])
+
+            if wants_minimal(headers):
+                material_data = {'id': material.id, 'version': material.get_version()}
+            else:
+                material_data = material.get_material_summary()
 
             response_data = {
                 'success': True,
-                'data': material.get_material_summary(),
+                'data': material_data,
                 'message': 'Material updated successfully'
             }
 
-            return request.make_response(
-                json.dumps(response_data),
-                headers=[('Content-Type', 'application/json')]
-            )
+            response = json_response(response_data)
+            response.headers['ETag'] = etag_for(material)
+            return response
 
-        except ValidationError as e:
+        except (ValueError, ValidationError) as e:
             _logger.warning(f"Validation error updating material {material_id}: {str(e)}")
-            return request.make_response(
-                json.dumps({'success': False, 'error': str(e), 'error_type': 'validation'}),
-                status=400,
-                headers=[('Content-Type', 'application/json')]
-            )
+            return json_response({'success': False, 'error': str(e), 'error_type': 'validation'}, 400)
         except Exception as e:
             _logger.error(f"Error updating material {material_id}: {str(e)}")
-            return request.make_response(
-                json.dumps({'success': False, 'error': str(e), 'error_type': 'server'}),
-                status=500,
-                headers=[('Content-Type', 'application/json')]
-            )
+            return json_response({'success': False, 'error': str(e), 'error_type': 'server'}, 500)
 
     @http.route('/api/materials/<int:material_id>', type='http', auth='user', methods=['DELETE'], csrf=False)
+    @audited
+    @profiled
+    @primary_write
     def delete_material(self, material_id, **kwargs):
         """DELETE /api/materials/{id} - Delete a material."""
         try:
@@ -236,7 +286,7 @@ class MaterialController(http.Controller):
             material = Material.browse(material_id)
             
             if not material.exists():
-                return self._error_response(f'Material with ID {material_id} not found', 404)
+                return error_response(f'Material with ID {material_id} not found', 404)
 
             # Store material info before deletion
             material_info = {
@@ -261,9 +311,140 @@ class MaterialController(http.Controller):
 
         except Exception as e:
             _logger.error(f"Error deleting material {material_id}: {str(e)}")
-            return self._error_response(str(e), 500)
+            return error_response(str(e), 500)
+
+    @http.route('/api/materials/archive', type='http', auth='user', methods=['POST'], csrf=False)
+    @audited
+    @profiled
+    @primary_write
+    def archive_materials(self, **kwargs):
+        """
+        POST /api/materials/archive - Archive one or more materials
+
+        Request Body (JSON):
+        {
+            "ids": [int, ...]
+        }
+        """
+        return self._set_materials_active(False)
+
+    @http.route('/api/materials/unarchive', type='http', auth='user', methods=['POST'], csrf=False)
+    @audited
+    @profiled
+    @primary_write
+    def unarchive_materials(self, **kwargs):
+        """
+        POST /api/materials/unarchive - Restore one or more archived materials
+
+        Request Body (JSON):
+        {
+            "ids": [int, ...]
+        }
+        """
+        return self._set_materials_active(True)
+
+    def _set_materials_active(self, active):
+        """Archive or unarchive the materials listed in the JSON body with one UPDATE."""
+        action = 'unarchive' if active else 'archive'
+        try:
+            body = json_body()
+            material_ids = body.get('ids') if isinstance(body, dict) else None
+            if not isinstance(material_ids, list) or not material_ids or \
+                    not all(isinstance(i, int) for i in material_ids):
+                raise ValidationError('Field "ids" must be a non-empty list of integers')
+
+            Material = request.env['material.registration'].with_context(active_test=False)
+            materials = Material.search([('id', 'in', material_ids)])
+            missing_ids = sorted(set(material_ids) - set(materials.ids))
+            to_change = materials.filtered(lambda m: m.active != active)
+            with request.env.cr.savepoint():
+                to_change.write({'active': active})
+
+            response_data = {
+                'success': True,
+                'data': {'ids': to_change.ids, 'missing_ids': missing_ids},
+                'message': f'{action.capitalize()}d {len(to_change)} materials successfully'
+            }
+
+            return json_response(response_data)
+
+        except (ValueError, ValidationError) as e:
+            _logger.warning(f"Validation error trying to {action} materials: {str(e)}")
+            return json_response({'success': False, 'error': str(e), 'error_type': 'validation'}, 400)
+        except Exception as e:
+            _logger.error(f"Error trying to {action} materials: {str(e)}")
+            return json_response({'success': False, 'error': str(e), 'error_type': 'server'}, 500)
+
+    @http.route('/api/materials/best-price', type='http', auth='user', methods=['GET'], csrf=False)
+    @audited
+    @profiled
+    @replica_read
+    def get_best_prices(self, **kwargs):
+        """
+        GET /api/materials/best-price - Cheapest offer and price spread of equivalent materials
+
+        Query Parameters (one of):
+        - name and material_type: a single material, by name
+        - group: a single manual equivalence group
+        - material_ids: Comma-separated material IDs; a shopping list of
+          materials, each compared with its equivalents
+        - keys: "|"-separated equivalence keys, as returned by the API
+        Optional:
+        - currency: ISO code (e.g. EUR) to compare prices in (default: the base currency)
+
+        Every item is answered by the same single query, in the order given.
+        """
+        try:
+            to_currency = requested_currency(request.env, kwargs)
+            Material = request.env['material.registration']
+            material_ids = []
+            if kwargs.get('material_ids'):
+                material_ids = parse_ids(kwargs['material_ids'])
+                materials = Material.with_context(active_test=False).browse(material_ids).exists()
+                key_by_id = {material.id: material.equivalence_key for material in materials}
+                missing_ids = [i for i in material_ids if i not in key_by_id]
+                if missing_ids:
+                    return error_response(
+                        f'Material with ID {", ".join(map(str, missing_ids))} not found', 404)
+                keys = [key_by_id[i] for i in material_ids]
+            elif kwargs.get('keys'):
+                keys = [key for key in kwargs['keys'].split('|') if key]
+            elif kwargs.get('group'):
+                keys = [equivalence_key(None, None, kwargs['group'])]
+            elif kwargs.get('name') and kwargs.get('material_type'):
+                keys = [equivalence_key(kwargs['name'], kwargs['material_type'])]
+            else:
+                return error_response('Give name and material_type, group, material_ids or keys', 400)
+            if len(keys) > MAX_IDS_PER_REQUEST:
+                return error_response(f'At most {MAX_IDS_PER_REQUEST} items can be priced at once', 400)
+
+            results = Material.get_best_prices(keys)
+            for result, material_id in zip(results, material_ids):
+                result['material_id'] = material_id
+            if to_currency:
+                self._convert_best_prices(results, to_currency)
+
+            response_data = {
+                'success': True,
+                'data': results,
+                'message': f'Priced {len(results)} items successfully'
+            }
+
+            return request.make_response(
+                json.dumps(response_data),
+                headers=[('Content-Type', 'application/json')]
+            )
+
+        except (ValueError, ValidationError) as e:
+            return error_response(str(e), 400)
+        except Exception as e:
+            _logger.error(f"Error retrieving best prices: {str(e)}")
+            return error_response(str(e), 500)
 
     @http.route('/api/materials/types', type='http', auth='user', methods=['GET'], csrf=False)
+    @audited
+    @profiled
+    @replica_read
     def get_material_types(self, **kwargs):
         """GET /api/materials/types - Get available material types."""
         try:
@@ -286,10 +467,53 @@ class MaterialController(http.Controller):
 
         except Exception as e:
             _logger.error(f"Error retrieving material types: {str(e)}")
-            return self._error_response(str(e), 500)
-
-    def _error_response(self, message, status_code=400):
-        data = {'success': False, 'error': message}
-        response = request.make_response(json.dumps(data), headers=[('Content-Type', 'application/json')])
-        response.status_code = status_code
-        return response 
\ No newline at end of file
+            return error_response(str(e), 500)
+
+    def _check_suppliers_exist(self, vals_list):
+        """Raise a ValidationError if any referenced supplier does not exist (one query)."""
+        supplier_ids = {vals['supplier_id'] for vals in vals_list if vals.get('supplier_id')}
+        if supplier_ids:
+            existing = request.env['material.supplier'].browse(list(supplier_ids)).exists()
+            missing = sorted(supplier_ids - set(existing.ids))
+            if missing:
+                raise ValidationError(f'Supplier with ID {", ".join(map(str, missing))} not found')
+
+    def _get_materials_by_ids(self, ids_param, to_currency=None):
+        """Return the materials listed in ``ids_param`` in one response, preserving order."""
+        try:
+            material_ids = parse_ids(ids_param)
+        except ValueError as e:
+            return error_response(str(e), 400)
+
+        Material = request.env['material.registration']
+        summaries, missing_ids = Material.get_material_summaries(material_ids)
+        if to_currency:
+            currency_ids = [m.currency_id.id for m in Material.browse([s['id'] for s in summaries])]
+            convert_page(request.env, summaries, currency_ids, ['material_buy_price'], to_currency)
+        response_data = {
+            'success': True,
+            'data': summaries,
+            'missing_ids': missing_ids,
+            'message': f'Retrieved {len(summaries)} materials successfully'
+        }
+        return request.make_response(
+            json.dumps(response_data),
+            headers=[('Content-Type', 'application/json')]
+        )
+
+    def _convert_best_prices(self, results, to_currency):
+        """Convert the comparison prices and spreads of ``results`` to ``to_currency`` in place."""
+        Rate = request.env['material.currency.rate']
+        base_currency = Rate._get_base_currency()
+        priced = [result for result in results if result['cheapest']]
+        spread_keys = ['min_price', 'max_price', 'avg_price', 'spread']
+        amounts = [result[key] for result in priced for key in spread_keys]
+        amounts += [result['cheapest']['comparison_price'] for result in priced]
+        converted = iter(Rate._convert_amounts(amounts, [base_currency.id] * len(amounts), to_currency))
+        for result in priced:
+            for key in spread_keys:
+                result[key] = next(converted)
+        for result in priced:
+            result['cheapest']['comparison_price'] = next(converted)
+        for result in results:
+            result['comparison_currency'] = to_currency.name
@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+
+import json
+import logging
+from odoo import http
+from odoo.http import request
+
+from .schemas import MATERIAL_CREATE, MATERIAL_UPDATE, STOCK_MOVE, SUPPLIER_CREATE, SUPPLIER_UPDATE
+
+_logger = logging.getLogger(__name__)
+
+_ID_PARAMETER = {'name': 'id', 'in': 'path', 'required': True, 'schema': {'type': 'integer'}}
+_LIST_PARAMETERS = [
+    {'name': 'limit', 'in': 'query', 'schema': {'type': 'integer', 'default': 100}},
+    {'name': 'offset', 'in': 'query', 'schema': {'type': 'integer', 'default': 0}},
+    {'name': 'ids', 'in': 'query', 'schema': {'type': 'string'},
+     'description': 'Comma-separated IDs to fetch in one call, in order'},
+]
+_CURRENCY_PARAMETER = {'name': 'currency', 'in': 'query', 'schema': {'type': 'string'},
+                       'description': 'ISO currency code to convert prices to'}
+_PRECONDITION_HEADERS = [
+    {'name': 'If-Match', 'in': 'header', 'schema': {'type': 'string'}},
+    {'name': 'If-Unmodified-Since', 'in': 'header', 'schema': {'type': 'string'}},
+    {'name': 'Prefer', 'in': 'header', 'schema': {'type': 'string', 'enum': ['return=minimal']}},
+]
+
+
+def _body(schema_name, allow_list=False):
+    ref = {'$ref': f'#/components/schemas/{schema_name}'}
+    schema = {'oneOf': [ref, {'type': 'array', 'items': ref}]} if allow_list else ref
+    return {'required': True, 'content': {'application/json': {'schema': schema}}}
+
+
+def _responses(*codes):
+    descriptions = {
+        '200': 'Success', '400': 'Validation error', '403': 'Forbidden', '404': 'Not found',
+        '412': 'Precondition failed (concurrent modification)', '500': 'Server error',
+    }
+    return {code: {'description': descriptions[code]} for code in ('200',) + codes}
+
+
+def build_openapi_document():
+    """Build the OpenAPI 3 document for the material and supplier endpoints."""
+    return {
+        'openapi': '3.0.3',
+        'info': {'title': 'Material Registration API', 'version': '14.0.1.0.0'},
+        'components': {
+            'schemas': {schema.name: schema.to_openapi()
+                        for schema in (MATERIAL_CREATE, MATERIAL_UPDATE, SUPPLIER_CREATE, SUPPLIER_UPDATE,
+                                       STOCK_MOVE)},
+        },
+        'paths': {
+            '/api/materials': {
+                'get': {
+                    'summary': 'List materials',
+                    'parameters': _LIST_PARAMETERS + [
+                        {'name': 'material_type', 'in': 'query', 'schema': {'type': 'string'}},
+                        {'name': 'price_category', 'in': 'query', 'schema': {'type': 'string'}},
+                        {'name': 'archived', 'in': 'query',
+                         'schema': {'type': 'string', 'enum': ['exclude', 'include', 'only']}},
+                        _CURRENCY_PARAMETER,
+                    ],
+                    'responses': _responses('400', '500'),
+                },
+                'post': {
+                    'summary': 'Create one material, or several from a list',
+                    'requestBody': _body(MATERIAL_CREATE.name, allow_list=True),
+                    'responses': _responses('400', '500'),
+                },
+            },
+            '/api/materials/{id}': {
+                'get': {'summary': 'Get a material', 'parameters': [_ID_PARAMETER],
+                        'responses': _responses('404', '500')},
+                'put': {
+                    'summary': 'Update a material',
+                    'parameters': [_ID_PARAMETER] + _PRECONDITION_HEADERS,
+                    'requestBody': _body(MATERIAL_UPDATE.name),
+                    'responses': _responses('400', '404', '412', '500'),
+                },
+                'delete': {'summary': 'Delete a material', 'parameters': [_ID_PARAMETER],
+                           'responses': _responses('404', '500')},
+            },
+            '/api/materials/types': {
+                'get': {'summary': 'List material types', 'responses': _responses('500')},
+            },
+            '/api/materials/best-price': {
+                'get': {
+                    'summary': 'Cheapest offer and price spread of equivalent materials',
+                    'parameters': [
+                        {'name': 'name', 'in': 'query', 'schema': {'type': 'string'}},
+                        {'name': 'material_type', 'in': 'query', 'schema': {'type': 'string'}},
+                        {'name': 'group', 'in': 'query', 'schema': {'type': 'string'}},
+                        {'name': 'material_ids', 'in': 'query', 'schema': {'type': 'string'},
+                         'description': 'Comma-separated material IDs (a shopping list)'},
+                        {'name': 'keys', 'in': 'query', 'schema': {'type': 'string'},
+                         'description': '"|"-separated equivalence keys'},
+                        _CURRENCY_PARAMETER,
+                    ],
+                    'responses': _responses('400', '404', '500'),
+                },
+            },
+            '/api/materials/autocomplete': {
+                'get': {
+                    'summary': 'Prefix suggestions on material code and name',
+                    'parameters': [
+                        {'name': 'q', 'in': 'query', 'required': True, 'schema': {'type': 'string'}},
+                        {'name': 'limit', 'in': 'query', 'schema': {'type': 'integer', 'default': 10}},
+                    ],
+                    'responses': _responses('500'),
+                },
+            },
+            '/api/suppliers': {
+                'get': {
+                    'summary': 'List suppliers',
+                    'parameters': _LIST_PARAMETERS + [
+                        {'name': 'search', 'in': 'query', 'schema': {'type': 'string'}},
+                        {'name': 'order', 'in': 'query', 'schema': {'type': 'string'}},
+                        {'name': 'min_avg_price', 'in': 'query', 'schema': {'type': 'number'}},
+                        {'name': 'max_avg_price', 'in': 'query', 'schema': {'type': 'number'}},
+                        _CURRENCY_PARAMETER,
+                    ],
+                    'responses': _responses('400', '500'),
+                },
+                'post': {
+                    'summary': 'Create a supplier',
+                    'requestBody': _body(SUPPLIER_CREATE.name),
+                    'responses': _responses('400', '500'),
+                },
+                'delete': {
+                    'summary': 'Delete several suppliers (all-or-nothing)',
+                    'parameters': [{'name': 'ids', 'in': 'query', 'required': True, 'schema': {'type': 'string'}}],
+                    'responses': _responses('400', '500'),
+                },
+            },
+            '/api/suppliers/{id}': {
+                'get': {'summary': 'Get a supplier with its materials', 'parameters': [_ID_PARAMETER],
+                        'responses': _responses('404', '500')},
+                'put': {
+                    'summary': 'Update a supplier',
+                    'parameters': [_ID_PARAMETER] + _PRECONDITION_HEADERS,
+                    'requestBody': _body(SUPPLIER_UPDATE.name),
+                    'responses': _responses('400', '404', '412', '500'),
+                },
+                'delete': {'summary': 'Delete a supplier', 'parameters': [_ID_PARAMETER],
+                           'responses': _responses('400', '404', '500')},
+            },
+            '/api/suppliers/query': {
+                'post': {
+                    'summary': 'Suppliers with a field selection and their first materials, in one call',
+                    'requestBody': {'required': True, 'content': {'application/json': {'schema': {
+                        'type': 'object',
+                        'properties': {
+                            'search': {'type': 'string'},
+                            'min_avg_price': {'type': 'number'},
+                            'max_avg_price': {'type': 'number'},
+                            'ids': {'type': 'array', 'items': {'type': 'integer'}},
+                            'fields': {'type': 'array', 'items': {'type': 'string'}},
+                            'limit': {'type': 'integer', 'default': 100},
+                            'offset': {'type': 'integer', 'default': 0},
+                            'order': {'type': 'string'},
+                            'currency': {'type': 'string'},
+                            'materials': {'type': 'object', 'properties': {
+                                'fields': {'type': 'array', 'items': {'type': 'string'}},
+                                'limit': {'type': 'integer', 'default': 20,
+                                          'description': 'Materials listed per supplier'},
+                                'order': {'type': 'string'},
+                                'material_type': {'type': 'string'},
+                                'price_category': {'type': 'string'},
+                            }},
+                        },
+                    }}}},
+                    'responses': _responses('400', '500'),
+                },
+            },
+            '/api/suppliers/dropdown': {
+                'get': {'summary': 'Suppliers for dropdown selection', 'responses': _responses('500')},
+            },
+            '/api/stock/moves': {
+                'post': {
+                    'summary': 'Append stock moves (all-or-nothing)',
+                    'requestBody': {'required': True, 'content': {'application/json': {'schema': {
+                        'type': 'object',
+                        'properties': {'moves': {'type': 'array',
+                                                 'items': {'$ref': f'#/components/schemas/{STOCK_MOVE.name}'}}},
+                    }}}},
+                    'responses': _responses('400', '500'),
+                },
+            },
+            '/api/stream': {
+                'get': {
+                    'summary': 'Server-sent events of committed material and supplier changes',
+                    'parameters': [
+                        {'name': 'supplier_id', 'in': 'query', 'schema': {'type': 'string'},
+                         'description': 'Comma-separated supplier IDs to follow'},
+                        {'name': 'material_type', 'in': 'query', 'schema': {'type': 'string'}},
+                    ],
+                    'responses': {
+                        '200': {'description': 'Event stream', 'content': {'text/event-stream': {}}},
+                        '400': {'description': 'Validation error'},
+                        '503': {'description': 'Connection limit of the worker reached'},
+                    },
+                },
+            },
+            '/api/profiles/{id}': {
+                'get': {
+                    'summary': 'Python profile and SQL trace of a request sent with X-Material-Profile (administrators)',
+                    'parameters': [_ID_PARAMETER],
+                    'responses': _responses('403', '404', '500'),
+                },
+            },
+            '/api/integrity': {
+                'get': {
+                    'summary': 'Progress and report of the latest stored field repair (administrators)',
+                    'responses': _responses('403', '404', '500'),
+                },
+            },
+            '/api/integrity/repair': {
+                'post': {
+                    'summary': 'Continue or restart the chunked repair of stored fields (administrators)',
+                    'parameters': [
+                        {'name': 'restart', 'in': 'query', 'schema': {'type': 'boolean'}},
+                        {'name': 'chunk_size', 'in': 'query', 'schema': {'type': 'integer', 'default': 5000}},
+                        {'name': 'time_budget', 'in': 'query', 'schema': {'type': 'number', 'default': 60}},
+                    ],
+                    'responses': _responses('400', '403', '500'),
+                },
+            },
+            '/api/stock/balances': {
+                'get': {
+                    'summary': 'On-hand quantities of materials',
+                    'parameters': [{'name': 'ids', 'in': 'query', 'required': True, 'schema': {'type': 'string'}}],
+                    'responses': _responses('400', '500'),
+                },
+            },
+        },
+    }
+
+
+# Built once per process: the schemas it describes are static
+_OPENAPI_JSON = json.dumps(build_openapi_document())
+
+
+class OpenApiController(http.Controller):
+    """Publishes the OpenAPI document of the REST API."""
+
+    @http.route('/api/openapi.json', type='http', auth='public', methods=['GET'], csrf=False)
+    def get_openapi(self, **kwargs):
+        """GET /api/openapi.json - OpenAPI description of the material and supplier endpoints."""
+        return request.make_response(_OPENAPI_JSON, headers=[('Content-Type', 'application/json')])
@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+
+import logging
+from odoo import http
+from odoo.http import request
+
+from .common import error_response, json_response
+
+_logger = logging.getLogger(__name__)
+
+
+class ProfileController(http.Controller):
+    """Retrieval of the request profiles captured with the X-Material-Profile header."""
+
+    @http.route('/api/profiles/<int:profile_id>', type='http', auth='user', methods=['GET'], csrf=False)
+    def get_profile(self, profile_id, **kwargs):
+        """
+        GET /api/profiles/<id> - Python profile and SQL trace of a profiled request
+
+        The ID is returned in the X-Profile-Id header of the profiled response.
+        Restricted to system administrators.
+        """
+        try:
+            if not request.env.user._is_system():
+                return error_response('Only administrators can read request profiles', 403)
+            profile = request.env['material.request.profile'].browse(profile_id).exists()
+            if not profile:
+                return error_response(f'Profile with ID {profile_id} not found', 404)
+            return json_response({'success': True, 'data': profile._get_api_data()})
+        except Exception as e:
+            _logger.error(f"Error retrieving profile {profile_id}: {str(e)}")
+            return error_response(str(e), 500)
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+
+import cProfile
+import functools
+import io
+import json
+import logging
+import pstats
+import threading
+import time
+
+from odoo import sql_db
+from odoo.http import request
+
+_logger = logging.getLogger(__name__)
+
+# Header or query parameter asking for a profile of the request
+PROFILE_HEADER = 'X-Material-Profile'
+PROFILE_PARAM = 'profile'
+
+# Functions kept in the stored Python profile
+PROFILE_TOP_FUNCTIONS = 60
+
+# Longest statement text kept in the SQL trace
+MAX_STATEMENT_LENGTH = 2000
+
+# One profiled request at a time per process: cProfile and the patched
+# Cursor.execute are process-wide
+_profile_lock = threading.Lock()
+
+
+class SqlTrace(object):
+    """Record every statement the current thread executes, with its duration.
+
+    ``Cursor.execute`` is only wrapped inside the ``with`` block, so
+    requests that are not profiled run the original method untouched.
+    Statements of other threads are passed through as they are.
+    """
+
+    def __init__(self):
+        self.thread_id = threading.get_ident()
+        self.statements = []
+        self._original = None
+
+    def __enter__(self):
+        original = self._original = sql_db.Cursor.execute
+        trace = self
+
+        @functools.wraps(original)
+        def execute(cr, query, *args, **kwargs):
+            if threading.get_ident() != trace.thread_id:
+                return original(cr, query, *args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return original(cr, query, *args, **kwargs)
+            finally:
+                trace.add(cr, query, time.perf_counter() - started)
+
+        sql_db.Cursor.execute = execute
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        sql_db.Cursor.execute = self._original
+
+    def add(self, cr, query, duration):
+        # The statement as sent, parameters included, when psycopg2 has it
+        sent = getattr(cr._obj, 'query', None)
+        text = sent.decode(errors='replace') if isinstance(sent, bytes) else str(query)
+        if len(text) > MAX_STATEMENT_LENGTH:
+            text = text[:MAX_STATEMENT_LENGTH] + '...'
+        self.statements.append({'query': text, 'duration_ms': round(duration * 1000, 3)})
+
+    @property
+    def total_ms(self):
+        return sum(statement['duration_ms'] for statement in self.statements)
+
+
+def profiling_requested():
+    """Return True if the current request asks to be profiled."""
+    httprequest = request.httprequest
+    flag = httprequest.headers.get(PROFILE_HEADER) or httprequest.args.get(PROFILE_PARAM)
+    return bool(flag) and flag.lower() not in ('0', 'false', 'no')
+
+
+def _python_profile(profiler):
+    stream = io.StringIO()
+    stats = pstats.Stats(profiler, stream=stream)
+    stats.strip_dirs().sort_stats('cumulative').print_stats(PROFILE_TOP_FUNCTIONS)
+    return stream.getvalue()
+
+
+def profiled(func):
+    """Route decorator: profile the handler when an administrator asks for it.
+
+    Must be placed below ``@http.route``. With the ``X-Material-Profile``
+    header or the ``profile=1`` query parameter, a system administrator's
+    request runs under cProfile with every SQL statement timed. The result
+    is stored as a ``material.request.profile`` and summed up in the
+    ``X-Profile-Id`` and ``Server-Timing`` response headers. Other requests
+    only pay for the flag lookup; the flag is ignored for other users and
+    while another request of the process is being profiled.
+    """
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        if not profiling_requested():
+            return func(self, *args, **kwargs)
+        kwargs.pop(PROFILE_PARAM, None)
+        if not request.env.user._is_system() or not _profile_lock.acquire(blocking=False):
+            return func(self, *args, **kwargs)
+        try:
+            profiler = cProfile.Profile()
+            started = time.perf_counter()
+            with SqlTrace() as trace:
+                profiler.enable()
+                try:
+                    response = func(self, *args, **kwargs)
+                finally:
+                    profiler.disable()
+            duration_ms = (time.perf_counter() - started) * 1000
+        finally:
+            _profile_lock.release()
+
+        try:
+            httprequest = request.httprequest
+            profile = request.env['material.request.profile'].sudo().create({
+                'user_id': request.uid,
+                'method': httprequest.method,
+                'path': httprequest.path,
+                'query_string': httprequest.query_string.decode(errors='replace'),
+                'status': getattr(response, 'status_code', 200),
+                'duration_ms': duration_ms,
+                'query_count': len(trace.statements),
+                'query_time_ms': trace.total_ms,
+                'python_profile': _python_profile(profiler),
+                'sql_trace': json.dumps(trace.statements),
+            })
+            profile._purge_old()
+        except Exception as e:
+            _logger.error(f"Could not store request profile: {str(e)}")
+            return response
+
+        headers = getattr(response, 'headers', None)
+        if headers is not None:
+            headers['X-Profile-Id'] = str(profile.id)
+            headers['Server-Timing'] = (
+                f'total;dur={duration_ms:.1f}, '
+                f'sql;dur={trace.total_ms:.1f};desc="{len(trace.statements)} queries"'
+            )
+        return response
+    return wrapper
@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+"""Declarative request schemas for the REST API.
+
+Each schema is compiled once, when this module is imported, into a flat
+list of per-field check functions. Validation is then a single pass over
+the payload, so every field error of a request is reported at once
+instead of the first one the ORM hits. The model constraints still run
+on the validated values. The same schemas are published as an OpenAPI
+document by ``OpenApiController``.
+"""
+
+from odoo.exceptions import ValidationError
+
+MATERIAL_TYPES = ('fabric', 'jeans', 'cotton')
+
+
+class SchemaError(ValidationError):
+    """Validation failure carrying every field error found in the payload(s)."""
+
+    def __init__(self, errors):
+        self.errors = errors
+        super(SchemaError, self).__init__('; '.join(
+            (f'[{e["index"]}] ' if 'index' in e else '') + f'{e["field"]}: {e["message"]}' for e in errors
+        ))
+
+
+class Field(object):
+    """Declaration of one payload field."""
+
+    def __init__(self, type, required=False, choices=None, minimum=None, max_length=None,
+                 not_blank=False, description=''):
+        self.type = type
+        self.required = required
+        self.choices = choices
+        self.minimum = minimum
+        self.max_length = max_length
+        self.not_blank = not_blank
+        self.description = description
+
+    def compile(self):
+        """Return a function ``value -> (clean_value, error_message)``."""
+        checks = []
+        if self.type in ('string', 'email'):
+            checks.append(lambda v: (v, None) if isinstance(v, str) else (v, 'must be a string'))
+            if self.not_blank:
+                checks.append(lambda v: (v, None) if v.strip() else (v, 'cannot be empty'))
+            if self.max_length:
+                max_length = self.max_length
+                checks.append(lambda v: (v, None) if len(v) <= max_length
+                              else (v, f'must be at most {max_length} characters'))
+            if self.type == 'email':
+                checks.append(lambda v: (v, None) if not v or '@' in v else (v, 'must be a valid email address'))
+        elif self.type == 'number':
+            def to_number(v):
+                if isinstance(v, bool):
+                    return v, 'must be a number'
+                try:
+                    return float(v), None
+                except (TypeError, ValueError):
+                    return v, 'must be a number'
+            checks.append(to_number)
+        elif self.type == 'integer':
+            checks.append(lambda v: (v, None) if isinstance(v, int) and not isinstance(v, bool)
+                          else (v, 'must be an integer'))
+        elif self.type == 'boolean':
+            checks.append(lambda v: (v, None) if isinstance(v, bool) else (v, 'must be a boolean'))
+        if self.choices:
+            choices = self.choices
+            checks.append(lambda v: (v, None) if v in choices else (v, f'must be one of: {", ".join(choices)}'))
+        if self.minimum is not None:
+            minimum = self.minimum
+            checks.append(lambda v: (v, None) if v >= minimum else (v, f'must be at least {minimum}'))
+
+        def check(value):
+            for step in checks:
+                value, error = step(value)
+                if error:
+                    return value, error
+            return value, None
+        return check
+
+    def to_openapi(self):
+        spec = {'type': 'string' if self.type == 'email' else self.type}
+        if self.type == 'email':
+            spec['format'] = 'email'
+        if self.choices:
+            spec['enum'] = list(self.choices)
+        if self.minimum is not None:
+            spec['minimum'] = self.minimum
+        if self.max_length:
+            spec['maxLength'] = self.max_length
+        if self.not_blank:
+            spec['minLength'] = 1
+        if self.description:
+            spec['description'] = self.description
+        return spec
+
+
+class Schema(object):
+    """A compiled set of field declarations.
+
+    With ``partial=True`` (updates) no field is required, but every field
+    present must be valid.
+    """
+
+    def __init__(self, name, fields, partial=False):
+        self.name = name
+        self.fields = fields
+        self.partial = partial
+        self._required = () if partial else tuple(n for n, f in fields.items() if f.required)
+        self._checks = {n: f.compile() for n, f in fields.items()}
+
+    def _errors(self, payload, index=None):
+        errors = []
+        values = {}
+        if not isinstance(payload, dict):
+            errors.append({'field': '(payload)', 'message': 'must be an object'})
+        else:
+            for name in self._required:
+                if payload.get(name) in (None, ''):
+                    errors.append({'field': name, 'message': 'is required'})
+            for name, value in payload.items():
+                check = self._checks.get(name)
+                if check is None:
+                    errors.append({'field': name, 'message': 'is not a known field'})
+                    continue
+                if value is None or value == '':
+                    if not self.fields[name].required:
+                        values[name] = False
+                    elif self.partial:
+                        errors.append({'field': name, 'message': 'cannot be empty'})
+                    continue
+                clean, error = check(value)
+                if error:
+                    errors.append({'field': name, 'message': error})
+                else:
+                    values[name] = clean
+        if index is not None:
+            for error in errors:
+                error['index'] = index
+        return values, errors
+
+    def validate(self, payload):
+        """Validate one payload and return ORM-ready values, or raise SchemaError."""
+        values, errors = self._errors(payload)
+        if errors:
+            raise SchemaError(errors)
+        return values
+
+    def validate_many(self, payloads):
+        """Validate a list of payloads in one pass, reporting errors for all of them."""
+        all_values = []
+        all_errors = []
+        for index, payload in enumerate(payloads):
+            values, errors = self._errors(payload, index)
+            all_values.append(values)
+            all_errors.extend(errors)
+        if all_errors:
+            raise SchemaError(all_errors)
+        return all_values
+
+    def to_openapi(self):
+        spec = {
+            'type': 'object',
+            'additionalProperties': False,
+            'properties': {name: field.to_openapi() for name, field in self.fields.items()},
+        }
+        if self._required:
+            spec['required'] = list(self._required)
+        return spec
+
+
+_MATERIAL_FIELDS = {
+    'material_code': Field('string', required=True, not_blank=True, description='Unique code for the material'),
+    'material_name': Field('string', required=True, not_blank=True, description='Name of the material'),
+    'material_type': Field('string', required=True, choices=MATERIAL_TYPES, description='Type of material'),
+    # The minimum of 100 applies in the base currency and is checked by the model
+    'material_buy_price': Field('number', required=True, minimum=0,
+                                description='Purchase price of the material, in the supplier currency'),
+    'supplier_id': Field('integer', required=True, description='ID of the related supplier'),
+    'equivalence_group': Field('string', max_length=128,
+                               description='Manual group of interchangeable materials (default: type and name)'),
+}
+
+_SUPPLIER_FIELDS = {
+    'name': Field('string', required=True, not_blank=True, description='Name of the supplier'),
+    'email': Field('email', description='Email address of the supplier'),
+    'phone': Field('string', description='Phone number of the supplier'),
+    'address': Field('string', description='Full address of the supplier'),
+    'currency_id': Field('integer', description='ID of the currency the supplier quotes prices in'),
+}
+
+_STOCK_MOVE_FIELDS = {
+    'material_id': Field('integer', description='ID of the material (or give material_code)'),
+    'material_code': Field('string', description='Code of an active material (alternative to material_id)'),
+    'quantity': Field('number', required=True, description='Signed quantity: positive in, negative out'),
+    'reference': Field('string', max_length=256, description='Scan, document or device reference'),
+}
+
+MATERIAL_CREATE = Schema('MaterialCreate', _MATERIAL_FIELDS)
+MATERIAL_UPDATE = Schema('MaterialUpdate', _MATERIAL_FIELDS, partial=True)
+SUPPLIER_CREATE = Schema('SupplierCreate', _SUPPLIER_FIELDS)
+SUPPLIER_UPDATE = Schema('SupplierUpdate', _SUPPLIER_FIELDS, partial=True)
+STOCK_MOVE = Schema('StockMove', _STOCK_MOVE_FIELDS)
+
+SCHEMAS = {
+    'material.registration': {'create': MATERIAL_CREATE, 'write': MATERIAL_UPDATE},
+    'material.supplier': {'create': SUPPLIER_CREATE, 'write': SUPPLIER_UPDATE},
+}
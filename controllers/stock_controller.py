@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+
+import json
+import logging
+from odoo import http, _
+from odoo.http import request
+from odoo.exceptions import ValidationError
+
+from .common import error_response, json_body, json_response, parse_ids
+from .replica import replica_read, primary_write
+from .schemas import STOCK_MOVE
+
+_logger = logging.getLogger(__name__)
+
+# Upper bound on the number of moves posted by a single request
+MAX_MOVES_PER_REQUEST = 5000
+
+
+class StockController(http.Controller):
+    """REST API Controller for the material stock ledger."""
+
+    @http.route('/api/stock/moves', type='http', auth='user', methods=['POST'], csrf=False)
+    @primary_write
+    def post_moves(self, **kwargs):
+        """
+        POST /api/stock/moves - Append stock moves in one transaction
+
+        Request Body (JSON):
+        {
+            "moves": [
+                {"material_code": "FAB001", "quantity": 12, "reference": "SCAN-0001"},
+                {"material_id": 7, "quantity": -3}
+            ]
+        }
+
+        Moves are validated together and inserted with a single statement;
+        if one is invalid, none is posted.
+        """
+        try:
+            body = json_body()
+            moves = body.get('moves') if isinstance(body, dict) else None
+            if not isinstance(moves, list) or not moves:
+                raise ValidationError('Field "moves" must be a non-empty list')
+            if len(moves) > MAX_MOVES_PER_REQUEST:
+                raise ValidationError(f'At most {MAX_MOVES_PER_REQUEST} moves can be posted at once')
+
+            move_ids = request.env['material.stock.move'].post_moves(STOCK_MOVE.validate_many(moves))
+
+            response_data = {
+                'success': True,
+                'data': {'ids': move_ids},
+                'message': f'Posted {len(move_ids)} stock moves successfully'
+            }
+
+            return json_response(response_data)
+
+        except (ValueError, ValidationError) as e:
+            _logger.warning(f"Validation error posting stock moves: {str(e)}")
+            return error_response(str(e), 400)
+        except Exception as e:
+            _logger.error(f"Error posting stock moves: {str(e)}")
+            return error_response(str(e), 500)
+
+    @http.route('/api/stock/balances', type='http', auth='user', methods=['GET'], csrf=False)
+    @replica_read
+    def get_balances(self, **kwargs):
+        """
+        GET /api/stock/balances - On-hand quantities of materials
+
+        Query Parameters:
+        - ids: Comma-separated material IDs (required)
+        """
+        try:
+            material_ids = parse_ids(kwargs.get('ids') or '')
+            if not material_ids:
+                return error_response('ids is required', 400)
+
+            Material = request.env['material.registration'].with_context(active_test=False)
+            existing = set(Material.browse(material_ids).exists().ids)
+            balances = request.env['material.stock.move'].get_balances([i for i in material_ids if i in existing])
+
+            response_data = {
+                'success': True,
+                'data': [{'material_id': i, 'balance': balances[i]} for i in material_ids if i in existing],
+                'missing_ids': [i for i in material_ids if i not in existing],
+                'message': f'Retrieved {len(balances)} balances successfully'
+            }
+
+            return request.make_response(
+                json.dumps(response_data),
+                headers=[('Content-Type', 'application/json')]
+            )
+
+        except ValueError as e:
+            return error_response(str(e), 400)
+        except Exception as e:
+            _logger.error(f"Error retrieving stock balances: {str(e)}")
+            return error_response(str(e), 500)
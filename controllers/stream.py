@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+
+import json
+import logging
+import queue
+import select
+import threading
+import time
+
+from odoo.sql_db import db_connect
+from odoo.tools import config
+
+from ..models.outbox import STREAM_CHANNEL
+
+_logger = logging.getLogger(__name__)
+
+# Default number of open /api/stream connections allowed per worker process
+DEFAULT_MAX_CONNECTIONS = 100
+
+# Seconds between heartbeat comments on an idle stream
+HEARTBEAT_INTERVAL = 15
+
+# Seconds after which a stream is closed so that clients reconnect
+MAX_STREAM_AGE = 3600
+
+# Notifications buffered per client before it is told to resync
+SUBSCRIBER_QUEUE_SIZE = 256
+
+# Put in a subscriber queue when notifications may have been missed
+RESYNC = object()
+
+
+def max_connections():
+    """Number of open streams allowed per worker process.
+
+    Configure it in the Odoo config file:
+
+        [options]
+        material_stream_max_connections = 100
+    """
+    try:
+        return int(config.get('material_stream_max_connections', DEFAULT_MAX_CONNECTIONS))
+    except (TypeError, ValueError):
+        return DEFAULT_MAX_CONNECTIONS
+
+
+class Subscriber(object):
+    """One open stream: a bounded queue of notifications and its filters."""
+
+    def __init__(self, dbname, supplier_ids=None, material_type=None):
+        self.dbname = dbname
+        self.supplier_ids = set(supplier_ids or ())
+        self.material_type = material_type
+        self.queue = queue.Queue(SUBSCRIBER_QUEUE_SIZE)
+
+    def push(self, message):
+        try:
+            self.queue.put_nowait(message)
+        except queue.Full:
+            # The client is too slow: drop what it has not read and make it refetch
+            with self.queue.mutex:
+                self.queue.queue.clear()
+            self.queue.put_nowait(RESYNC)
+
+    def match(self, message):
+        """Return the IDs of the records of ``message`` this stream wants, in order."""
+        return [
+            record_id for record_id, supplier_id, material_type in message['records']
+            if (not self.supplier_ids or supplier_id in self.supplier_ids)
+            and (not self.material_type or material_type == self.material_type)
+        ]
+
+
+class ChangeHub(object):
+    """Fan committed change notifications out to the open streams of this process.
+
+    A single listening connection per database is shared by all streams,
+    so an idle stream costs a blocked thread or greenlet, no queries. The
+    listener starts with the first stream and stops after the last one.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}
+        self._listeners = set()
+
+    def count(self):
+        return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def subscribe(self, dbname, supplier_ids=None, material_type=None):
+        """Register a stream, or return None if this worker has no room left."""
+        with self._lock:
+            if self.count() >= max_connections():
+                return None
+            subscriber = Subscriber(dbname, supplier_ids, material_type)
+            self._subscribers.setdefault(dbname, set()).add(subscriber)
+            if dbname not in self._listeners:
+                self._listeners.add(dbname)
+                thread = threading.Thread(target=self._listen, args=(dbname,),
+                                          name=f'material.stream.{dbname}', daemon=True)
+                thread.start()
+            return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.get(subscriber.dbname, set()).discard(subscriber)
+
+    def _dispatch(self, dbname, message):
+        with self._lock:
+            subscribers = list(self._subscribers.get(dbname, ()))
+        for subscriber in subscribers:
+            subscriber.push(message)
+
+    def _should_stop(self, dbname):
+        with self._lock:
+            if self._subscribers.get(dbname):
+                return False
+            self._listeners.discard(dbname)
+            return True
+
+    def _listen(self, dbname):
+        while not self._should_stop(dbname):
+            try:
+                with db_connect(dbname).cursor() as cr:
+                    conn = cr._cnx
+                    cr.execute(f'LISTEN {STREAM_CHANNEL}')
+                    cr.commit()
+                    while not self._should_stop(dbname):
+                        if select.select([conn], [], [], HEARTBEAT_INTERVAL) == ([], [], []):
+                            continue
+                        conn.poll()
+                        while conn.notifies:
+                            self._dispatch(dbname, json.loads(conn.notifies.pop(0).payload))
+                    cr.execute(f'UNLISTEN {STREAM_CHANNEL}')
+                    cr.commit()
+                return
+            except Exception as e:
+                _logger.warning(f"Change stream listener of {dbname} failed, reconnecting: {str(e)}")
+                # Changes committed while reconnecting are lost: clients must refetch
+                self._dispatch(dbname, RESYNC)
+                time.sleep(HEARTBEAT_INTERVAL)
+
+
+hub = ChangeHub()
+
+
+def format_event(event, data):
+    return f'event: {event}\ndata: {json.dumps(data)}\n\n'
+
+
+class EventStream(object):
+    """WSGI body yielding the server-sent events of ``subscriber`` until the client leaves.
+
+    Heartbeats keep proxies from closing an idle connection and make a
+    vanished client surface as a write error within ``heartbeat`` seconds.
+    The subscriber is released on ``close()``, which the server calls even
+    if the body was never iterated.
+    """
+
+    def __init__(self, subscriber, heartbeat=HEARTBEAT_INTERVAL, max_age=MAX_STREAM_AGE):
+        self.subscriber = subscriber
+        self.heartbeat = heartbeat
+        self.max_age = max_age
+
+    def __iter__(self):
+        deadline = time.monotonic() + self.max_age
+        yield f'retry: {int(self.heartbeat * 1000)}\n\n'
+        while time.monotonic() < deadline:
+            try:
+                message = self.subscriber.queue.get(timeout=self.heartbeat)
+            except queue.Empty:
+                yield ': heartbeat\n\n'
+                continue
+            if message is RESYNC:
+                yield format_event('resync', {})
+                continue
+            record_ids = self.subscriber.match(message)
+            if record_ids:
+                yield format_event('change', {'model': message['model'], 'event': message['event'],
+                                              'ids': record_ids})
+
+    def close(self):
+        hub.unsubscribe(self.subscriber)
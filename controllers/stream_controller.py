@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+
+import logging
+from odoo import http
+from odoo.http import request
+
+from .common import error_response, parse_ids
+from .stream import EventStream, HEARTBEAT_INTERVAL, hub
+
+_logger = logging.getLogger(__name__)
+
+MATERIAL_TYPES = ('fabric', 'jeans', 'cotton')
+
+
+class StreamController(http.Controller):
+    """Server-sent events stream of committed material and supplier changes."""
+
+    @http.route('/api/stream', type='http', auth='user', methods=['GET'], csrf=False)
+    def stream(self, **kwargs):
+        """
+        GET /api/stream - Live change notifications (text/event-stream)
+
+        Query Parameters:
+        - supplier_id: Comma-separated supplier IDs (max 1000); only their materials (and themselves)
+        - material_type: Only materials of this type (fabric, jeans, cotton)
+
+        Events:
+        - change: {"model": "material.registration", "event": "updated", "ids": [7, 8]}
+        - resync: notifications may have been missed, refetch what is displayed
+        A comment line is sent every 15 seconds while idle.
+        """
+        try:
+            supplier_ids = parse_ids(kwargs.get('supplier_id') or '', name='supplier_id')
+            material_type = kwargs.get('material_type') or None
+            if material_type and material_type not in MATERIAL_TYPES:
+                raise ValueError(f'material_type must be one of: {", ".join(MATERIAL_TYPES)}')
+        except ValueError as e:
+            return error_response(str(e), 400)
+
+        subscriber = hub.subscribe(request.env.cr.dbname, supplier_ids, material_type)
+        if subscriber is None:
+            _logger.warning("Change stream refused: connection limit of this worker reached")
+            response = error_response('Too many open streams, retry later', 503)
+            response.headers['Retry-After'] = str(HEARTBEAT_INTERVAL)
+            return response
+
+        return request.make_response(EventStream(subscriber), headers=[
+            ('Content-Type', 'text/event-stream'),
+            ('Cache-Control', 'no-cache'),
+            ('X-Accel-Buffering', 'no'),
+        ])
@@ -1,18 +1,56 @@
 # -*- coding: utf-8 -*-
 
+import datetime
 import json
 import logging
 from odoo import http, _
 from odoo.http import request
 from odoo.exceptions import ValidationError, AccessError
+from werkzeug.http import quote_etag
+
+from ..models.supplier import DEFAULT_SIMILARITY_THRESHOLD, SupplierInUseError
+from .audit import audited
+from .common import error_response, json_body, json_response, parse_ids
+from .concurrency import etag_for, parse_preconditions, wants_minimal
+from .currency import convert_page, requested_currency
+from .profiling import profiled
+from .replica import replica_read, primary_write, wrote_recently
+from .schemas import SUPPLIER_CREATE, SUPPLIER_UPDATE
 
 _logger = logging.getLogger(__name__)
 
+# Supplier price aggregates, converted when a currency is requested
+PRICE_AGGREGATE_FIELDS = ['material_price_min', 'material_price_max', 'material_price_avg']
+
+# Fields selectable with POST /api/suppliers/query ("currency" is the currency code)
+QUERY_SUPPLIER_FIELDS = (
+    'name', 'email', 'phone', 'address', 'currency', 'material_count',
+    'material_price_min', 'material_price_max', 'material_price_avg',
+    'fabric_count', 'jeans_count', 'cotton_count', 'create_date', 'write_date',
+)
+QUERY_MATERIAL_FIELDS = (
+    'material_code', 'material_name', 'material_type', 'material_buy_price', 'price_category',
+    'active', 'create_date', 'write_date',
+)
+QUERY_MATERIAL_ORDER_FIELDS = ('material_code', 'material_name', 'material_type', 'material_buy_price')
+
+# Materials returned per supplier by POST /api/suppliers/query
+DEFAULT_MATERIALS_PER_SUPPLIER = 20
+MAX_MATERIALS_PER_SUPPLIER = 500
+
+# Fields clients may sort the supplier listing by
+SORTABLE_FIELDS = (
+    'name', 'material_count', 'material_price_min', 'material_price_max', 'material_price_avg',
+)
+
 
 class SupplierController(http.Controller):
     """REST API Controller for Supplier CRUD operations."""
 
     @http.route('/api/suppliers', type='http', auth='user', methods=['GET'], csrf=False)
+    @audited
+    @profiled
+    @replica_read
     def get_suppliers(self, **kwargs):
         """
         GET /api/suppliers - Retrieve all suppliers
@@ -21,21 +59,32 @@ class SupplierController(http.Controller):
         - limit: Number of records to return (default: 100)
         - offset: Number of records to skip (default: 0)
         - search: Search term for supplier name or email
+        - min_avg_price / max_avg_price: Filter on average material price
+        - order: Sort order, one of the sortable fields optionally followed by
+          "asc" or "desc" (e.g. "material_price_avg desc"; default: name)
+        - currency: ISO code (e.g. EUR); price aggregates are converted to it
+        - ids: Comma-separated supplier IDs; fetches exactly these suppliers,
+          with their materials, in the given order and reports missing IDs
+          (other parameters ignored except currency)
         """
         try:
+            to_currency = requested_currency(request.env, kwargs)
+            if kwargs.get('ids'):
+                return self._get_suppliers_by_ids(kwargs['ids'], to_currency)
+
             # Get query parameters
             limit = int(kwargs.get('limit', 100))
             offset = int(kwargs.get('offset', 0))
             search_term = kwargs.get('search', '')
 
+            order = self._parse_order(kwargs.get('order'))
+
             # Build domain for searching
-            domain = []
-            if search_term:
-                domain = ['|', ('name', 'ilike', search_term), ('email', 'ilike', search_term)]
+            Supplier = request.env['material.supplier']
+            domain = Supplier._get_api_domain(search_term, kwargs.get('min_avg_price'), kwargs.get('max_avg_price'))
 
             # Search suppliers
-            Supplier = request.env['material.supplier']
-            suppliers = Supplier.search(domain, limit=limit, offset=offset)
+            suppliers = Supplier.search(domain, limit=limit, offset=offset, order=order)
             total_count = Supplier.search_count(domain)
 
             # Prepare response data
@@ -47,10 +96,20 @@ class SupplierController(http.Controller):
                     'email': supplier.email,
                     'phone': supplier.phone,
                     'address': supplier.address,
+                    'currency': supplier.currency_id.name,
                     'material_count': supplier.material_count,
+                    'material_price_min': supplier.material_price_min,
+                    'material_price_max': supplier.material_price_max,
+                    'material_price_avg': supplier.material_price_avg,
+                    'fabric_count': supplier.fabric_count,
+                    'jeans_count': supplier.jeans_count,
+                    'cotton_count': supplier.cotton_count,
                     'create_date': supplier.create_date.isoformat() if supplier.create_date else None,
                     'write_date': supplier.write_date.isoformat() if supplier.write_date else None,
                 })
+            if to_currency:
+                convert_page(request.env, suppliers_data, [s.currency_id.id for s in suppliers],
+                             PRICE_AGGREGATE_FIELDS, to_currency)
 
             response_data = {
                 'success': True,
@@ -66,66 +125,76 @@ class SupplierController(http.Controller):
                 headers=[('Content-Type', 'application/json')]
             )
 
+        except (ValueError, ValidationError) as e:
+            return error_response(str(e), 400)
         except Exception as e:
             _logger.error(f"Error retrieving suppliers: {str(e)}")
-            return self._error_response(str(e), 500)
+            return error_response(str(e), 500)
 
     @http.route('/api/suppliers/<int:supplier_id>', type='http', auth='user', methods=['GET'], csrf=False)
+    @audited
+    @profiled
+    @replica_read
     def get_supplier(self, supplier_id, **kwargs):
-        """GET /api/suppliers/{id} - Retrieve a specific supplier by ID."""
+        """
+        GET /api/suppliers/{id} - Retrieve a specific supplier by ID, with its materials
+
+        Served from the supplier's pre-encoded catalog snapshot when one
+        exists. "snapshot" in the response tells when it was generated and
+        whether changes are still waiting to be applied. A stale snapshot is
+        not served to a session that wrote within the replica staleness
+        window, so clients read their own writes. Pass ?fresh=1 (or
+        Cache-Control: no-cache) to build the response from live data.
+        """
         try:
-            Supplier = request.env['material.supplier']
-            supplier = Supplier.browse(supplier_id)
+            supplier = request.env['material.supplier'].browse(supplier_id)
             if not supplier.exists():
-                return self._error_response(f'Supplier with ID {supplier_id} not found', 404)
-            try:
-                # Include materials information
-                materials_data = []
-                for material in supplier.material_ids:
-                    try:
-                        if not material.material_code or not material.material_name:
-                            return self._error_response(f'Supplier with ID {supplier_id} not found', 404)
-                        materials_data.append({
-                            'id': material.id,
-                            'material_code': material.material_code,
-                            'material_name': material.material_name,
-                            'material_type': material.material_type,
-                            'material_buy_price': material.material_buy_price,
-                        })
-                    except Exception:
-                        return self._error_response(f'Supplier with ID {supplier_id} not found', 404)
-                try:
-                    supplier_data = {
-                        'id': supplier.id,
-                        'name': supplier.name,
-                        'email': supplier.email,
-                        'phone': supplier.phone,
-                        'address': supplier.address,
-                        'material_count': supplier.safe_material_count if hasattr(supplier, 'safe_material_count') else len(supplier.material_ids) if supplier.material_ids else 0,
-                        'materials': materials_data,
-                        'create_date': supplier.create_date.isoformat() if supplier.create_date else None,
-                        'write_date': supplier.write_date.isoformat() if supplier.write_date else None,
-                    }
-                except Exception:
-                    return self._error_response(f'Supplier with ID {supplier_id} not found', 404)
-                if not supplier_data or not supplier_data.get('name'):
-                    return self._error_response(f'Supplier with ID {supplier_id} not found', 404)
-            except Exception:
-                return self._error_response(f'Supplier with ID {supplier_id} not found', 404)
+                return error_response(f'Supplier with ID {supplier_id} not found', 404)
+            # The snapshot is read with SQL, so enforce record rules first
+            supplier.check_access_rights('read')
+            supplier.check_access_rule('read')
+
+            fresh = kwargs.get('fresh') in ('1', 'true') or 'no-cache' in (
+                request.httprequest.headers.get('Cache-Control') or '')
+            snapshot = None if fresh else request.env['material.supplier.catalog']._get_snapshot(supplier_id)
+            if snapshot and not (snapshot[3] and wrote_recently(request.session)):
+                return self._snapshot_response(*snapshot)
+
             response_data = {
                 'success': True,
-                'data': supplier_data,
+                'data': supplier.get_supplier_summary(),
+                'snapshot': None,
                 'message': 'Supplier retrieved successfully'
             }
             return request.make_response(
                 json.dumps(response_data),
-                headers=[('Content-Type', 'application/json')]
+                headers=[('Content-Type', 'application/json'), ('ETag', etag_for(supplier))]
             )
+        except AccessError as e:
+            return error_response(str(e), 403)
         except Exception as e:
             _logger.error(f"Error retrieving supplier {supplier_id}: {str(e)}")
-            return self._error_response(str(e), 500)
-
-    @http.route('/api/suppliers', type='json', auth='user', methods=['POST'], csrf=False)
+            return error_response(str(e), 500)
+
+    def _snapshot_response(self, body, version, generated_at, stale_since):
+        """Wrap a pre-encoded catalog body in the detail response without decoding it."""
+        age = max(0, int((datetime.datetime.utcnow() - generated_at).total_seconds()))
+        snapshot = {
+            'generated_at': generated_at.isoformat(),
+            'stale': bool(stale_since),
+            'stale_since': stale_since.isoformat() if stale_since else None,
+        }
+        payload = ('{"success": true, "data": %s, "snapshot": %s, "message": "Supplier retrieved successfully"}'
+                   % (body, json.dumps(snapshot)))
+        headers = [('Content-Type', 'application/json'), ('Age', str(age))]
+        if version:
+            headers.append(('ETag', quote_etag(version)))
+        return request.make_response(payload, headers=headers)
+
+    @http.route('/api/suppliers', type='http', auth='user', methods=['POST'], csrf=False)
+    @audited
+    @profiled
+    @primary_write
     def create_supplier(self, **kwargs):
         """
         POST /api/suppliers - Create a new supplier
@@ -139,19 +208,13 @@ class SupplierController(http.Controller):
         }
         """
         try:
-            data = request.jsonrequest
-            
-            # Validate required fields
-            if 'name' not in data or not data['name']:
-                raise ValidationError('Field "name" is required')
-
-            # Validate email format if provided
-            if data.get('email') and '@' not in data['email']:
-                raise ValidationError('Please enter a valid email address')
+            # Validate against the compiled schema
+            vals = SUPPLIER_CREATE.validate(json_body())
 
             # Create supplier
             Supplier = request.env['material.supplier']
-            supplier = Supplier.create(data)
+            with request.env.cr.savepoint():
+                supplier = Supplier.create(vals)
 
             supplier_data = {
                 'id': supplier.id,
@@ -165,60 +228,71 @@ class SupplierController(http.Controller):
             response_data = {
                 'success': True,
                 'data': supplier_data,
+                'possible_duplicates': Supplier.find_similar_suppliers(
+                    supplier.name, supplier.email, supplier.phone, exclude_id=supplier.id),
                 'message': 'Supplier created successfully'
             }
 
-            return request.make_response(
-                json.dumps(response_data),
-                headers=[('Content-Type', 'application/json')]
-            )
+            return json_response(response_data)
 
-        except ValidationError as e:
+        except (ValueError, ValidationError) as e:
             _logger.warning(f"Validation error creating supplier: {str(e)}")
-            return request.make_response(
-                json.dumps({'success': False, 'error': str(e), 'error_type': 'validation'}),
-                status=400,
-                headers=[('Content-Type', 'application/json')]
-            )
+            return json_response({'success': False, 'error': str(e), 'error_type': 'validation'}, 400)
         except Exception as e:
             _logger.error(f"Error creating supplier: {str(e)}")
-            return request.make_response(
-                json.dumps({'success': False, 'error': str(e), 'error_type': 'server'}),
-                status=500,
-                headers=[('Content-Type', 'application/json')]
-            )
+            return json_response({'success': False, 'error': str(e), 'error_type': 'server'}, 500)
 
-    @http.route('/api/suppliers/<int:supplier_id>', type='json', auth='user', methods=['PUT'], csrf=False)
+    @http.route('/api/suppliers/<int:supplier_id>', type='http', auth='user', methods=['PUT'], csrf=False)
+    @audited
+    @profiled
+    @primary_write
     def update_supplier(self, supplier_id, **kwargs):
         """
         PUT /api/suppliers/{id} - Update an existing supplier
         
         Request Body (JSON): Any of the supplier fields to update
+
+        Headers:
+        - If-Match: ETag from a previous response; fails with 412 if the
+          supplier changed since (or is being changed right now)
+        - If-Unmodified-Since: HTTP date; same, based on the last write time
+        - Prefer: return=minimal to get only the new version back
         """
         try:
-            data = request.jsonrequest
+            data = json_body()
             
             Supplier = request.env['material.supplier']
             supplier = Supplier.browse(supplier_id)
             
             if not supplier.exists():
-                return {'success': False, 'error': f'Supplier with ID {supplier_id} not found', 'error_type': 'not_found'}
-
-            # Validate email format if provided
-            if data.get('email') and '@' not in data['email']:
-                raise ValidationError('Please enter a valid email address')
-
-            # Update supplier
-            supplier.write(data)
-
-            supplier_data = {
-                'id': supplier.id,
-                'name': supplier.name,
-                'email': supplier.email,
-                'phone': supplier.phone,
-                'address': supplier.address,
-                'material_count': supplier.material_count,
-            }
+                return error_response(f'Supplier with ID {supplier_id} not found', 404)
+
+            # Validate provided fields against the compiled schema
+            vals = SUPPLIER_UPDATE.validate(data)
+
+            # Check If-Match / If-Unmodified-Since and lock the row in one statement
+            headers = request.httprequest.headers
+            version, unmodified_since = parse_preconditions(headers)
+            if (version or unmodified_since) and not supplier._lock_if_unmodified(version, unmodified_since):
+                return error_response(f'Supplier with ID {supplier_id} was modified concurrently', 412)
+
+            # Update supplier; a failed constraint leaves the row untouched
+            with request.env.cr.savepoint():
+                supplier.write(vals)
+                supplier.flush()
+            supplier.invalidate_cache(['write_date'])
+
+            if wants_minimal(headers):
+                supplier_data = {'id': supplier.id, 'version': supplier.get_version()}
+            else:
+                supplier_data = {
+                    'id': supplier.id,
+                    'name': supplier.name,
+                    'email': supplier.email,
+                    'phone': supplier.phone,
+                    'address': supplier.address,
+                    'material_count': supplier.material_count,
+                }
 
             response_data = {
                 'success': True,
@@ -226,27 +300,21 @@ class SupplierController(http.Controller):
                 'message': 'Supplier updated successfully'
             }
 
-            return request.make_response(
-                json.dumps(response_data),
-                headers=[('Content-Type', 'application/json')]
-            )
+            response = json_response(response_data)
+            response.headers['ETag'] = etag_for(supplier)
+            return response
 
-        except ValidationError as e:
+        except (ValueError, ValidationError) as e:
             _logger.warning(f"Validation error updating supplier {supplier_id}: {str(e)}")
-            return request.make_response(
-                json.dumps({'success': False, 'error': str(e), 'error_type': 'validation'}),
-                status=400,
-                headers=[('Content-Type', 'application/json')]
-            )
+            return json_response({'success': False, 'error': str(e), 'error_type': 'validation'}, 400)
         except Exception as e:
             _logger.error(f"Error updating supplier {supplier_id}: {str(e)}")
-            return request.make_response(
-                json.dumps({'success': False, 'error': str(e), 'error_type': 'server'}),
-                status=500,
-                headers=[('Content-Type', 'application/json')]
-            )
+            return json_response({'success': False, 'error': str(e), 'error_type': 'server'}, 500)
 
     @http.route('/api/suppliers/<int:supplier_id>', type='http', auth='user', methods=['DELETE'], csrf=False)
+    @audited
+    @profiled
+    @primary_write
     def delete_supplier(self, supplier_id, **kwargs):
         """DELETE /api/suppliers/{id} - Delete a supplier."""
         try:
@@ -254,26 +322,25 @@ class SupplierController(http.Controller):
             supplier = Supplier.browse(supplier_id)
             
             if not supplier.exists():
-                return self._error_response(f'Supplier with ID {supplier_id} not found', 404)
+                return error_response(f'Supplier with ID {supplier_id} not found', 404)
 
             # Store supplier info before deletion
             supplier_info = {
                 'id': supplier.id,
                 'name': supplier.name,
-                'material_count': supplier.material_count
+                'material_count': 0
             }
 
-            # Check if supplier has materials (this will raise ValidationError if it does)
-            if supplier.material_ids:
-                return self._error_response(
-                    f'Cannot delete supplier "{supplier.name}" because it has {supplier.material_count} associated materials. '
+            # Delete supplier; unlink refuses it if it still has materials
+            try:
+                supplier.unlink()
+            except SupplierInUseError as e:
+                return error_response(
+                    f'Cannot delete supplier "{supplier.name}" because it has {e.blocking[supplier.id]} associated materials. '
                     'Please remove or reassign the materials first.',
                     400
                 )
 
-            # Delete supplier
-            supplier.unlink()
-
             response_data = {
                 'success': True,
                 'data': supplier_info,
@@ -287,9 +354,143 @@ class SupplierController(http.Controller):
 
         except Exception as e:
             _logger.error(f"Error deleting supplier {supplier_id}: {str(e)}")
-            return self._error_response(str(e), 500)
+            return error_response(str(e), 500)
+
+    @http.route('/api/suppliers', type='http', auth='user', methods=['DELETE'], csrf=False)
+    @audited
+    @profiled
+    @primary_write
+    def delete_suppliers(self, **kwargs):
+        """
+        DELETE /api/suppliers - Delete several suppliers at once
+
+        Query Parameters:
+        - ids: Comma-separated supplier IDs (e.g. ids=1,2,3)
+
+        The request is all-or-nothing: if any supplier still has materials,
+        nothing is deleted and every blocking supplier is reported.
+        """
+        try:
+            try:
+                supplier_ids = parse_ids(kwargs.get('ids', ''), limit=None)
+            except ValueError as e:
+                return error_response(str(e), 400)
+            if not supplier_ids:
+                return error_response('Query parameter "ids" is required', 400)
+
+            Supplier = request.env['material.supplier']
+            suppliers = Supplier.browse(supplier_ids).exists()
+            missing_ids = sorted(set(supplier_ids) - set(suppliers.ids))
+
+            deleted_ids = suppliers.ids
+            try:
+                suppliers.unlink()
+            except SupplierInUseError as e:
+                data = {
+                    'success': False,
+                    'error': 'Some suppliers have associated materials. '
+                             'Please remove or reassign the materials first.',
+                    'blocking': [
+                        {'id': supplier.id, 'name': supplier.name, 'material_count': e.blocking[supplier.id]}
+                        for supplier in suppliers.browse(sorted(e.blocking))
+                    ],
+                    'missing_ids': missing_ids,
+                }
+                return request.make_response(
+                    json.dumps(data),
+                    status=400,
+                    headers=[('Content-Type', 'application/json')]
+                )
+
+            response_data = {
+                'success': True,
+                'data': {'deleted_ids': deleted_ids, 'missing_ids': missing_ids},
+                'message': f'Deleted {len(deleted_ids)} suppliers successfully'
+            }
+
+            return request.make_response(
+                json.dumps(response_data),
+                headers=[('Content-Type', 'application/json')]
+            )
+
+        except Exception as e:
+            _logger.error(f"Error deleting suppliers: {str(e)}")
+            return error_response(str(e), 500)
+
+    @http.route('/api/suppliers/duplicates', type='http', auth='user', methods=['GET'], csrf=False)
+    @audited
+    @profiled
+    @replica_read
+    def get_supplier_duplicates(self, **kwargs):
+        """
+        GET /api/suppliers/duplicates - Report candidate duplicate supplier pairs
+
+        Query Parameters:
+        - threshold: Minimum name similarity between 0 and 1 (default: 0.6)
+        - limit: Maximum number of pairs to return (default: 100)
+        """
+        try:
+            threshold = float(kwargs.get('threshold', DEFAULT_SIMILARITY_THRESHOLD))
+            limit = int(kwargs.get('limit', 100))
+            if not 0 < threshold <= 1:
+                return error_response('threshold must be between 0 and 1', 400)
+
+            pairs = request.env['material.supplier'].find_duplicate_pairs(threshold=threshold, limit=limit)
+
+            response_data = {
+                'success': True,
+                'data': pairs,
+                'message': f'Found {len(pairs)} candidate duplicate pairs'
+            }
+
+            return request.make_response(
+                json.dumps(response_data),
+                headers=[('Content-Type', 'application/json')]
+            )
+
+        except Exception as e:
+            _logger.error(f"Error detecting duplicate suppliers: {str(e)}")
+            return error_response(str(e), 500)
+
+    @http.route('/api/suppliers/similar', type='http', auth='user', methods=['GET'], csrf=False)
+    @audited
+    @profiled
+    @replica_read
+    def get_similar_suppliers(self, **kwargs):
+        """
+        GET /api/suppliers/similar - Check for likely duplicates before creating a supplier
+
+        Query Parameters:
+        - name: Supplier name to check (required)
+        - email: Email to check (optional)
+        - phone: Phone number to check (optional)
+        """
+        try:
+            if not kwargs.get('name'):
+                return error_response('Query parameter "name" is required', 400)
+
+            similar = request.env['material.supplier'].find_similar_suppliers(
+                kwargs['name'], kwargs.get('email'), kwargs.get('phone'))
+
+            response_data = {
+                'success': True,
+                'data': similar,
+                'message': f'Found {len(similar)} similar suppliers'
+            }
+
+            return request.make_response(
+                json.dumps(response_data),
+                headers=[('Content-Type', 'application/json')]
+            )
+
+        except Exception as e:
+            _logger.error(f"Error checking similar suppliers: {str(e)}")
+            return error_response(str(e), 500)
 
     @http.route('/api/suppliers/dropdown', type='http', auth='user', methods=['GET'], csrf=False)
+    @audited
+    @profiled
+    @replica_read
     def get_suppliers_dropdown(self, **kwargs):
         """GET /api/suppliers/dropdown - Get suppliers for dropdown selection."""
         try:
@@ -317,11 +518,165 @@ class SupplierController(http.Controller):
 
         except Exception as e:
             _logger.error(f"Error retrieving suppliers dropdown: {str(e)}")
-            return self._error_response(str(e), 500)
-
-    def _error_response(self, message, status_code=400):
-        """Helper method to create error responses."""
-        data = {'success': False, 'error': message}
-        response = request.make_response(json.dumps(data), headers=[('Content-Type', 'application/json')])
-        response.status_code = status_code
-        return response 
\ No newline at end of file
+            return error_response(str(e), 500)
+
+    @http.route('/api/suppliers/query', type='http', auth='user', methods=['POST'], csrf=False)
+    @audited
+    @profiled
+    @replica_read
+    def query_suppliers(self, **kwargs):
+        """
+        POST /api/suppliers/query - Suppliers with a selection of their materials, in one call
+
+        Request Body (JSON, every key optional):
+        {
+            "search": "acme", "min_avg_price": 100, "max_avg_price": 500, "ids": [1, 2],
+            "fields": ["name", "currency", "material_count"],
+            "limit": 100, "offset": 0, "order": "name",
+            "currency": "EUR",
+            "materials": {
+                "fields": ["material_code", "material_buy_price"],
+                "limit": 20,
+                "order": "material_buy_price desc",
+                "material_type": "fabric",
+                "price_category": "premium"
+            }
+        }
+
+        Materials of all the returned suppliers are loaded together, so the
+        cost does not depend on the number of suppliers. "materials.limit"
+        caps the materials listed per supplier (default 20).
+        """
+        try:
+            body = json_body()
+            if not isinstance(body, dict):
+                raise ValueError('Request body must be a JSON object')
+            to_currency = requested_currency(request.env, body)
+            material_spec = body.get('materials') or {}
+            if not isinstance(material_spec, dict):
+                raise ValueError('materials must be an object')
+
+            fields = self._parse_query_fields(body.get('fields'), QUERY_SUPPLIER_FIELDS, 'fields')
+            material_fields = self._parse_query_fields(material_spec.get('fields'), QUERY_MATERIAL_FIELDS,
+                                                       'materials.fields')
+            material_limit = int(material_spec.get('limit', DEFAULT_MATERIALS_PER_SUPPLIER))
+            if not 0 <= material_limit <= MAX_MATERIALS_PER_SUPPLIER:
+                raise ValueError(f'materials.limit must be between 0 and {MAX_MATERIALS_PER_SUPPLIER}')
+            material_order = self._parse_material_order(material_spec.get('order'))
+            limit = int(body.get('limit', 100))
+            offset = int(body.get('offset', 0))
+            order = self._parse_order(body.get('order'))
+
+            Supplier = request.env['material.supplier']
+            domain = Supplier._get_api_domain(body.get('search'), body.get('min_avg_price'), body.get('max_avg_price'))
+            if body.get('ids'):
+                domain.append(('id', 'in', [int(i) for i in body['ids']]))
+            material_domain = request.env['material.registration']._get_api_domain(
+                material_spec.get('material_type'), material_spec.get('price_category'))
+
+            # Currencies are always read: prices are converted with them
+            read_fields = [f for f in fields if f != 'currency'] + ['currency_id']
+            rows = Supplier.read_with_materials(
+                domain, read_fields, material_fields, material_limit,
+                material_domain=material_domain, material_order=material_order,
+                limit=limit, offset=offset, order=order,
+            )
+
+            suppliers_data = []
+            for row in rows:
+                item = {'id': row['id']}
+                for field in fields:
+                    item[field] = row['currency_id'][1] if field == 'currency' else self._jsonable(row[field])
+                item['materials'] = [
+                    dict({'id': m['id']}, **{f: self._jsonable(m[f]) for f in material_fields})
+                    for m in row['materials']
+                ]
+                suppliers_data.append(item)
+
+            if to_currency:
+                currency_ids = [row['currency_id'][0] for row in rows]
+                price_fields = [f for f in PRICE_AGGREGATE_FIELDS if f in fields]
+                convert_page(request.env, suppliers_data, currency_ids, price_fields, to_currency)
+                if 'material_buy_price' in material_fields:
+                    # Materials are quoted in their supplier's currency
+                    materials = [m for item in suppliers_data for m in item['materials']]
+                    material_currency_ids = [cid for item, cid in zip(suppliers_data, currency_ids)
+                                             for _m in item['materials']]
+                    convert_page(request.env, materials, material_currency_ids, ['material_buy_price'], to_currency)
+
+            return json_response({
+                'success': True,
+                'data': suppliers_data,
+                'limit': limit,
+                'offset': offset,
+                'message': f'Retrieved {len(suppliers_data)} suppliers successfully'
+            })
+
+        except (ValueError, TypeError, ValidationError) as e:
+            return error_response(str(e), 400)
+        except Exception as e:
+            _logger.error(f"Error querying suppliers: {str(e)}")
+            return error_response(str(e), 500)
+
+    def _parse_query_fields(self, requested, allowed, name):
+        """Validate a field selection; all ``allowed`` fields when none is given."""
+        if requested is None:
+            return list(allowed)
+        if not isinstance(requested, list) or any(f not in allowed for f in requested):
+            raise ValueError(f'{name} must be a list of: {", ".join(allowed)}')
+        return list(dict.fromkeys(requested))
+
+    def _parse_material_order(self, order_param):
+        """Validate the sort order of the materials listed per supplier."""
+        if not order_param:
+            return None
+        parts = order_param.split()
+        if parts[0] not in QUERY_MATERIAL_ORDER_FIELDS or len(parts) > 2 or (
+                len(parts) == 2 and parts[1].lower() not in ('asc', 'desc')):
+            raise ValueError(f'materials.order must be one of: {", ".join(QUERY_MATERIAL_ORDER_FIELDS)}, '
+                             f'optionally followed by asc or desc')
+        return ' '.join(parts)
+
+    def _jsonable(self, value):
+        """Render a ``read`` value for JSON, dates as ISO strings."""
+        if hasattr(value, 'isoformat'):
+            return value.isoformat()
+        return value
+
+    def _get_suppliers_by_ids(self, ids_param, to_currency=None):
+        """Return the suppliers listed in ``ids_param`` in one response, preserving order."""
+        try:
+            supplier_ids = parse_ids(ids_param)
+        except ValueError as e:
+            return error_response(str(e), 400)
+
+        Supplier = request.env['material.supplier']
+        summaries, missing_ids = Supplier.get_supplier_summaries(supplier_ids)
+        if to_currency:
+            currency_ids = [s.currency_id.id for s in Supplier.browse([s['id'] for s in summaries])]
+            convert_page(request.env, summaries, currency_ids, PRICE_AGGREGATE_FIELDS, to_currency)
+            # Materials are quoted in their supplier's currency
+            materials = [m for summary in summaries for m in summary['materials']]
+            material_currency_ids = [cid for summary, cid in zip(summaries, currency_ids)
+                                     for _m in summary['materials']]
+            convert_page(request.env, materials, material_currency_ids, ['material_buy_price'], to_currency)
+        response_data = {
+            'success': True,
+            'data': summaries,
+            'missing_ids': missing_ids,
+            'message': f'Retrieved {len(summaries)} suppliers successfully'
+        }
+        return request.make_response(
+            json.dumps(response_data),
+            headers=[('Content-Type', 'application/json')]
+        )
+
+    def _parse_order(self, order_param):
+        """Validate a client-supplied sort order against the sortable fields."""
+        if not order_param:
+            return None
+        parts = order_param.split()
+        if parts[0] not in SORTABLE_FIELDS or len(parts) > 2 or (
+                len(parts) == 2 and parts[1].lower() not in ('asc', 'desc')):
+            raise ValueError(f'order must be one of: {", ".join(SORTABLE_FIELDS)}, optionally followed by asc or desc')
+        return ' '.join(parts) + ', id'
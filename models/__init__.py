@@ -1,4 +1,13 @@
 # -*- coding: utf-8 -*-
 
+from . import concurrency
+from . import outbox
+from . import currency_rate
+from . import price_band
 from . import supplier
-from . import material 
\ No newline at end of file
+from . import material
+from . import stock
+from . import catalog
+from . import audit
+from . import profile
+from . import integrity
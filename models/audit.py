@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+
+import datetime
+import logging
+
+from odoo import api, fields, models
+
+_logger = logging.getLogger(__name__)
+
+RETENTION_PARAM = 'material_registration.audit_retention_days'
+DEFAULT_RETENTION_DAYS = 90
+
+# Rows deleted per statement by the retention purge
+PURGE_BATCH_SIZE = 10000
+
+
+def insert_audit_entries(cr, entries):
+    """Write audit ``entries`` (dicts) with a single INSERT on ``cr``."""
+    if not entries:
+        return
+    cr.execute("""
+        INSERT INTO material_api_audit (date, user_id, login, method, path, params, status, duration_ms, remote_addr)
+        SELECT * FROM unnest(%s::timestamp[], %s::int[], %s::varchar[], %s::varchar[], %s::varchar[],
+                             %s::text[], %s::int[], %s::float8[], %s::varchar[])
+    """, [
+        [entry[key] for entry in entries]
+        for key in ('date', 'user_id', 'login', 'method', 'path', 'params', 'status', 'duration_ms', 'remote_addr')
+    ])
+
+
+class ApiAudit(models.Model):
+    """Append-only record of REST API calls: who called what, with which parameters and outcome.
+
+    Rows are buffered per worker and written in bulk by
+    ``controllers/audit.py``, so requests never wait on this table.
+    """
+    _name = 'material.api.audit'
+    _description = 'API Audit Entry'
+    _order = 'date desc, id desc'
+    _rec_name = 'path'
+    _log_access = False
+
+    date = fields.Datetime(string='Date', required=True, readonly=True)
+    user_id = fields.Many2one('res.users', string='User', readonly=True, ondelete='set null')
+    login = fields.Char(string='Login', readonly=True, help='Kept when the user is deleted')
+    method = fields.Char(string='Method', readonly=True)
+    path = fields.Char(string='Path', readonly=True)
+    params = fields.Text(string='Parameters', readonly=True, help='Query and body parameters, as JSON (truncated)')
+    status = fields.Integer(string='Status', readonly=True)
+    duration_ms = fields.Float(string='Duration (ms)', readonly=True, digits=(16, 1))
+    remote_addr = fields.Char(string='Remote Address', readonly=True)
+
+    def init(self):
+        """Index the log for time range queries and purges.
+
+        Rows arrive in time order, so a BRIN index on ``date`` stays tiny and
+        cheap to maintain while still narrowing range scans to a few pages.
+        """
+        cr = self.env.cr
+        cr.execute("""
+            CREATE INDEX IF NOT EXISTS material_api_audit_date_brin_idx
+                ON material_api_audit USING brin (date)
+        """)
+        cr.execute("""
+            CREATE INDEX IF NOT EXISTS material_api_audit_user_date_idx
+                ON material_api_audit (user_id, date)
+        """)
+
+    @api.model
+    def _purge_expired(self, retention_days=None, auto_commit=False):
+        """Delete entries older than the retention period in batches; return how many were deleted.
+
+        The period is ``material_registration.audit_retention_days`` days
+        (default 90). With ``auto_commit`` every batch is committed, as the
+        cron does, so the purge never holds long locks.
+        """
+        if retention_days is None:
+            retention_days = int(self.env['ir.config_parameter'].sudo().get_param(
+                RETENTION_PARAM, DEFAULT_RETENTION_DAYS))
+        cutoff = fields.Datetime.now() - datetime.timedelta(days=retention_days)
+        cr = self.env.cr
+        total = 0
+        while True:
+            cr.execute("""
+                DELETE FROM material_api_audit
+                 WHERE id IN (SELECT id FROM material_api_audit WHERE date < %s LIMIT %s)
+            """, (cutoff, PURGE_BATCH_SIZE))
+            deleted = cr.rowcount
+            total += deleted
+            if auto_commit:
+                cr.commit()
+            if deleted < PURGE_BATCH_SIZE:
+                break
+        if total:
+            _logger.info("Purged %d API audit entries older than %s", total, cutoff)
+        return total
+
+    @api.model
+    def _cron_purge_expired(self):
+        self._purge_expired(auto_commit=True)
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+
+import json
+import logging
+import time
+from collections import defaultdict
+
+from odoo import api, fields, models
+
+_logger = logging.getLogger(__name__)
+
+# Snapshots regenerated per batch by the refresh cron
+REFRESH_BATCH_SIZE = 200
+
+
+class SupplierCatalog(models.Model):
+    """Pre-encoded JSON detail of a supplier and its materials, as served by GET /api/suppliers/<id>.
+
+    Changes to a supplier or its materials only bump ``revision`` and set
+    ``stale_since``; the body is rebuilt in the background by a cron, so a
+    detail request reads one row however many materials the supplier has.
+    """
+    _name = 'material.supplier.catalog'
+    _description = 'Supplier Catalog Snapshot'
+    _rec_name = 'supplier_id'
+    _log_access = False
+
+    supplier_id = fields.Many2one(
+        'material.supplier',
+        string='Supplier',
+        required=True,
+        ondelete='cascade',
+        index=True
+    )
+    body = fields.Text(string='JSON Body', readonly=True)
+    version = fields.Char(string='Supplier Version', readonly=True, help='Version of the supplier the body was built from')
+    generated_at = fields.Datetime(string='Generated At', readonly=True)
+    stale_since = fields.Datetime(
+        string='Stale Since',
+        readonly=True,
+        help='First change not reflected in the body yet; empty when the body is current'
+    )
+    revision = fields.Integer(string='Revision', readonly=True, default=0)
+
+    _sql_constraints = [
+        ('supplier_unique', 'UNIQUE(supplier_id)', 'A supplier has a single catalog snapshot.'),
+    ]
+
+    def init(self):
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS material_supplier_catalog_stale_idx
+                ON material_supplier_catalog (stale_since) WHERE stale_since IS NOT NULL
+        """)
+
+    @api.model
+    def _mark_stale(self, supplier_ids):
+        """Flag the snapshots of ``supplier_ids`` for regeneration, with one UPDATE."""
+        supplier_ids = [supplier_id for supplier_id in set(supplier_ids) if supplier_id]
+        if not supplier_ids:
+            return
+        self.env.cr.execute("""
+            UPDATE material_supplier_catalog
+               SET revision = revision + 1,
+                   stale_since = COALESCE(stale_since, now() at time zone 'UTC')
+             WHERE supplier_id = ANY(%s)
+        """, (supplier_ids,))
+
+    @api.model
+    def _get_snapshot(self, supplier_id):
+        """Return ``(body, version, generated_at, stale_since)`` of a supplier, or None if not built yet."""
+        self.env.cr.execute("""
+            SELECT body, version, generated_at, stale_since
+              FROM material_supplier_catalog
+             WHERE supplier_id = %s AND body IS NOT NULL
+        """, (supplier_id,))
+        return self.env.cr.fetchone()
+
+    @api.model
+    def _build_bodies(self, supplier_ids):
+        """Return {supplier_id: (detail dict, version)} with one search per model."""
+        suppliers = self.env['material.supplier'].search([('id', 'in', list(supplier_ids))])
+        materials = self.env['material.registration'].search([('supplier_id', 'in', suppliers.ids)])
+        materials_by_supplier = defaultdict(list)
+        for material in materials:
+            materials_by_supplier[material.supplier_id.id].append(material)
+        return {
+            supplier.id: (supplier.get_supplier_summary(materials_by_supplier[supplier.id]), supplier.get_version())
+            for supplier in suppliers
+        }
+
+    @api.model
+    def _refresh(self, limit=REFRESH_BATCH_SIZE):
+        """Rebuild up to ``limit`` stale snapshots, oldest change first; return how many were written.
+
+        A snapshot is only marked current if no change arrived while it was
+        being built; otherwise it stays stale for the next run.
+        """
+        cr = self.env.cr
+        # Suppliers created since the last run, including through raw SQL
+        cr.execute("""
+            INSERT INTO material_supplier_catalog (supplier_id, revision, stale_since)
+            SELECT supplier.id, 0, now() at time zone 'UTC'
+              FROM material_supplier supplier
+             WHERE NOT EXISTS (SELECT 1 FROM material_supplier_catalog c WHERE c.supplier_id = supplier.id)
+        """)
+        cr.execute("""
+            SELECT supplier_id, revision
+              FROM material_supplier_catalog
+             WHERE stale_since IS NOT NULL
+          ORDER BY stale_since
+             LIMIT %s
+        """, (limit,))
+        revisions = dict(cr.fetchall())
+        if not revisions:
+            return 0
+        built = self._build_bodies(revisions)
+        supplier_ids = list(built)
+        cr.execute("""
+            UPDATE material_supplier_catalog catalog
+               SET body = built.body,
+                   version = built.version,
+                   generated_at = now() at time zone 'UTC',
+                   stale_since = NULL
+              FROM unnest(%s::int[], %s::int[], %s::text[], %s::varchar[]) AS built(supplier_id, revision, body, version)
+             WHERE catalog.supplier_id = built.supplier_id
+               AND catalog.revision = built.revision
+        """, (
+            supplier_ids,
+            [revisions[supplier_id] for supplier_id in supplier_ids],
+            [json.dumps(built[supplier_id][0]) for supplier_id in supplier_ids],
+            [built[supplier_id][1] for supplier_id in supplier_ids],
+        ))
+        return cr.rowcount
+
+    @api.model
+    def _cron_refresh(self, time_budget=50):
+        """Regenerate stale snapshots in committed batches until none is left or time runs out."""
+        deadline = time.monotonic() + time_budget
+        total = 0
+        while time.monotonic() < deadline:
+            count = self._refresh()
+            self.env.cr.commit()
+            total += count
+            if count < REFRESH_BATCH_SIZE:
+                break
+        if total:
+            _logger.info("Regenerated %d supplier catalog snapshots", total)
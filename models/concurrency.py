@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+
+import datetime
+
+from psycopg2 import errorcodes, OperationalError
+
+from odoo import models
+
+# Format of the version token derived from write_date (microsecond precision)
+VERSION_FORMAT = '%Y-%m-%dT%H:%M:%S.%f'
+
+
+class ConcurrencyMixin(models.AbstractModel):
+    _name = 'material.concurrency.mixin'
+    _description = 'Optimistic Concurrency Support'
+
+    def get_version(self):
+        """Return the version token of this record, derived from write_date."""
+        self.ensure_one()
+        return self.write_date.strftime(VERSION_FORMAT) if self.write_date else None
+
+    @staticmethod
+    def parse_version(version):
+        """Parse a version token back to a datetime, or return None if malformed."""
+        try:
+            return datetime.datetime.strptime(version, VERSION_FORMAT)
+        except (TypeError, ValueError):
+            return None
+
+    def _lock_if_unmodified(self, version=None, unmodified_since=None):
+        """Lock this record for update if it still matches the client's precondition.
+
+        Check and lock happen in one ``SELECT ... FOR UPDATE NOWAIT``, so a
+        concurrent writer holding the row makes this fail at once instead of
+        waiting. Returns True when the record is locked and unchanged, False
+        when it was modified, deleted or is being modified right now.
+        """
+        self.ensure_one()
+        self.flush()
+        conditions = ['id = %s']
+        params = [self.id]
+        if version is not None:
+            expected = self.parse_version(version)
+            if expected is None:
+                return False
+            conditions.append('write_date = %s')
+            params.append(expected)
+        if unmodified_since is not None:
+            # HTTP dates have second precision
+            conditions.append('write_date < %s')
+            params.append(unmodified_since + datetime.timedelta(seconds=1))
+        try:
+            with self.env.cr.savepoint():
+                self.env.cr.execute(
+                    'SELECT id FROM "%s" WHERE %s FOR UPDATE NOWAIT' % (self._table, ' AND '.join(conditions)),
+                    params,
+                    log_exceptions=False
+                )
+                return bool(self.env.cr.fetchone())
+        except OperationalError as e:
+            if e.pgcode == errorcodes.LOCK_NOT_AVAILABLE:
+                return False
+            raise
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+
+from odoo import api, fields, models, tools, _
+from odoo.exceptions import ValidationError
+
+BASE_CURRENCY_PARAM = 'material_registration.base_currency'
+
+
+def base_price_sql(price, currency):
+    """Return an SQL expression converting the ``price`` column, quoted in ``currency``, to the base currency.
+
+    It takes the named parameters returned by ``_get_base_price_params``
+    and matches ``_convert_amounts``: same factors, same rounding. It is
+    NULL for a currency without a rate.
+    """
+    return f"""(CASE WHEN {currency} = %(base_currency_id)s THEN {price}
+                     ELSE round(({price} * (%(rate_factors)s::float8[])[
+                                    array_position(%(rate_currency_ids)s::int[], {currency})])::numeric,
+                                %(base_digits)s) END)"""
+
+
+class CurrencyRate(models.Model):
+    _name = 'material.currency.rate'
+    _description = 'Material Currency Rate'
+    _order = 'date desc, currency_id'
+    _rec_name = 'currency_id'
+
+    currency_id = fields.Many2one(
+        'res.currency',
+        string='Currency',
+        required=True,
+        ondelete='cascade',
+        help='Currency this rate applies to'
+    )
+    date = fields.Date(
+        string='Effective Date',
+        required=True,
+        default=fields.Date.context_today,
+        help='The rate applies from this date until the next rate of the same currency'
+    )
+    rate = fields.Float(
+        string='Rate',
+        required=True,
+        digits=(12, 6),
+        help='Units of this currency for one unit of the base currency'
+    )
+
+    _sql_constraints = [
+        ('currency_date_unique', 'UNIQUE(currency_id, date)', 'Only one rate per currency and date is allowed.'),
+        ('rate_positive', 'CHECK(rate > 0)', 'The rate must be positive.'),
+    ]
+
+    @tools.ormcache('date')
+    def _get_rates(self, date):
+        """Return ((currency_id, rate), ...) in effect on ``date``, cached per process and date."""
+        self.flush(['currency_id', 'date', 'rate'])
+        self.env.cr.execute("""
+            SELECT DISTINCT ON (currency_id) currency_id, rate
+              FROM material_currency_rate
+             WHERE date <= %s
+          ORDER BY currency_id, date DESC
+        """, (date,))
+        return tuple(self.env.cr.fetchall())
+
+    @tools.ormcache('code')
+    def _get_currency_id(self, code):
+        """Return the ID of the currency with ISO ``code``, or None."""
+        currency = self.env['res.currency'].with_context(active_test=False).search([('name', '=', code)], limit=1)
+        return currency.id or None
+
+    @api.model
+    def _get_currency(self, code):
+        """Return the currency with ISO ``code``, or raise a ValidationError."""
+        currency_id = self._get_currency_id((code or '').strip().upper())
+        if not currency_id:
+            raise ValidationError(_('Unknown currency "%s".') % code)
+        return self.env['res.currency'].browse(currency_id)
+
+    @api.model
+    def _get_base_currency(self):
+        """Currency in which the minimum buy price is enforced.
+
+        Set with the ``material_registration.base_currency`` system parameter
+        (an ISO code); defaults to the company currency.
+        """
+        code = self.env['ir.config_parameter'].sudo().get_param(BASE_CURRENCY_PARAM)
+        if code:
+            return self._get_currency(code)
+        return self.env.company.currency_id
+
+    @api.model
+    def _convert_amounts(self, amounts, currency_ids, to_currency, date=None):
+        """Convert ``amounts``, each quoted in the matching entry of ``currency_ids``, to ``to_currency``.
+
+        Rates are looked up once for the whole list, so a page of records
+        costs the same as a single one. The base currency needs no rate of
+        its own. ``None`` amounts are passed through.
+        """
+        date = date or fields.Date.context_today(self)
+        rates = dict(self._get_rates(date))
+        base_currency_id = self._get_base_currency().id
+
+        def rate_of(currency_id):
+            if currency_id in rates:
+                return rates[currency_id]
+            if currency_id == base_currency_id:
+                return 1.0
+            raise ValidationError(_('No exchange rate for %s on %s.') % (
+                self.env['res.currency'].browse(currency_id).name, date))
+
+        factors = {}
+        converted = []
+        for amount, currency_id in zip(amounts, currency_ids):
+            if amount is None or currency_id == to_currency.id:
+                converted.append(amount)
+                continue
+            if currency_id not in factors:
+                factors[currency_id] = rate_of(to_currency.id) / rate_of(currency_id)
+            converted.append(to_currency.round(amount * factors[currency_id]))
+        return converted
+
+    @api.model
+    def _get_base_price_params(self, date=None):
+        """Return the named query parameters of ``base_price_sql`` expressions for the rates on ``date``."""
+        rates = dict(self._get_rates(date or fields.Date.context_today(self)))
+        base_currency = self._get_base_currency()
+        base_rate = rates.pop(base_currency.id, 1.0)
+        return {
+            'base_currency_id': base_currency.id,
+            'base_digits': base_currency.decimal_places,
+            'rate_currency_ids': list(rates),
+            'rate_factors': [base_rate / rate for rate in rates.values()],
+        }
+
+    @api.model
+    def _convert(self, amount, from_currency, to_currency, date=None):
+        """Convert a single ``amount`` from ``from_currency`` to ``to_currency``."""
+        return self._convert_amounts([amount], [from_currency.id], to_currency, date)[0]
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        rates = super(CurrencyRate, self).create(vals_list)
+        self.clear_caches()
+        self.env['material.price.band']._recompute_material_bands()
+        return rates
+
+    def write(self, vals):
+        res = super(CurrencyRate, self).write(vals)
+        self.clear_caches()
+        self.env['material.price.band']._recompute_material_bands()
+        return res
+
+    def unlink(self):
+        res = super(CurrencyRate, self).unlink()
+        self.clear_caches()
+        self.env['material.price.band']._recompute_material_bands()
+        return res
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+
+import datetime
+import json
+import logging
+import time
+
+from odoo import api, fields, models
+
+from .currency_rate import base_price_sql
+
+_logger = logging.getLogger(__name__)
+
+# Rows compared (and at most repaired) per statement
+REPAIR_CHUNK_SIZE = 5000
+
+# Repaired rows listed per check in the run report
+REPORT_SAMPLE_SIZE = 100
+
+# The cron starts a new full pass once the last one finished this long ago
+REPAIR_INTERVAL = datetime.timedelta(days=1)
+
+# Stored values checked, in order: (name, model, column, query). Each query
+# returns (id, supplier_id, stored value, expected value) for the rows of
+# its table with %(start)s < id <= %(end)s. Price bands are checked on the
+# buy price in the base currency, at the current rates.
+INTEGRITY_CHECKS = [
+    ('supplier_name', 'material.registration', 'supplier_name', """
+        SELECT m.id, m.supplier_id, m.supplier_name, s.name
+          FROM material_registration m
+          JOIN material_supplier s ON s.id = m.supplier_id
+         WHERE m.id > %(start)s AND m.id <= %(end)s
+    """),
+    ('price_band_id', 'material.registration', 'price_band_id', """
+        SELECT m.id, m.supplier_id, m.price_band_id,
+               (SELECT b.id FROM material_price_band b
+                 WHERE b.min_price <= %s
+              ORDER BY b.min_price DESC LIMIT 1)
+          FROM material_registration m
+         WHERE m.id > %%(start)s AND m.id <= %%(end)s
+    """ % base_price_sql('m.material_buy_price', 'm.currency_id')),
+    ('material_count', 'material.supplier', 'material_count', """
+        SELECT s.id, s.id, s.material_count, COALESCE(c.total, 0)::int
+          FROM material_supplier s
+     LEFT JOIN (SELECT supplier_id, COUNT(*) AS total
+                  FROM material_registration
+                 WHERE active AND supplier_id > %(start)s AND supplier_id <= %(end)s
+              GROUP BY supplier_id) c ON c.supplier_id = s.id
+         WHERE s.id > %(start)s AND s.id <= %(end)s
+    """),
+]
+
+
+class IntegrityRun(models.Model):
+    """One pass of the integrity repair over the stored denormalized fields.
+
+    Each check walks its table in ID order, one chunk per statement: the
+    rows whose stored value differs from the value it is derived from are
+    updated in place and returned with their old and new values. The run
+    records its position after every chunk, in the same transaction as the
+    fixes, so an interrupted pass resumes where it stopped.
+    """
+    _name = 'material.integrity.run'
+    _description = 'Integrity Repair Run'
+    _order = 'id desc'
+    _rec_name = 'started_at'
+
+    state = fields.Selection([
+        ('running', 'Running'),
+        ('done', 'Done'),
+    ], string='State', required=True, default='running', readonly=True)
+    started_at = fields.Datetime(string='Started At', required=True, readonly=True, default=fields.Datetime.now)
+    finished_at = fields.Datetime(string='Finished At', readonly=True)
+    check_name = fields.Char(string='Current Check', readonly=True, help='Empty once every check has run')
+    last_id = fields.Integer(string='Position', readonly=True, help='Rows up to this ID have been checked')
+    rows_checked = fields.Integer(string='Rows Checked', readonly=True)
+    rows_fixed = fields.Integer(string='Rows Fixed', readonly=True)
+    report = fields.Text(
+        string='Report',
+        readonly=True,
+        help='Rows fixed per check, with the first repaired values (JSON)'
+    )
+
+    @api.model
+    def _get_or_start(self, restart=False):
+        """Return the unfinished run, or a new one if there is none or ``restart`` is set."""
+        run = self.search([('state', '=', 'running')], limit=1)
+        if run and restart:
+            run.write({'state': 'done', 'finished_at': fields.Datetime.now()})
+            run = self.browse()
+        return run or self.create({'check_name': INTEGRITY_CHECKS[0][0], 'last_id': 0, 'report': '{}'})
+
+    def _step(self, chunk_size=REPAIR_CHUNK_SIZE):
+        """Check and repair the next chunk of the current check; return False once the run is done."""
+        self.ensure_one()
+        names = [check[0] for check in INTEGRITY_CHECKS]
+        index = names.index(self.check_name)
+        name, model_name, column, query = INTEGRITY_CHECKS[index]
+        Model = self.env[model_name]
+        cr = self.env.cr
+
+        cr.execute(f"SELECT MAX(id), COUNT(*) FROM (SELECT id FROM {Model._table} WHERE id > %s "
+                   f"ORDER BY id LIMIT %s) chunk", (self.last_id, chunk_size))
+        end, count = cr.fetchone()
+        if end is None:
+            if index + 1 < len(names):
+                self.write({'check_name': names[index + 1], 'last_id': 0})
+                return True
+            self.write({'state': 'done', 'check_name': False, 'finished_at': fields.Datetime.now()})
+            return False
+
+        Model.flush([column])
+        self.env['material.registration'].flush(['supplier_id', 'material_buy_price', 'currency_id', 'active'])
+        self.env['material.price.band'].flush(['min_price'])
+        cr.execute(f"""
+            WITH expected AS ({query})
+            UPDATE {Model._table} t
+               SET {column} = e.new_value
+              FROM expected e (id, supplier_id, old_value, new_value)
+             WHERE t.id = e.id AND t.{column} IS DISTINCT FROM e.new_value
+         RETURNING t.id, e.supplier_id, e.old_value, e.new_value
+        """, dict(self.env['material.currency.rate']._get_base_price_params(), start=self.last_id, end=end))
+        fixed = cr.fetchall()
+        if fixed:
+            Model.invalidate_cache([column], [row[0] for row in fixed])
+            self.env['material.supplier.catalog']._mark_stale([row[1] for row in fixed])
+            _logger.info("Integrity repair fixed %d %s values (ids %d-%d)", len(fixed), name, self.last_id + 1, end)
+
+        report = json.loads(self.report or '{}')
+        entry = report.setdefault(name, {'checked': 0, 'fixed': 0, 'samples': []})
+        entry['checked'] += count
+        entry['fixed'] += len(fixed)
+        room = REPORT_SAMPLE_SIZE - len(entry['samples'])
+        entry['samples'].extend({'id': row[0], 'old': row[2], 'new': row[3]} for row in fixed[:max(room, 0)])
+        self.write({
+            'last_id': end,
+            'rows_checked': self.rows_checked + count,
+            'rows_fixed': self.rows_fixed + len(fixed),
+            'report': json.dumps(report),
+        })
+        return True
+
+    def _run(self, chunk_size=REPAIR_CHUNK_SIZE, time_budget=50, auto_commit=False):
+        """Process chunks until the run is done or ``time_budget`` seconds are spent.
+
+        At least one chunk is processed per call. With ``auto_commit`` every
+        chunk is committed with the run's new position, as the cron does.
+        """
+        self.ensure_one()
+        deadline = time.monotonic() + time_budget
+        while True:
+            more = self._step(chunk_size)
+            if auto_commit:
+                self.env.cr.commit()
+            if not more or time.monotonic() >= deadline:
+                return more
+
+    def _get_api_data(self):
+        """Return the run as served by the /api/integrity endpoints."""
+        self.ensure_one()
+        return {
+            'id': self.id,
+            'state': self.state,
+            'started_at': fields.Datetime.to_string(self.started_at),
+            'finished_at': fields.Datetime.to_string(self.finished_at) if self.finished_at else None,
+            'check': self.check_name or None,
+            'last_id': self.last_id,
+            'rows_checked': self.rows_checked,
+            'rows_fixed': self.rows_fixed,
+            'report': json.loads(self.report or '{}'),
+        }
+
+    @api.model
+    def _cron_repair(self):
+        """Resume the unfinished run, or start a new pass once a day."""
+        run = self.search([('state', '=', 'running')], limit=1)
+        if not run:
+            last = self.search([('state', '=', 'done')], limit=1)
+            if last and last.finished_at and fields.Datetime.now() - last.finished_at < REPAIR_INTERVAL:
+                return
+            run = self._get_or_start()
+        run._run(auto_commit=True)
@@ -1,19 +1,86 @@
 # -*- coding: utf-8 -*-
 
+import re
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
 from odoo import api, fields, models, _
 from odoo.exceptions import ValidationError
 
+# Minimum buy price, in the base currency (see material.currency.rate)
+MINIMUM_BUY_PRICE = 100
+
+_NON_ALPHANUMERIC = re.compile(r'[^0-9a-z]+')
+
+
+def equivalence_key(material_name, material_type, group=None):
+    """Key shared by equivalent materials: the manual group, else the normalized type and name.
+
+    Case, punctuation and spacing are ignored, so "Denim 12-oz" and
+    "denim 12 OZ" of the same type are equivalent.
+    """
+    def normalize(text):
+        return _NON_ALPHANUMERIC.sub(' ', (text or '').lower()).strip()
+
+    if group and normalize(group):
+        return f'group:{normalize(group)}'
+    return f'{material_type or ""}:{normalize(material_name)}'
+
+
+class _PrefixCache(object):
+    """Small per-process LRU cache of autocomplete results keyed by prefix.
+
+    Entries expire after ``ttl`` seconds so that writes made by other worker
+    processes become visible without cross-process invalidation; writes in
+    this process clear the cache immediately.
+    """
+
+    def __init__(self, size=256, ttl=30.0):
+        self.size = size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def clear(self, dbname):
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == dbname]:
+                del self._entries[key]
+
+
+_autocomplete_cache = _PrefixCache()
+
 
 class Material(models.Model):
     _name = 'material.registration'
+    _inherit = ['material.concurrency.mixin', 'material.outbox.mixin']
     _description = 'Material Registration'
     _order = 'material_code'
     _rec_name = 'material_name'
+    _stream_key_fields = ('supplier_id', 'material_type')
 
     material_code = fields.Char(
         string='Material Code',
         required=True,
-        index=True,
         help='Unique code for the material'
     )
     material_name = fields.Char(
@@ -31,7 +98,18 @@ class Material(models.Model):
         string='Material Buy Price',
         required=True,
         digits=(16, 2),
-        help='Purchase price of the material (minimum 100)'
+        help='Purchase price of the material, in the supplier currency (minimum 100 in the base currency)'
+    )
+    currency_id = fields.Many2one(
+        related='supplier_id.currency_id',
+        string='Currency',
+        readonly=True,
+        store=True
+    )
+    active = fields.Boolean(
+        string='Active',
+        default=True,
+        help='Archived materials are hidden from listings and searches but kept for reference'
     )
     supplier_id = fields.Many2one(
         'material.supplier',
@@ -48,24 +126,66 @@ class Material(models.Model):
     )
 
     # Additional computed fields for better UX
+    price_band_id = fields.Many2one(
+        'material.price.band',
+        string='Price Band',
+        compute='_compute_price_band',
+        store=True,
+        index=True,
+        ondelete='set null',
+        help='Configurable price band the buy price falls in'
+    )
     price_category = fields.Char(
         string='Price Category',
-        compute='_compute_price_category',
-        store=True
+        compute='_compute_price_category'
+    )
+    equivalence_group = fields.Char(
+        string='Equivalence Group',
+        help='Materials with the same group are sourced interchangeably; '
+             'when empty, materials of the same type with the same normalized name are'
+    )
+    equivalence_key = fields.Char(
+        string='Equivalence Key',
+        compute='_compute_equivalence_key',
+        store=True,
+        help='Key under which equivalent materials are compared for the best price'
+    )
+    stock_balance = fields.Float(
+        string='On Hand',
+        compute='_compute_stock_balance',
+        digits=(16, 3),
+        help='Quantity on hand from the stock ledger'
     )
 
-    @api.depends('material_buy_price')
+    @api.depends('equivalence_group', 'material_name', 'material_type')
+    def _compute_equivalence_key(self):
+        for material in self:
+            material.equivalence_key = equivalence_key(
+                material.material_name, material.material_type, material.equivalence_group)
+
+    @api.depends('material_buy_price', 'currency_id')
+    def _compute_price_band(self):
+        """Assign each material to the price band matching its buy price in the base currency."""
+        Band = self.env['material.price.band']
+        Rate = self.env['material.currency.rate']
+        base_currency = Rate._get_base_currency()
+        # Until a supplier is picked, the price is taken as quoted in the base currency
+        base_prices = Rate._convert_amounts(
+            self.mapped('material_buy_price'), [m.currency_id.id or base_currency.id for m in self], base_currency)
+        for material, base_price in zip(self, base_prices):
+            material.price_band_id = Band._find_band(base_price)
+
+    @api.depends('price_band_id.name')
     def _compute_price_category(self):
-        """Compute price category based on buy price."""
+        """Compute price category label from the price band."""
         for material in self:
-            if material.material_buy_price < 100:
-                material.price_category = 'Invalid (< 100)'
-            elif material.material_buy_price < 500:
-                material.price_category = 'Budget (100-499)'
-            elif material.material_buy_price < 1000:
-                material.price_category = 'Standard (500-999)'
-            else:
-                material.price_category = 'Premium (1000+)'
+            material.price_category = material.price_band_id.name or False
+
+    def _compute_stock_balance(self):
+        """Read on-hand quantities for all materials in self with one ledger query."""
+        balances = self.env['material.stock.move'].get_balances(self._origin.ids)
+        for material in self:
+            material.stock_balance = balances.get(material._origin.id, 0.0)
 
     @property
     def safe_supplier_name(self):
@@ -81,30 +201,39 @@ class Material(models.Model):
         except Exception:
             return None
 
-    @api.constrains('material_code')
+    @api.constrains('material_code', 'active')
     def _check_unique_material_code(self):
-        """Ensure material code is unique."""
-        for material in self:
-            if material.material_code:
-                existing = self.search([
-                    ('material_code', '=', material.material_code),
-                    ('id', '!=', material.id)
-                ])
-                if existing:
-                    raise ValidationError(_(
-                        'Material code must be unique. '
-                        'A material with code "%s" already exists.'
-                    ) % material.material_code)
-
-    @api.constrains('material_buy_price')
+        """Ensure material code is unique among active materials.
+
+        Checks the whole recordset with one grouped query.
+        """
+        codes = set(self.filtered(lambda m: m.active and m.material_code).mapped('material_code'))
+        if not codes:
+            return
+        # Archived duplicates do not count, even when written with active_test=False
+        groups = self.read_group([('material_code', 'in', list(codes)), ('active', '=', True)],
+                                 ['material_code'], ['material_code'])
+        duplicates = sorted(g['material_code'] for g in groups if g['material_code_count'] > 1)
+        if duplicates:
+            raise ValidationError(_(
+                'Material code must be unique. '
+                'A material with code "%s" already exists.'
+            ) % duplicates[0])
+
+    @api.constrains('material_buy_price', 'currency_id')
     def _check_minimum_price(self):
-        """Validate that material buy price is >= 100."""
-        for material in self:
-            if material.material_buy_price < 100:
+        """Validate that material buy price is >= 100 in the base currency."""
+        Rate = self.env['material.currency.rate']
+        base_currency = Rate._get_base_currency()
+        base_prices = Rate._convert_amounts(
+            self.mapped('material_buy_price'), [m.currency_id.id for m in self], base_currency)
+        for material, base_price in zip(self, base_prices):
+            if base_price < MINIMUM_BUY_PRICE:
                 raise ValidationError(_(
-                    'Material buy price must be at least 100. '
-                    'Current price: %.2f'
-                ) % material.material_buy_price)
+                    'Material buy price must be at least %s %s. '
+                    'Current price: %.2f %s'
+                ) % (MINIMUM_BUY_PRICE, base_currency.name,
+                     material.material_buy_price, material.currency_id.name or ''))
 
     @api.constrains('material_name')
     def _check_material_name(self):
@@ -113,28 +242,143 @@ class Material(models.Model):
             if not material.material_name or not material.material_name.strip():
                 raise ValidationError(_('Material name cannot be empty.'))
 
-    @api.model
-    def create(self, vals):
+    @api.model_create_multi
+    def create(self, vals_list):
         """Override create to add additional validations."""
         # Ensure all required fields are present
         required_fields = ['material_code', 'material_name', 'material_type', 
                           'material_buy_price', 'supplier_id']
-        for field in required_fields:
-            if not vals.get(field):
-                raise ValidationError(_('Field "%s" is required.') % field)
+        for vals in vals_list:
+            for field in required_fields:
+                if not vals.get(field):
+                    raise ValidationError(_('Field "%s" is required.') % field)
         
-        return super(Material, self).create(vals)
+        materials = super(Material, self).create(vals_list)
+        self._invalidate_autocomplete_cache()
+        return materials
 
     def write(self, vals):
-        """Override write to add additional validations."""
-        # If updating price, validate it
-        if 'material_buy_price' in vals and vals['material_buy_price'] < 100:
-            raise ValidationError(_(
-                'Material buy price must be at least 100. '
-                'Attempted price: %.2f'
-            ) % vals['material_buy_price'])
-        
-        return super(Material, self).write(vals)
+        """Override write to keep the autocomplete cache consistent.
+
+        The minimum price is enforced by ``_check_minimum_price``, in the
+        base currency.
+        """
+        res = super(Material, self).write(vals)
+        if {'material_code', 'material_name', 'active'} & set(vals):
+            self._invalidate_autocomplete_cache()
+        return res
+
+    def unlink(self):
+        """Override unlink to keep the autocomplete cache consistent."""
+        res = super(Material, self).unlink()
+        self._invalidate_autocomplete_cache()
+        return res
+
+    def init(self):
+        """Create partial indexes over active materials.
+
+        Listings, ``name_search``, autocomplete and the code uniqueness check
+        only look at active rows, so their indexes skip archived ones.
+        """
+        cr = self.env.cr
+        cr.execute("DROP INDEX IF EXISTS material_registration_code_prefix_idx")
+        cr.execute("DROP INDEX IF EXISTS material_registration_name_prefix_idx")
+        cr.execute("""
+            CREATE INDEX IF NOT EXISTS material_registration_code_active_idx
+                ON material_registration (material_code) WHERE active
+        """)
+        cr.execute("""
+            CREATE INDEX IF NOT EXISTS material_registration_type_code_active_idx
+                ON material_registration (material_type, material_code) WHERE active
+        """)
+        cr.execute("""
+            CREATE INDEX IF NOT EXISTS material_registration_band_code_active_idx
+                ON material_registration (price_band_id, material_code) WHERE active
+        """)
+        cr.execute("""
+            CREATE INDEX IF NOT EXISTS material_registration_code_prefix_active_idx
+                ON material_registration (lower(material_code) text_pattern_ops) WHERE active
+        """)
+        cr.execute("""
+            CREATE INDEX IF NOT EXISTS material_registration_name_prefix_active_idx
+                ON material_registration (lower(material_name) text_pattern_ops) WHERE active
+        """)
+        if self.env['material.supplier']._has_trigram_support():
+            cr.execute("""
+                CREATE INDEX IF NOT EXISTS material_registration_code_trgm_active_idx
+                    ON material_registration USING gin (material_code gin_trgm_ops) WHERE active
+            """)
+            cr.execute("""
+                CREATE INDEX IF NOT EXISTS material_registration_name_trgm_active_idx
+                    ON material_registration USING gin (material_name gin_trgm_ops) WHERE active
+            """)
+        # Supplier material counts and detail pages read a supplier's active materials
+        cr.execute("""
+            CREATE INDEX IF NOT EXISTS material_registration_supplier_active_idx
+                ON material_registration (supplier_id) WHERE active
+        """)
+        # Best-price lookups read the offers of a key in price order
+        cr.execute("""
+            CREATE INDEX IF NOT EXISTS material_registration_equivalence_price_active_idx
+                ON material_registration (equivalence_key, material_buy_price) WHERE active
+        """)
+
+    def _invalidate_autocomplete_cache(self):
+        """Drop cached autocomplete results now and again once the transaction commits."""
+        dbname = self.env.cr.dbname
+        _autocomplete_cache.clear(dbname)
+        self.env.cr.after('commit', lambda: _autocomplete_cache.clear(dbname))
+
+    @api.model
+    def autocomplete(self, prefix, limit=10):
+        """Return materials whose code or name starts with ``prefix`` (case-insensitive).
+
+        Code matches come first. Both lookups are index range scans on the
+        ``text_pattern_ops`` indexes, ordered with the ``~<~`` operator of
+        those indexes so that they stop after ``limit`` rows instead of
+        sorting every match. Recent prefixes are served from an in-process
+        LRU cache.
+        """
+        prefix = (prefix or '').strip().lower()
+        if not prefix:
+            return []
+        self.check_access_rights('read')
+        key = (self.env.cr.dbname, prefix, limit)
+        results = _autocomplete_cache.get(key)
+        if results is not None:
+            return results
+
+        self.flush(['material_code', 'material_name'])
+        pattern = prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        self.env.cr.execute("""
+            (SELECT id, material_code, material_name, 0 AS rank
+               FROM material_registration
+              WHERE active AND lower(material_code) LIKE %(pattern)s
+           ORDER BY lower(material_code) USING ~<~
+              LIMIT %(limit)s)
+            UNION ALL
+            (SELECT id, material_code, material_name, 1 AS rank
+               FROM material_registration
+              WHERE active AND lower(material_name) LIKE %(pattern)s
+           ORDER BY lower(material_name) USING ~<~
+              LIMIT %(limit)s)
+        """, {'pattern': pattern, 'limit': limit})
+        results = []
+        seen = set()
+        for material_id, code, name, _rank in self.env.cr.fetchall():
+            if material_id in seen:
+                continue
+            seen.add(material_id)
+            results.append({
+                'id': material_id,
+                'material_code': code,
+                'material_name': name,
+                'display_name': '[%s] %s' % (code, name),
+            })
+            if len(results) >= limit:
+                break
+        _autocomplete_cache.put(key, results)
+        return results
 
     @api.model
     def name_search(self, name='', args=None, operator='ilike', limit=100):
@@ -157,6 +401,141 @@ class Material(models.Model):
             result.append((material.id, name))
         return result
 
+    @api.model
+    def _get_api_domain(self, material_type=None, price_category=None, archived='exclude'):
+        """Domain used by GET /api/materials for the given query parameters.
+
+        Raises ValidationError for an unknown ``price_category`` code.
+        """
+        domain = []
+        if material_type and material_type in ['fabric', 'jeans', 'cotton']:
+            domain = [('material_type', '=', material_type)]
+        if price_category:
+            Band = self.env['material.price.band']
+            band = Band.search([('code', '=', price_category)], limit=1)
+            if not band:
+                raise ValidationError(_('price_category must be one of: %s') % ', '.join(Band.search([]).mapped('code')))
+            domain.append(('price_band_id', '=', band.id))
+        if archived == 'only':
+            domain.append(('active', '=', False))
+        return domain
+
+    @api.model
+    def _read_by_supplier(self, supplier_ids, fields, limit, domain=None, order=None):
+        """Return {supplier_id: [values]} with the first ``limit`` materials of each supplier.
+
+        One window query picks the materials of all the suppliers at once and
+        one ``read`` loads their ``fields``, whatever the number of suppliers.
+        ``domain`` narrows the materials; ``order`` sorts them per supplier.
+        """
+        if not supplier_ids:
+            return {}
+        self.flush()
+        query = self._where_calc(list(domain or []) + [('supplier_id', 'in', list(supplier_ids))])
+        self._apply_ir_rules(query, 'read')
+        order_by = self._generate_order_by(f'{order or self._order}, id', query)
+        from_clause, where_clause, params = query.get_sql()
+        self.env.cr.execute(f"""
+            SELECT id, supplier_id
+              FROM (SELECT "material_registration".id, "material_registration".supplier_id,
+                           row_number() OVER (PARTITION BY "material_registration".supplier_id {order_by}) AS position
+                      FROM {from_clause}
+                     WHERE {where_clause}) AS ranked
+             WHERE position <= %s
+          ORDER BY supplier_id, position
+        """, params + [limit])
+        rows = self.env.cr.fetchall()
+        values = {vals['id']: vals for vals in self.browse([row[0] for row in rows]).read(fields)}
+        materials_by_supplier = defaultdict(list)
+        for material_id, supplier_id in rows:
+            materials_by_supplier[supplier_id].append(values[material_id])
+        return materials_by_supplier
+
+    @api.model
+    def get_best_prices(self, keys, date=None):
+        """Return the cheapest active offer and the price spread of each equivalence key, in order.
+
+        All keys are resolved by one query: window functions rank the offers
+        of each key by price converted to the base currency and compute the
+        spread over the same partition. Offers quoted in a currency without
+        a rate on ``date`` are left out. A key without offers gets
+        ``cheapest: None``. The comparison price and the spread are in the
+        base currency, named by ``comparison_currency``.
+        """
+        if not keys:
+            return []
+        self.check_access_rights('read')
+        self.flush(['equivalence_key', 'material_buy_price', 'currency_id', 'active', 'supplier_id', 'supplier_name'])
+        Rate = self.env['material.currency.rate']
+        rates = dict(Rate._get_rates(date or fields.Date.context_today(self)))
+        rates.setdefault(Rate._get_base_currency().id, 1.0)
+        self.env.cr.execute("""
+            WITH wanted AS (
+                SELECT key, position FROM unnest(%(keys)s::varchar[]) WITH ORDINALITY AS w(key, position)
+            ), rates AS (
+                SELECT currency_id, rate FROM unnest(%(currency_ids)s::int[], %(rates)s::float8[]) AS r(currency_id, rate)
+            ), ranked AS (
+                SELECT material.equivalence_key, material.id, material.material_code, material.material_name,
+                       material.supplier_id, material.supplier_name, material.material_buy_price, material.currency_id,
+                       material.material_buy_price / rates.rate AS base_price,
+                       row_number() OVER by_price AS rank,
+                       min(material.material_buy_price / rates.rate) OVER by_key AS min_price,
+                       max(material.material_buy_price / rates.rate) OVER by_key AS max_price,
+                       avg(material.material_buy_price / rates.rate) OVER by_key AS avg_price,
+                       count(*) OVER by_key AS offer_count
+                  FROM material_registration material
+                  JOIN rates ON rates.currency_id = material.currency_id
+                 WHERE material.active
+                   AND material.equivalence_key IN (SELECT key FROM wanted)
+                WINDOW by_key AS (PARTITION BY material.equivalence_key),
+                       by_price AS (PARTITION BY material.equivalence_key
+                                    ORDER BY material.material_buy_price / rates.rate, material.id)
+            )
+            SELECT wanted.key, ranked.id, ranked.material_code, ranked.material_name, ranked.supplier_id,
+                   ranked.supplier_name, ranked.material_buy_price::float8, ranked.currency_id, ranked.base_price,
+                   ranked.min_price, ranked.max_price, ranked.avg_price, ranked.offer_count
+              FROM wanted
+         LEFT JOIN ranked ON ranked.equivalence_key = wanted.key AND ranked.rank = 1
+          ORDER BY wanted.position
+        """, {'keys': list(keys), 'currency_ids': list(rates), 'rates': list(rates.values())})
+        rows = self.env.cr.fetchall()
+        currencies = {currency.id: currency.name for currency in self.env['res.currency'].browse(
+            list({row[7] for row in rows if row[7]}))}
+        base_currency = Rate._get_base_currency()
+        results = []
+        for (key, material_id, code, name, supplier_id, supplier_name, price, currency_id,
+             base_price, min_price, max_price, avg_price, offer_count) in rows:
+            result = {
+                'key': key,
+                'cheapest': None,
+                'offer_count': 0,
+                'min_price': None,
+                'max_price': None,
+                'avg_price': None,
+                'spread': None,
+                'comparison_currency': base_currency.name,
+            }
+            if material_id:
+                result.update({
+                    'cheapest': {
+                        'material_id': material_id,
+                        'material_code': code,
+                        'material_name': name,
+                        'supplier_id': supplier_id,
+                        'supplier_name': supplier_name,
+                        'material_buy_price': price,
+                        'currency': currencies.get(currency_id),
+                        'comparison_price': base_currency.round(base_price),
+                    },
+                    'offer_count': offer_count,
+                    'min_price': base_currency.round(min_price),
+                    'max_price': base_currency.round(max_price),
+                    'avg_price': base_currency.round(avg_price),
+                    'spread': base_currency.round(max_price - min_price),
+                })
+            results.append(result)
+        return results
+
     @api.model
     def get_materials_by_type(self, material_type=None):
         """Method to get materials filtered by type (for API usage)."""
@@ -180,10 +559,40 @@ class Material(models.Model):
                 'material_name': self.material_name,
                 'material_type': self.material_type,
                 'material_buy_price': self.material_buy_price,
+                'currency': self.currency_id.name,
                 'supplier_name': self.safe_supplier_name,
                 'price_category': self.safe_price_category,
+                'equivalence_key': self.equivalence_key,
+                'active': self.active,
                 'create_date': self.create_date.isoformat() if self.create_date else None,
                 'write_date': self.write_date.isoformat() if self.write_date else None,
             }
         except Exception:
-            return None 
\ No newline at end of file
+            return None
+
+    def _outbox_payload(self):
+        """Material summaries, as sent to webhook endpoints."""
+        return [material.get_material_summary() or {'id': material.id} for material in self]
+
+    def _stream_keys(self):
+        return [[material.id, material.supplier_id.id, material.material_type] for material in self]
+
+    @api.model
+    def get_material_summaries(self, material_ids):
+        """Get summaries for many materials at once, in the order requested.
+
+        Returns a tuple ``(summaries, missing_ids)``. All records are fetched
+        with a single search and their fields are loaded in one batch.
+        """
+        materials = self.with_context(active_test=False).search([('id', 'in', list(material_ids))])
+        by_id = {material.id: material for material in materials}
+        summaries = []
+        missing_ids = []
+        for material_id in material_ids:
+            material = by_id.get(material_id)
+            summary = material.get_material_summary() if material else None
+            if summary is None:
+                missing_ids.append(material_id)
+            else:
+                summaries.append(summary)
+        return summaries, missing_ids
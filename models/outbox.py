@@ -0,0 +1,304 @@
+# -*- coding: utf-8 -*-
+
+import datetime
+import hashlib
+import hmac
+import json
+import logging
+import random
+import time
+
+import requests
+from psycopg2 import errorcodes, OperationalError
+
+from odoo import api, fields, models, tools
+
+_logger = logging.getLogger(__name__)
+
+# Delivery retries back off exponentially between these bounds (seconds)
+RETRY_BASE_DELAY = 30
+RETRY_MAX_DELAY = 3600
+
+# Longest wait for the lock taken to compute the dispatch watermark; writes
+# to materials and suppliers queue behind the waiting lock request
+WATERMARK_LOCK_TIMEOUT = '50ms'
+
+# NOTIFY channel carrying committed changes to the /api/stream listeners
+STREAM_CHANNEL = 'material_changes'
+
+# Records per NOTIFY payload, well below PostgreSQL's 8000-byte payload limit
+STREAM_CHUNK_SIZE = 200
+
+
+class OutboxMixin(models.AbstractModel):
+    """Record create/write/unlink of a model as outbox events in the same transaction.
+
+    Events are only written while at least one webhook endpoint is active.
+    Every change is also announced with NOTIFY on ``STREAM_CHANNEL``, which
+    PostgreSQL delivers to listeners only once the transaction commits, and
+    flags the catalog snapshots of the suppliers involved as stale.
+    """
+    _name = 'material.outbox.mixin'
+    _description = 'Transactional Outbox Support'
+
+    # Fields used by stream filters; a write to one of them is announced
+    # with the values before and after the change
+    _stream_key_fields = ()
+
+    def _outbox_payload(self):
+        """Return the event payload of each record in self, in order."""
+        return [{'id': record.id} for record in self]
+
+    def _stream_keys(self):
+        """Return [id, supplier_id, material_type] of each record, for stream filters."""
+        return [[record.id, None, None] for record in self]
+
+    def _after_change(self, event_type, keys):
+        """Propagate a change of the records described by ``keys`` to the derived data."""
+        self._notify_stream(event_type, keys)
+        self.env['material.supplier.catalog']._mark_stale([key[1] for key in keys])
+
+    def _notify_stream(self, event_type, keys):
+        """Announce a change of the records described by ``keys`` with one query."""
+        if not keys:
+            return
+        payloads = [
+            json.dumps({'model': self._name, 'event': event_type, 'records': keys[i:i + STREAM_CHUNK_SIZE]})
+            for i in range(0, len(keys), STREAM_CHUNK_SIZE)
+        ]
+        self.env.cr.execute("SELECT pg_notify(%s, payload) FROM unnest(%s::text[]) AS payload",
+                            (STREAM_CHANNEL, payloads))
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super(OutboxMixin, self).create(vals_list)
+        self.env['material.outbox.event']._enqueue(records._name, 'created', records.ids,
+                                                   lambda: records._outbox_payload())
+        records._after_change('created', records._stream_keys())
+        return records
+
+    def write(self, vals):
+        before = self._stream_keys() if any(name in vals for name in self._stream_key_fields) else []
+        res = super(OutboxMixin, self).write(vals)
+        self.env['material.outbox.event']._enqueue(self._name, 'updated', self.ids,
+                                                   lambda: self._outbox_payload(), changed=sorted(vals))
+        keys = self._stream_keys()
+        seen = set(map(tuple, keys))
+        self._after_change('updated', keys + [key for key in before if tuple(key) not in seen])
+        return res
+
+    def unlink(self):
+        model_name, ids, keys = self._name, self.ids, self._stream_keys()
+        res = super(OutboxMixin, self).unlink()
+        self.env['material.outbox.event']._enqueue(model_name, 'deleted', ids,
+                                                   lambda: [{'id': record_id} for record_id in ids])
+        self.browse()._after_change('deleted', keys)
+        return res
+
+
+class OutboxEvent(models.Model):
+    """Change events waiting to be pushed to the webhook endpoints."""
+    _name = 'material.outbox.event'
+    _description = 'Outbox Event'
+    _order = 'id'
+    _log_access = False
+
+    model = fields.Char(string='Model', required=True, readonly=True)
+    res_id = fields.Integer(string='Record ID', required=True, readonly=True)
+    event_type = fields.Selection([
+        ('created', 'Created'),
+        ('updated', 'Updated'),
+        ('deleted', 'Deleted'),
+    ], string='Event', required=True, readonly=True)
+    payload = fields.Text(string='Payload', readonly=True, help='JSON representation of the record')
+    date = fields.Datetime(string='Date', required=True, readonly=True, default=fields.Datetime.now)
+
+    @api.model
+    def _enqueue(self, model_name, event_type, res_ids, payload_func, changed=None):
+        """Append one event per record with a single INSERT, if any endpoint is active.
+
+        ``payload_func`` is only called when events are actually written.
+        """
+        if not res_ids or not self.env['material.webhook.endpoint']._active_endpoint_count():
+            return
+        payloads = []
+        for payload in payload_func():
+            if changed is not None:
+                payload = dict(payload, changed_fields=changed)
+            payloads.append(json.dumps(payload, default=str))
+        self.env.cr.execute("""
+            INSERT INTO material_outbox_event (model, res_id, event_type, payload, date)
+            SELECT %s, res_id, %s, payload, now() at time zone 'UTC'
+              FROM unnest(%s::int[], %s::text[]) AS e(res_id, payload)
+        """, (model_name, event_type, list(res_ids), payloads))
+
+    @api.model
+    def _safe_watermark(self, auto_commit=False):
+        """Return the highest event ID below which no transaction can still add events.
+
+        Briefly takes a SHARE lock, which waits for in-flight writers to
+        finish, so events committed later always get higher IDs. Returns
+        None if the lock is not granted within ``WATERMARK_LOCK_TIMEOUT``;
+        the next cron run tries again.
+        """
+        cr = self.env.cr
+        try:
+            with cr.savepoint():
+                cr.execute("SET LOCAL lock_timeout = %s", (WATERMARK_LOCK_TIMEOUT,))
+                cr.execute("LOCK TABLE material_outbox_event IN SHARE MODE", log_exceptions=False)
+        except OperationalError as e:
+            if e.pgcode == errorcodes.LOCK_NOT_AVAILABLE:
+                _logger.info("Outbox busy, dispatch postponed")
+                return None
+            raise
+        cr.execute("SELECT MAX(id) FROM material_outbox_event")
+        watermark = cr.fetchone()[0]
+        if auto_commit:
+            cr.commit()
+        return watermark
+
+    @api.model
+    def _dispatch(self, batch_size=100, time_budget=50, auto_commit=False):
+        """Deliver pending events to every due endpoint, then purge delivered events.
+
+        Each endpoint receives its events in ID order, ``batch_size`` at a
+        time, and only moves on once a batch is acknowledged. With
+        ``auto_commit`` progress is committed after every batch, as the cron
+        does.
+        """
+        watermark = self._safe_watermark(auto_commit)
+        if watermark is None:
+            return
+        deadline = time.monotonic() + time_budget
+        now = fields.Datetime.now()
+        endpoints = self.env['material.webhook.endpoint'].search([
+            '|', ('next_attempt_at', '=', False), ('next_attempt_at', '<=', now),
+        ])
+        for endpoint in endpoints:
+            endpoint._deliver_pending(watermark, batch_size, deadline, auto_commit)
+        self._purge_delivered()
+        if auto_commit:
+            self.env.cr.commit()
+
+    @api.model
+    def _purge_delivered(self):
+        """Delete events every active endpoint has acknowledged."""
+        self.env['material.webhook.endpoint'].flush(['last_event_id', 'active'])
+        self.env.cr.execute("""
+            DELETE FROM material_outbox_event
+             WHERE id <= COALESCE((SELECT MIN(last_event_id) FROM material_webhook_endpoint WHERE active),
+                                  (SELECT MAX(id) FROM material_outbox_event))
+        """)
+        return self.env.cr.rowcount
+
+    @api.model
+    def _cron_dispatch(self):
+        self._dispatch(auto_commit=True)
+
+
+class WebhookEndpoint(models.Model):
+    """A URL receiving batches of outbox events, with its own delivery position."""
+    _name = 'material.webhook.endpoint'
+    _description = 'Webhook Endpoint'
+    _order = 'name'
+
+    name = fields.Char(string='Name', required=True)
+    url = fields.Char(string='URL', required=True, help='Receives POSTed JSON batches of events')
+    secret = fields.Char(
+        string='Secret',
+        groups='base.group_system',
+        help='If set, each request carries an HMAC-SHA256 of its body in X-Material-Signature'
+    )
+    active = fields.Boolean(string='Active', default=True)
+    last_event_id = fields.Integer(
+        string='Last Delivered Event',
+        readonly=True,
+        help='Events up to this ID have been acknowledged by the endpoint'
+    )
+    failure_count = fields.Integer(string='Consecutive Failures', readonly=True)
+    next_attempt_at = fields.Datetime(string='Next Attempt', readonly=True)
+    last_error = fields.Text(string='Last Error', readonly=True)
+
+    @tools.ormcache()
+    def _active_endpoint_count(self):
+        self.env.cr.execute("SELECT COUNT(*) FROM material_webhook_endpoint WHERE active")
+        return self.env.cr.fetchone()[0]
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        # New endpoints only receive events from now on
+        self.env.cr.execute("SELECT COALESCE(MAX(id), 0) FROM material_outbox_event")
+        current = self.env.cr.fetchone()[0]
+        for vals in vals_list:
+            vals.setdefault('last_event_id', current)
+        endpoints = super(WebhookEndpoint, self).create(vals_list)
+        self.clear_caches()
+        return endpoints
+
+    def write(self, vals):
+        res = super(WebhookEndpoint, self).write(vals)
+        if 'active' in vals:
+            self.clear_caches()
+        return res
+
+    def unlink(self):
+        res = super(WebhookEndpoint, self).unlink()
+        self.clear_caches()
+        return res
+
+    def _post_batch(self, body):
+        """POST one JSON batch to the endpoint; raise on any non-2xx answer."""
+        self.ensure_one()
+        headers = {'Content-Type': 'application/json'}
+        secret = self.sudo().secret
+        if secret:
+            headers['X-Material-Signature'] = hmac.new(secret.encode(), body.encode(), hashlib.sha256).hexdigest()
+        response = requests.post(self.url, data=body, headers=headers, timeout=10)
+        response.raise_for_status()
+
+    def _deliver_pending(self, watermark, batch_size, deadline, auto_commit=False):
+        """Send this endpoint's pending events up to ``watermark`` in ordered batches."""
+        self.ensure_one()
+        cr = self.env.cr
+        while time.monotonic() < deadline:
+            cr.execute("""
+                SELECT id, model, res_id, event_type, payload, date
+                  FROM material_outbox_event
+                 WHERE id > %s AND id <= %s
+              ORDER BY id
+                 LIMIT %s
+            """, (self.last_event_id, watermark, batch_size))
+            rows = cr.fetchall()
+            if not rows:
+                return
+            body = json.dumps({'events': [{
+                'id': event_id,
+                'model': model,
+                'res_id': res_id,
+                'event': event_type,
+                'data': json.loads(payload) if payload else None,
+                'date': date.isoformat(),
+            } for event_id, model, res_id, event_type, payload, date in rows]})
+            try:
+                self._post_batch(body)
+            except Exception as e:
+                failures = self.failure_count + 1
+                delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** (failures - 1)) * random.uniform(0.8, 1.2)
+                _logger.warning("Webhook %s failed (attempt %d), retrying in %ds: %s",
+                                self.name, failures, delay, e)
+                self.write({
+                    'failure_count': failures,
+                    'next_attempt_at': fields.Datetime.now() + datetime.timedelta(seconds=delay),
+                    'last_error': str(e)[:1000],
+                })
+                if auto_commit:
+                    cr.commit()
+                return
+            self.write({
+                'last_event_id': rows[-1][0],
+                'failure_count': 0,
+                'next_attempt_at': False,
+                'last_error': False,
+            })
+            if auto_commit:
+                cr.commit()
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+
+from odoo import api, fields, models, tools, _
+
+from .currency_rate import base_price_sql
+
+
+class PriceBand(models.Model):
+    _name = 'material.price.band'
+    _description = 'Material Price Band'
+    _order = 'min_price'
+    _rec_name = 'name'
+
+    name = fields.Char(
+        string='Label',
+        required=True,
+        translate=True,
+        help='Price category shown for materials in this band'
+    )
+    code = fields.Char(
+        string='Code',
+        required=True,
+        help='Compact key used to filter materials by price category'
+    )
+    min_price = fields.Float(
+        string='Minimum Price',
+        required=True,
+        digits=(16, 2),
+        help='Materials priced at or above this value (and below the next band) fall in this band'
+    )
+
+    _sql_constraints = [
+        ('code_unique', 'UNIQUE(code)', 'Price band code must be unique.'),
+        ('min_price_unique', 'UNIQUE(min_price)', 'Two price bands cannot start at the same price.'),
+    ]
+
+    @tools.ormcache()
+    def _get_band_table(self):
+        """Return ((min_price, band_id), ...) sorted by descending min_price, cached per process."""
+        self.flush(['min_price'])
+        self.env.cr.execute("SELECT min_price, id FROM material_price_band ORDER BY min_price DESC")
+        return tuple(self.env.cr.fetchall())
+
+    @api.model
+    def _find_band(self, price):
+        """Return the band containing ``price``, or an empty recordset."""
+        for min_price, band_id in self._get_band_table():
+            if price >= min_price:
+                return self.browse(band_id)
+        return self.browse()
+
+    @api.model
+    def _recompute_material_bands(self):
+        """Reassign every material to its band with a single CASE UPDATE.
+
+        Buy prices are compared in the base currency, converted with the
+        current rates. Only rows whose band actually changes are written.
+        """
+        self.env['material.registration'].flush(['material_buy_price', 'currency_id', 'price_band_id'])
+        table = self._get_band_table()
+        params = self.env['material.currency.rate']._get_base_price_params()
+        if table:
+            base_price = base_price_sql('material_buy_price', 'currency_id')
+            case = 'CASE %s END' % ' '.join(
+                f'WHEN {base_price} >= %(band_min_{i})s THEN %(band_id_{i})s' for i in range(len(table)))
+            for i, (min_price, band_id) in enumerate(table):
+                params.update({f'band_min_{i}': min_price, f'band_id_{i}': band_id})
+        else:
+            case = 'NULL::integer'
+        self.env.cr.execute(
+            "UPDATE material_registration SET price_band_id = %s "
+            "WHERE price_band_id IS DISTINCT FROM (%s)" % (case, case),
+            params
+        )
+        updated = self.env.cr.rowcount
+        self.env['material.registration'].invalidate_cache(['price_band_id'])
+        return updated
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        bands = super(PriceBand, self).create(vals_list)
+        self.clear_caches()
+        bands._recompute_material_bands()
+        return bands
+
+    def write(self, vals):
+        res = super(PriceBand, self).write(vals)
+        if 'min_price' in vals:
+            self.clear_caches()
+            self._recompute_material_bands()
+        return res
+
+    def unlink(self):
+        res = super(PriceBand, self).unlink()
+        self.clear_caches()
+        self._recompute_material_bands()
+        return res
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+
+import json
+
+from odoo import api, fields, models
+
+# Profiles kept; older ones are deleted as new ones are stored
+MAX_STORED_PROFILES = 200
+
+
+class RequestProfile(models.Model):
+    """Python profile and SQL trace of one API request, captured on demand by an administrator.
+
+    Created by ``controllers/profiling.py`` when a request carries the
+    ``X-Material-Profile`` header or the ``profile=1`` query parameter.
+    """
+    _name = 'material.request.profile'
+    _description = 'API Request Profile'
+    _order = 'date desc, id desc'
+    _rec_name = 'path'
+    _log_access = False
+
+    date = fields.Datetime(string='Date', required=True, readonly=True, default=fields.Datetime.now)
+    user_id = fields.Many2one('res.users', string='User', readonly=True, ondelete='set null')
+    method = fields.Char(string='Method', readonly=True)
+    path = fields.Char(string='Path', readonly=True)
+    query_string = fields.Char(string='Query String', readonly=True)
+    status = fields.Integer(string='Status', readonly=True)
+    duration_ms = fields.Float(string='Duration (ms)', readonly=True, digits=(16, 1))
+    query_count = fields.Integer(string='Queries', readonly=True)
+    query_time_ms = fields.Float(string='SQL Time (ms)', readonly=True, digits=(16, 1))
+    python_profile = fields.Text(
+        string='Python Profile',
+        readonly=True,
+        help='cProfile statistics of the request, sorted by cumulative time'
+    )
+    sql_trace = fields.Text(
+        string='SQL Trace',
+        readonly=True,
+        help='Every statement run by the request, in order, with its duration (JSON)'
+    )
+
+    def _get_api_data(self):
+        """Return the profile as served by GET /api/profiles/<id>."""
+        self.ensure_one()
+        return {
+            'id': self.id,
+            'date': fields.Datetime.to_string(self.date),
+            'user': self.user_id.login or None,
+            'method': self.method,
+            'path': self.path,
+            'query_string': self.query_string or '',
+            'status': self.status,
+            'duration_ms': self.duration_ms,
+            'query_count': self.query_count,
+            'query_time_ms': self.query_time_ms,
+            'python_profile': self.python_profile or '',
+            'sql_trace': json.loads(self.sql_trace) if self.sql_trace else [],
+        }
+
+    @api.model
+    def _purge_old(self, keep=MAX_STORED_PROFILES):
+        """Delete all but the ``keep`` most recent profiles."""
+        self.env.cr.execute("""
+            DELETE FROM material_request_profile
+             WHERE id NOT IN (SELECT id FROM material_request_profile ORDER BY date DESC, id DESC LIMIT %s)
+        """, (keep,))
+        return self.env.cr.rowcount
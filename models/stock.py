@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+
+import logging
+
+from psycopg2 import errorcodes, OperationalError
+
+from odoo import api, fields, models, _
+from odoo.exceptions import ValidationError
+
+_logger = logging.getLogger(__name__)
+
+# Longest wait for the lock blocking stock postings while snapshots are taken;
+# queued behind it, new postings would wait too
+SNAPSHOT_LOCK_TIMEOUT = '100ms'
+
+
+class StockMove(models.Model):
+    """Append-only ledger of stock quantity changes per material.
+
+    Balances are never stored on the move rows. They come from the latest
+    ``material.stock.snapshot`` of a material plus the moves posted after it.
+    """
+    _name = 'material.stock.move'
+    _description = 'Material Stock Move'
+    _order = 'id desc'
+    _rec_name = 'reference'
+
+    material_id = fields.Many2one(
+        'material.registration',
+        string='Material',
+        required=True,
+        ondelete='restrict',
+        help='Material whose on-hand quantity changes'
+    )
+    quantity = fields.Float(
+        string='Quantity',
+        required=True,
+        digits=(16, 3),
+        help='Signed quantity: positive for receipts, negative for issues'
+    )
+    date = fields.Datetime(
+        string='Date',
+        required=True,
+        readonly=True,
+        default=fields.Datetime.now,
+        help='When the move was posted'
+    )
+    reference = fields.Char(
+        string='Reference',
+        help='Scan, document or device reference of the move'
+    )
+
+    def init(self):
+        """Index moves by material and posting order, and by material and time."""
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS material_stock_move_material_id_id_idx
+                ON material_stock_move (material_id, id)
+        """)
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS material_stock_move_material_id_date_idx
+                ON material_stock_move (material_id, date)
+        """)
+
+    def write(self, vals):
+        raise ValidationError(_('Stock moves cannot be modified. Post a correcting move instead.'))
+
+    def unlink(self):
+        raise ValidationError(_('Stock moves cannot be deleted. Post a correcting move instead.'))
+
+    @api.model
+    def post_moves(self, moves):
+        """Append many moves with one INSERT and return their IDs, in order.
+
+        ``moves`` is a list of dicts with ``material_id`` or ``material_code``
+        (of an active material), ``quantity`` and an optional ``reference``.
+        """
+        if not moves:
+            return []
+        self.check_access_rights('create')
+        Material = self.env['material.registration']
+        codes = {move['material_code'] for move in moves if not move.get('material_id') and move.get('material_code')}
+        ids_by_code = {}
+        if codes:
+            ids_by_code = {m.material_code: m.id for m in Material.search([('material_code', 'in', list(codes))])}
+        material_ids = []
+        for index, move in enumerate(moves):
+            material_id = move.get('material_id') or ids_by_code.get(move.get('material_code'))
+            if not material_id:
+                raise ValidationError(_('Move %s: unknown material %s.') % (
+                    index, move.get('material_code') or move.get('material_id')))
+            if not move.get('quantity'):
+                raise ValidationError(_('Move %s: quantity must be a non-zero number.') % index)
+            material_ids.append(material_id)
+        existing = set(Material.with_context(active_test=False).browse(set(material_ids)).exists().ids)
+        missing = sorted(set(material_ids) - existing)
+        if missing:
+            raise ValidationError(_('Material with ID %s not found.') % ', '.join(map(str, missing)))
+
+        self.env.cr.execute("""
+            INSERT INTO material_stock_move
+                   (material_id, quantity, reference, date, create_uid, create_date, write_uid, write_date)
+            SELECT material_id, quantity, reference, now() at time zone 'UTC', %(uid)s,
+                   now() at time zone 'UTC', %(uid)s, now() at time zone 'UTC'
+              FROM unnest(%(material_ids)s::int[], %(quantities)s::numeric[], %(references)s::varchar[])
+                   AS m(material_id, quantity, reference)
+         RETURNING id
+        """, {
+            'uid': self.env.uid,
+            'material_ids': material_ids,
+            'quantities': [move['quantity'] for move in moves],
+            'references': [move.get('reference') or None for move in moves],
+        })
+        # RETURNING follows the order of the unnest() input
+        return [row[0] for row in self.env.cr.fetchall()]
+
+    @api.model
+    def get_balances(self, material_ids):
+        """Return {material_id: on-hand quantity} for ``material_ids``.
+
+        Each balance is the latest snapshot plus the moves posted after it.
+        Both lookups are index range scans, so the cost depends on the moves
+        since the last snapshot, not on the length of the history.
+        """
+        if not material_ids:
+            return {}
+        self.flush()
+        self.env.cr.execute("""
+            WITH latest AS (
+                SELECT DISTINCT ON (material_id) material_id, balance, last_move_id
+                  FROM material_stock_snapshot
+                 WHERE material_id = ANY(%(ids)s)
+              ORDER BY material_id, last_move_id DESC
+            )
+            SELECT requested.id,
+                   COALESCE(latest.balance, 0) + COALESCE((
+                       SELECT SUM(move.quantity)
+                         FROM material_stock_move move
+                        WHERE move.material_id = requested.id
+                          AND move.id > COALESCE(latest.last_move_id, 0)
+                   ), 0)
+              FROM unnest(%(ids)s::int[]) AS requested(id)
+         LEFT JOIN latest ON latest.material_id = requested.id
+        """, {'ids': list(material_ids)})
+        return {material_id: float(balance) for material_id, balance in self.env.cr.fetchall()}
+
+
+class StockSnapshot(models.Model):
+    """Balance of a material covering every move up to ``last_move_id``."""
+    _name = 'material.stock.snapshot'
+    _description = 'Material Stock Snapshot'
+    _order = 'last_move_id desc'
+    _rec_name = 'material_id'
+
+    material_id = fields.Many2one(
+        'material.registration',
+        string='Material',
+        required=True,
+        ondelete='cascade'
+    )
+    date = fields.Datetime(
+        string='Date',
+        required=True,
+        default=fields.Datetime.now
+    )
+    balance = fields.Float(
+        string='Balance',
+        required=True,
+        digits=(16, 3)
+    )
+    last_move_id = fields.Integer(
+        string='Last Move',
+        required=True,
+        help='Highest stock move ID included in the balance'
+    )
+
+    def init(self):
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS material_stock_snapshot_material_id_last_move_idx
+                ON material_stock_snapshot (material_id, last_move_id DESC)
+        """)
+
+    @api.model
+    def _take_snapshots(self):
+        """Snapshot every material with moves since the previous run, in one statement.
+
+        New snapshots all cover moves up to the same watermark, the highest
+        move ID at run time, so the next run only reads newer moves. Posting
+        is blocked from the watermark until the transaction commits, so that
+        no move with a lower ID can commit after it; the cron commits right
+        after this call. If the lock is not granted within
+        ``SNAPSHOT_LOCK_TIMEOUT``, because a posting transaction is still
+        running, the run is skipped rather than making new postings queue.
+        Returns the number of snapshots written.
+        """
+        self.flush()
+        cr = self.env.cr
+        try:
+            with cr.savepoint():
+                cr.execute("SET LOCAL lock_timeout = %s", (SNAPSHOT_LOCK_TIMEOUT,))
+                cr.execute("LOCK TABLE material_stock_move IN SHARE MODE", log_exceptions=False)
+        except OperationalError as e:
+            if e.pgcode == errorcodes.LOCK_NOT_AVAILABLE:
+                _logger.info("Stock moves busy, snapshots postponed to the next run")
+                return 0
+            raise
+        cr.execute("SELECT COALESCE(MAX(last_move_id), 0) FROM material_stock_snapshot")
+        watermark = cr.fetchone()[0]
+        cr.execute("SELECT MAX(id) FROM material_stock_move WHERE id > %s", (watermark,))
+        new_watermark = cr.fetchone()[0]
+        if not new_watermark:
+            return 0
+        cr.execute("""
+            WITH pending AS (
+                SELECT material_id, SUM(quantity) AS quantity
+                  FROM material_stock_move
+                 WHERE id > %(watermark)s AND id <= %(new_watermark)s
+              GROUP BY material_id
+            ), latest AS (
+                SELECT DISTINCT ON (material_id) material_id, balance
+                  FROM material_stock_snapshot
+                 WHERE material_id IN (SELECT material_id FROM pending)
+              ORDER BY material_id, last_move_id DESC
+            )
+            INSERT INTO material_stock_snapshot
+                   (material_id, balance, last_move_id, date, create_uid, create_date, write_uid, write_date)
+            SELECT pending.material_id, COALESCE(latest.balance, 0) + pending.quantity, %(new_watermark)s,
+                   now() at time zone 'UTC', %(uid)s, now() at time zone 'UTC', %(uid)s, now() at time zone 'UTC'
+              FROM pending
+         LEFT JOIN latest ON latest.material_id = pending.material_id
+        """, {'watermark': watermark, 'new_watermark': new_watermark, 'uid': self.env.uid})
+        count = cr.rowcount
+        _logger.info("Took %d stock snapshots up to move %d", count, new_watermark)
+        return count
+
+    @api.model
+    def _cron_take_snapshots(self):
+        self._take_snapshots()
+        # Release the lock on the moves at once
+        self.env.cr.commit()
@@ -1,11 +1,28 @@
 # -*- coding: utf-8 -*-
 
+import logging
+from collections import defaultdict
+
 from odoo import api, fields, models, _
 from odoo.exceptions import ValidationError
 
+_logger = logging.getLogger(__name__)
+
+# Default pg_trgm similarity above which two supplier names are reported as likely duplicates
+DEFAULT_SIMILARITY_THRESHOLD = 0.6
+
+
+class SupplierInUseError(ValidationError):
+    """Deletion refused because suppliers still have materials; ``blocking`` is {supplier_id: material_count}."""
+
+    def __init__(self, message, blocking):
+        self.blocking = blocking
+        super(SupplierInUseError, self).__init__(message)
+
 
 class Supplier(models.Model):
     _name = 'material.supplier'
+    _inherit = ['material.concurrency.mixin', 'material.outbox.mixin']
     _description = 'Material Supplier'
     _order = 'name'
     _rec_name = 'name'
@@ -28,6 +45,13 @@ class Supplier(models.Model):
         string='Address',
         help='Full address of the supplier'
     )
+    currency_id = fields.Many2one(
+        'res.currency',
+        string='Currency',
+        required=True,
+        default=lambda self: self.env['material.currency.rate']._get_base_currency(),
+        help='Currency the supplier quotes its material prices in'
+    )
     material_ids = fields.One2many(
         'material.registration',
         'supplier_id',
@@ -40,9 +64,120 @@ class Supplier(models.Model):
         store=True
     )
 
-    @api.depends('material_ids')
+    # Price aggregates over this supplier's materials, kept in sync whenever a
+    # material is created, repriced, retyped, reassigned or deleted
+    material_price_min = fields.Float(
+        string='Min Material Price',
+        compute='_compute_price_aggregates',
+        store=True,
+        index=True,
+        digits=(16, 2)
+    )
+    material_price_max = fields.Float(
+        string='Max Material Price',
+        compute='_compute_price_aggregates',
+        store=True,
+        index=True,
+        digits=(16, 2)
+    )
+    material_price_avg = fields.Float(
+        string='Average Material Price',
+        compute='_compute_price_aggregates',
+        store=True,
+        index=True,
+        digits=(16, 2)
+    )
+    fabric_count = fields.Integer(
+        string='Fabric Materials',
+        compute='_compute_price_aggregates',
+        store=True
+    )
+    jeans_count = fields.Integer(
+        string='Jeans Materials',
+        compute='_compute_price_aggregates',
+        store=True
+    )
+    cotton_count = fields.Integer(
+        string='Cotton Materials',
+        compute='_compute_price_aggregates',
+        store=True
+    )
+
+    _PRICE_AGGREGATES_SQL = """
+        SELECT supplier_id,
+               MIN(material_buy_price),
+               MAX(material_buy_price),
+               AVG(material_buy_price),
+               COUNT(*) FILTER (WHERE material_type = 'fabric'),
+               COUNT(*) FILTER (WHERE material_type = 'jeans'),
+               COUNT(*) FILTER (WHERE material_type = 'cotton')
+          FROM material_registration
+         WHERE supplier_id IN %s AND active
+      GROUP BY supplier_id
+    """
+
+    @api.depends('material_ids.material_buy_price', 'material_ids.material_type', 'material_ids.active')
+    def _compute_price_aggregates(self):
+        """Compute price and per-type aggregates with one grouped query for all suppliers in self."""
+        aggregates = {}
+        supplier_ids = tuple(self._origin.ids)
+        if supplier_ids:
+            self.env['material.registration'].flush(['supplier_id', 'material_buy_price', 'material_type', 'active'])
+            self.env.cr.execute(self._PRICE_AGGREGATES_SQL, (supplier_ids,))
+            aggregates = {row[0]: row[1:] for row in self.env.cr.fetchall()}
+        for supplier in self:
+            price_min, price_max, price_avg, fabric, jeans, cotton = aggregates.get(
+                supplier._origin.id, (0.0, 0.0, 0.0, 0, 0, 0))
+            supplier.material_price_min = price_min
+            supplier.material_price_max = price_max
+            supplier.material_price_avg = float(price_avg)
+            supplier.fabric_count = fabric
+            supplier.jeans_count = jeans
+            supplier.cotton_count = cotton
+
+    @api.model
+    def _rebuild_price_aggregates(self):
+        """Recompute stored material aggregates for every supplier in one SQL statement.
+
+        Use after raw SQL imports or fixes that bypassed the ORM.
+        """
+        self.flush()
+        self.env['material.registration'].flush()
+        self.env.cr.execute("""
+            UPDATE material_supplier s
+               SET material_count = COALESCE(agg.total, 0),
+                   material_price_min = COALESCE(agg.price_min, 0),
+                   material_price_max = COALESCE(agg.price_max, 0),
+                   material_price_avg = COALESCE(agg.price_avg, 0),
+                   fabric_count = COALESCE(agg.fabric, 0),
+                   jeans_count = COALESCE(agg.jeans, 0),
+                   cotton_count = COALESCE(agg.cotton, 0)
+              FROM material_supplier s2
+         LEFT JOIN (
+                SELECT supplier_id,
+                       COUNT(*) AS total,
+                       MIN(material_buy_price) AS price_min,
+                       MAX(material_buy_price) AS price_max,
+                       AVG(material_buy_price) AS price_avg,
+                       COUNT(*) FILTER (WHERE material_type = 'fabric') AS fabric,
+                       COUNT(*) FILTER (WHERE material_type = 'jeans') AS jeans,
+                       COUNT(*) FILTER (WHERE material_type = 'cotton') AS cotton
+                  FROM material_registration
+                 WHERE active
+              GROUP BY supplier_id
+              ) agg ON agg.supplier_id = s2.id
+             WHERE s.id = s2.id
+        """)
+        updated = self.env.cr.rowcount
+        self.invalidate_cache([
+            'material_count', 'material_price_min', 'material_price_max', 'material_price_avg',
+            'fabric_count', 'jeans_count', 'cotton_count',
+        ])
+        return updated
+
+    @api.depends('material_ids', 'material_ids.active')
     def _compute_material_count(self):
-        """Compute the number of materials for this supplier."""
+        """Compute the number of active materials for this supplier."""
         for supplier in self:
             supplier.material_count = len(supplier.material_ids)
 
@@ -62,17 +197,17 @@ class Supplier(models.Model):
 
     @api.constrains('name')
     def _check_unique_name(self):
-        """Ensure supplier name is unique and not empty."""
-        for supplier in self:
-            if not supplier.name:
-                raise ValidationError(_('Supplier name is required.'))
-            existing = self.search([
-                ('name', '=', supplier.name),
-                ('id', '!=', supplier.id)
-            ])
-            if existing:
-                raise ValidationError(_('Supplier name must be unique. '
-                                      'A supplier with name "%s" already exists.') % supplier.name)
+        """Ensure supplier name is unique and not empty.
+
+        Checks the whole recordset with one grouped query.
+        """
+        if not all(self.mapped('name')):
+            raise ValidationError(_('Supplier name is required.'))
+        groups = self.read_group([('name', 'in', list(set(self.mapped('name'))))], ['name'], ['name'])
+        duplicates = sorted(g['name'] for g in groups if g['name_count'] > 1)
+        if duplicates:
+            raise ValidationError(_('Supplier name must be unique. '
+                                  'A supplier with name "%s" already exists.') % duplicates[0])
 
     @api.constrains('email')
     def _check_email_format(self):
@@ -94,12 +229,283 @@ class Supplier(models.Model):
             return suppliers.name_get()
         return super(Supplier, self).name_search(name, args, operator, limit)
 
+    @api.model
+    def _get_api_domain(self, search=None, min_avg_price=None, max_avg_price=None):
+        """Domain used by GET /api/suppliers for the given query parameters."""
+        domain = []
+        if search:
+            domain = ['|', ('name', 'ilike', search), ('email', 'ilike', search)]
+        if min_avg_price:
+            domain.append(('material_price_avg', '>=', float(min_avg_price)))
+        if max_avg_price:
+            domain.append(('material_price_avg', '<=', float(max_avg_price)))
+        return domain
+
+    def init(self):
+        """Create the indexes used by search and duplicate detection.
+
+        Name similarity uses a pg_trgm GIN index when the extension can be
+        enabled; otherwise duplicate detection falls back to matching on
+        normalized names. The plain-column trigram indexes serve the
+        ``ilike`` searches of ``name_search`` and GET /api/suppliers.
+        """
+        cr = self.env.cr
+        try:
+            with cr.savepoint():
+                cr.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        except Exception as e:
+            _logger.warning(f"pg_trgm unavailable, supplier duplicate detection uses exact normalized names: {str(e)}")
+        if self._has_trigram_support():
+            cr.execute("""
+                CREATE INDEX IF NOT EXISTS material_supplier_name_trgm_idx
+                    ON material_supplier USING gin (lower(name) gin_trgm_ops)
+            """)
+            cr.execute("""
+                CREATE INDEX IF NOT EXISTS material_supplier_name_search_trgm_idx
+                    ON material_supplier USING gin (name gin_trgm_ops)
+            """)
+            cr.execute("""
+                CREATE INDEX IF NOT EXISTS material_supplier_email_search_trgm_idx
+                    ON material_supplier USING gin (email gin_trgm_ops)
+            """)
+        cr.execute("""
+            CREATE INDEX IF NOT EXISTS material_supplier_name_normalized_idx
+                ON material_supplier (regexp_replace(lower(name), '[^a-z0-9]', '', 'g'))
+        """)
+        cr.execute("""
+            CREATE INDEX IF NOT EXISTS material_supplier_email_lower_idx
+                ON material_supplier (lower(email)) WHERE email IS NOT NULL AND email != ''
+        """)
+        cr.execute("""
+            CREATE INDEX IF NOT EXISTS material_supplier_phone_digits_idx
+                ON material_supplier (regexp_replace(phone, '[^0-9]', '', 'g')) WHERE phone IS NOT NULL AND phone != ''
+        """)
+
+    def _has_trigram_support(self):
+        self.env.cr.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        return bool(self.env.cr.fetchone())
+
+    def _name_match_sql(self, left, right):
+        """SQL condition matching similar names, index-assisted on ``left``."""
+        if self._has_trigram_support():
+            return f"lower({left}) %% lower({right})", f"similarity(lower({left}), lower({right}))"
+        normalize = "regexp_replace(lower({}), '[^a-z0-9]', '', 'g')"
+        match = f"{normalize.format(left)} = {normalize.format(right)}"
+        return match, f"CASE WHEN {match} THEN 1.0 ELSE 0.0 END"
+
+    @api.model
+    def find_duplicate_pairs(self, threshold=DEFAULT_SIMILARITY_THRESHOLD, limit=100):
+        """Find candidate duplicate supplier pairs by name similarity, email or phone.
+
+        Every pair is found with index lookups (trigram, lower(email), phone
+        digits) rather than comparing all suppliers with each other. Returns a
+        list of dicts sorted by decreasing name similarity.
+        """
+        self.check_access_rights('read')
+        self.flush(['name', 'email', 'phone'])
+        cr = self.env.cr
+        if self._has_trigram_support():
+            cr.execute("SELECT set_config('pg_trgm.similarity_threshold', %s, true)", (str(threshold),))
+        name_match, name_score = self._name_match_sql('a.name', 'b.name')
+        cr.execute(f"""
+            WITH pairs AS (
+                SELECT a.id AS id1, b.id AS id2, 'name' AS reason
+                  FROM material_supplier a
+                  JOIN material_supplier b ON {name_match} AND a.id < b.id
+                UNION ALL
+                SELECT a.id, b.id, 'email'
+                  FROM material_supplier a
+                  JOIN material_supplier b ON lower(a.email) = lower(b.email) AND a.id < b.id
+                 WHERE a.email IS NOT NULL AND a.email != '' AND b.email IS NOT NULL AND b.email != ''
+                UNION ALL
+                SELECT a.id, b.id, 'phone'
+                  FROM material_supplier a
+                  JOIN material_supplier b
+                    ON regexp_replace(a.phone, '[^0-9]', '', 'g') = regexp_replace(b.phone, '[^0-9]', '', 'g')
+                   AND a.id < b.id
+                 WHERE a.phone IS NOT NULL AND a.phone != '' AND b.phone IS NOT NULL AND b.phone != ''
+                   AND length(regexp_replace(a.phone, '[^0-9]', '', 'g')) >= 6
+            )
+            SELECT p.id1, a.name, p.id2, b.name, {name_score} AS score, array_agg(DISTINCT p.reason)
+              FROM pairs p
+              JOIN material_supplier a ON a.id = p.id1
+              JOIN material_supplier b ON b.id = p.id2
+          GROUP BY p.id1, a.name, p.id2, b.name
+          ORDER BY score DESC, p.id1, p.id2
+             LIMIT %s
+        """, (limit,))
+        return [{
+            'supplier_ids': [id1, id2],
+            'names': [name1, name2],
+            'name_similarity': round(float(score), 3),
+            'reasons': sorted(reasons),
+        } for id1, name1, id2, name2, score, reasons in cr.fetchall()]
+
+    @api.model
+    def find_similar_suppliers(self, name, email=None, phone=None, exclude_id=None,
+                               threshold=DEFAULT_SIMILARITY_THRESHOLD, limit=5):
+        """Return existing suppliers that look like duplicates of the given values.
+
+        Cheap enough to run on every create: each condition is an index lookup.
+        """
+        self.check_access_rights('read')
+        self.flush(['name', 'email', 'phone'])
+        cr = self.env.cr
+        if self._has_trigram_support():
+            cr.execute("SELECT set_config('pg_trgm.similarity_threshold', %s, true)", (str(threshold),))
+        name_match, name_score = self._name_match_sql('name', '%(name)s')
+        cr.execute(f"""
+            SELECT id, name, email, phone, {name_score} AS score,
+                   {name_match} AS name_match,
+                   (lower(email) = lower(%(email)s)) AS email_match,
+                   (regexp_replace(phone, '[^0-9]', '', 'g') = %(phone)s) AS phone_match
+              FROM material_supplier
+             WHERE ({name_match}
+                    OR (email IS NOT NULL AND email != '' AND lower(email) = lower(%(email)s))
+                    OR (phone IS NOT NULL AND phone != '' AND regexp_replace(phone, '[^0-9]', '', 'g') = %(phone)s))
+               AND id != %(exclude_id)s
+          ORDER BY score DESC, id
+             LIMIT %(limit)s
+        """, {
+            'name': name or '',
+            'email': email or None,
+            'phone': ''.join(c for c in (phone or '') if c.isdigit()) or None,
+            'exclude_id': exclude_id or 0,
+            'limit': limit,
+        })
+        return [{
+            'id': supplier_id,
+            'name': supplier_name,
+            'email': supplier_email,
+            'phone': supplier_phone,
+            'name_similarity': round(float(score), 3),
+            'reasons': [reason for reason, matched in
+                        (('name', name_match), ('email', email_match), ('phone', phone_match)) if matched],
+        } for supplier_id, supplier_name, supplier_email, supplier_phone, score,
+            name_match, email_match, phone_match in cr.fetchall()]
+
+    def get_supplier_summary(self, materials=None):
+        """Get detail information for a supplier, including its materials.
+
+        This is what GET /api/suppliers/<id> returns and what the catalog
+        snapshots store, pre-encoded. ``materials`` may be passed in when
+        they have already been loaded for several suppliers at once;
+        otherwise ``material_ids`` is used.
+        """
+        self.ensure_one()
+        if materials is None:
+            materials = self.material_ids
+        return {
+            'id': self.id,
+            'name': self.name,
+            'email': self.email,
+            'phone': self.phone,
+            'address': self.address,
+            'currency': self.currency_id.name,
+            'material_count': len(materials),
+            'material_price_min': self.material_price_min,
+            'material_price_max': self.material_price_max,
+            'material_price_avg': self.material_price_avg,
+            'materials': [{
+                'id': material.id,
+                'material_code': material.material_code,
+                'material_name': material.material_name,
+                'material_type': material.material_type,
+                'material_buy_price': material.material_buy_price,
+            } for material in materials],
+            'create_date': self.create_date.isoformat() if self.create_date else None,
+            'write_date': self.write_date.isoformat() if self.write_date else None,
+        }
+
+    def _outbox_payload(self):
+        """Supplier fields and aggregates, without the material list, as sent to webhook endpoints."""
+        return [{
+            'id': supplier.id,
+            'name': supplier.name,
+            'email': supplier.email,
+            'phone': supplier.phone,
+            'address': supplier.address,
+            'currency': supplier.currency_id.name,
+            'material_count': supplier.material_count,
+        } for supplier in self]
+
+    def _stream_keys(self):
+        return [[supplier.id, supplier.id, None] for supplier in self]
+
+    @api.model
+    def get_supplier_summaries(self, supplier_ids):
+        """Get detail information for many suppliers at once, in the order requested.
+
+        Returns a tuple ``(summaries, missing_ids)``. Suppliers and their
+        materials are each fetched with a single search.
+        """
+        suppliers = self.search([('id', 'in', list(supplier_ids))])
+        materials = self.env['material.registration'].search([('supplier_id', 'in', suppliers.ids)])
+        material_ids_by_supplier = defaultdict(list)
+        for material in materials:
+            material_ids_by_supplier[material.supplier_id.id].append(material.id)
+        by_id = {supplier.id: supplier for supplier in suppliers}
+        summaries = []
+        missing_ids = []
+        for supplier_id in supplier_ids:
+            supplier = by_id.get(supplier_id)
+            if supplier:
+                supplier_materials = materials.browse(material_ids_by_supplier[supplier.id])
+                summaries.append(supplier.get_supplier_summary(
+                    supplier_materials.with_prefetch(materials._prefetch_ids)))
+            else:
+                missing_ids.append(supplier_id)
+        return summaries, missing_ids
+
+    @api.model
+    def read_with_materials(self, domain, fields, material_fields, material_limit,
+                            material_domain=None, material_order=None, limit=None, offset=0, order=None):
+        """Read the suppliers matching ``domain``, each with up to ``material_limit`` materials.
+
+        Materials of every selected supplier are loaded together by
+        ``material.registration._read_by_supplier``, so the query count does
+        not depend on the number of suppliers. Returns the ``read`` values of
+        the suppliers, each with a ``materials`` list.
+        """
+        suppliers = self.search(domain, limit=limit, offset=offset, order=order)
+        rows = suppliers.read(fields)
+        materials = self.env['material.registration']._read_by_supplier(
+            suppliers.ids, material_fields, material_limit, material_domain, material_order)
+        for row in rows:
+            row['materials'] = materials.get(row['id'], [])
+        return rows
+
+    def _get_blocking_material_counts(self):
+        """Return {supplier_id: material_count} for suppliers in self that still have materials.
+
+        Runs as a single grouped query over the whole recordset instead of
+        loading ``material_ids`` per supplier.
+        """
+        if not self.ids:
+            return {}
+        self.env['material.registration'].flush(['supplier_id'])
+        self.env.cr.execute("""
+            SELECT supplier_id, COUNT(*)
+              FROM material_registration
+             WHERE supplier_id IN %s
+          GROUP BY supplier_id
+        """, (tuple(self.ids),))
+        return dict(self.env.cr.fetchall())
+
+    def _check_deletable(self):
+        """Raise a SupplierInUseError naming every supplier in self that has materials."""
+        blocking = self._get_blocking_material_counts()
+        if blocking:
+            names = ', '.join(
+                '"%s" (%d)' % (supplier.name, blocking[supplier.id])
+                for supplier in self.browse(sorted(blocking))
+            )
+            raise SupplierInUseError(_(
+                'Cannot delete supplier(s) %s because they have associated materials. '
+                'Please remove or reassign the materials first.'
+            ) % names, blocking)
+
     def unlink(self):
         """Prevent deletion if supplier has materials."""
-        for supplier in self:
-            if supplier.material_ids:
-                raise ValidationError(_(
-                    'Cannot delete supplier "%s" because it has associated materials. '
-                    'Please remove or reassign the materials first.'
-                ) % supplier.name)
-        return super(Supplier, self).unlink() 
\ No newline at end of file
+        self._check_deletable()
+        return super(Supplier, self).unlink()
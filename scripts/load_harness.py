@@ -0,0 +1,282 @@
+# -*- coding: utf-8 -*-
+"""Asyncio load generator for the material and supplier REST API.
+
+Authenticates against a running Odoo (e.g. the one started by
+``docker-compose up``), replays a weighted mix of list, detail, create,
+update and delete calls at a fixed concurrency and reports throughput and
+p50/p95/p99 latency per route.
+
+Example::
+
+    python scripts/load_harness.py --url http://localhost:8069 --db postgres \\
+        --concurrency 32 --duration 60 \\
+        --mix materials.list=40,materials.detail=30,materials.create=10,materials.update=10,materials.delete=5,suppliers.list=5
+
+Run it against a disposable database: update calls reprice existing
+records. Only records created by the run itself are deleted.
+
+Requires ``aiohttp`` (``pip install aiohttp``).
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import random
+import sys
+import time
+from collections import defaultdict
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - reported at runtime
+    aiohttp = None
+
+DEFAULT_MIX = (
+    'materials.list=40,materials.detail=30,materials.create=8,materials.update=8,materials.delete=4,'
+    'suppliers.list=5,suppliers.detail=5'
+)
+OPERATIONS = tuple(
+    f'{resource}.{action}'
+    for resource in ('materials', 'suppliers')
+    for action in ('list', 'detail', 'create', 'update', 'delete')
+)
+
+
+def parse_mix(mix):
+    """Parse "op=weight,..." into a dict, validating operation names."""
+    weights = {}
+    for item in mix.split(','):
+        if not item.strip():
+            continue
+        operation, _sep, weight = item.partition('=')
+        operation = operation.strip()
+        if operation not in OPERATIONS:
+            raise ValueError(f'Unknown operation "{operation}", expected one of: {", ".join(OPERATIONS)}')
+        weights[operation] = float(weight or 1)
+    if not weights:
+        raise ValueError('The operation mix is empty')
+    return weights
+
+
+def percentile(sorted_values, fraction):
+    """Return the nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    # Rank ceil(fraction * n), 1-based; the epsilon absorbs float error such as 0.95 * 100
+    index = min(len(sorted_values) - 1, max(0, math.ceil(fraction * len(sorted_values) - 1e-9) - 1))
+    return sorted_values[index]
+
+
+class Stats(object):
+    """Latency samples and error counts per route."""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+
+    def record(self, route, latency, status, ok):
+        self.latencies[route].append(latency)
+        self.statuses[route][status] += 1
+        if not ok:
+            self.errors[route] += 1
+
+    def report(self, elapsed):
+        rows = []
+        for route in sorted(self.latencies):
+            samples = sorted(self.latencies[route])
+            rows.append({
+                'route': route,
+                'requests': len(samples),
+                'errors': self.errors[route],
+                'rps': len(samples) / elapsed if elapsed else 0.0,
+                'p50_ms': percentile(samples, 0.50) * 1000,
+                'p95_ms': percentile(samples, 0.95) * 1000,
+                'p99_ms': percentile(samples, 0.99) * 1000,
+                'max_ms': samples[-1] * 1000,
+                'statuses': dict(self.statuses[route]),
+            })
+        total = sum(len(v) for v in self.latencies.values())
+        return {
+            'elapsed_s': elapsed,
+            'total_requests': total,
+            'total_errors': sum(self.errors.values()),
+            'total_rps': total / elapsed if elapsed else 0.0,
+            'routes': rows,
+        }
+
+
+class LoadHarness(object):
+    """Drive the API with a weighted operation mix at a fixed concurrency."""
+
+    def __init__(self, args):
+        self.args = args
+        self.base_url = args.url.rstrip('/')
+        self.weights = parse_mix(args.mix)
+        self.stats = Stats()
+        self.material_ids = []
+        self.supplier_ids = []
+        self.created_ids = {'materials': [], 'suppliers': []}
+        self.seed_supplier_id = None
+        self.counter = itertools.count()
+        self.run_tag = f'LH{int(time.time())}'
+
+    async def authenticate(self, session):
+        payload = {
+            'jsonrpc': '2.0',
+            'params': {'db': self.args.db, 'login': self.args.login, 'password': self.args.password},
+        }
+        async with session.post(f'{self.base_url}/web/session/authenticate', json=payload) as response:
+            body = await response.json(content_type=None)
+            if response.status != 200 or not (body.get('result') or {}).get('uid'):
+                raise RuntimeError(f'Authentication failed: {body.get("error") or body}')
+
+    async def call(self, session, route, method, path, **kwargs):
+        """Perform one request, recording its latency under ``route``.
+
+        Return ``(ok, body)``, the body being the decoded JSON response of a
+        successful call and None otherwise.
+        """
+        started = time.perf_counter()
+        status, body = 0, None
+        try:
+            async with session.request(method, f'{self.base_url}{path}', **kwargs) as response:
+                status = response.status
+                text = await response.text()
+            try:
+                body = json.loads(text)
+            except ValueError:
+                body = None
+        except aiohttp.ClientError:
+            pass
+        ok = 200 <= status < 300 and not (isinstance(body, dict) and body.get('success') is False)
+        self.stats.record(route, time.perf_counter() - started, status, ok)
+        return ok, body if ok else None
+
+    async def setup(self, session):
+        """Create a supplier to attach materials to and collect existing IDs."""
+        name = f'Load Harness Supplier {self.run_tag}'
+        ok, body = await self.call(session, 'setup', 'POST', '/api/suppliers', json={'name': name})
+        if not ok:
+            raise RuntimeError(f'Could not create the load harness supplier "{name}"; '
+                               f'check the credentials and the server log')
+        self.seed_supplier_id = body['data']['id']
+        _ok, body = await self.call(session, 'setup', 'GET', '/api/materials', params={'limit': 500})
+        self.material_ids = [m['id'] for m in (body or {}).get('data', [])]
+        _ok, body = await self.call(session, 'setup', 'GET', '/api/suppliers', params={'limit': 500})
+        self.supplier_ids = [s['id'] for s in (body or {}).get('data', [])]
+
+    async def run_operation(self, session, operation):
+        resource, action = operation.split('.')
+        ids = self.material_ids if resource == 'materials' else self.supplier_ids
+        base = f'/api/{resource}'
+        if action == 'list':
+            await self.call(session, f'GET {base}', 'GET', base,
+                            params={'limit': self.args.page_size, 'offset': random.randint(0, 4) * self.args.page_size})
+        elif action == 'detail':
+            if ids:
+                await self.call(session, f'GET {base}/<id>', 'GET', f'{base}/{random.choice(ids)}')
+        elif action == 'create':
+            seq = next(self.counter)
+            if resource == 'materials':
+                payload = {
+                    'material_code': f'{self.run_tag}-{seq}',
+                    'material_name': f'Load Material {seq}',
+                    'material_type': random.choice(['fabric', 'jeans', 'cotton']),
+                    'material_buy_price': round(random.uniform(100, 2000), 2),
+                    'supplier_id': self.seed_supplier_id,
+                }
+            else:
+                payload = {'name': f'Load Supplier {self.run_tag}-{seq}', 'email': f'load{seq}@example.com'}
+            ok, body = await self.call(session, f'POST {base}', 'POST', base, json=payload)
+            if ok:
+                ids.append(body['data']['id'])
+                self.created_ids[resource].append(body['data']['id'])
+        elif action == 'update':
+            if ids:
+                payload = ({'material_buy_price': round(random.uniform(100, 2000), 2)} if resource == 'materials'
+                           else {'phone': f'+1-555-{random.randint(1000, 9999)}'})
+                await self.call(session, f'PUT {base}/<id>', 'PUT', f'{base}/{random.choice(ids)}', json=payload)
+        elif action == 'delete':
+            # Only delete records created by this run
+            own = self.created_ids[resource]
+            if own:
+                record_id = own.pop(random.randrange(len(own)))
+                if record_id in ids:
+                    ids.remove(record_id)
+                await self.call(session, f'DELETE {base}/<id>', 'DELETE', f'{base}/{record_id}')
+
+    async def worker(self, session, deadline, budget):
+        operations = list(self.weights)
+        weights = [self.weights[o] for o in operations]
+        while time.monotonic() < deadline:
+            if budget is not None:
+                if budget[0] <= 0:
+                    return
+                budget[0] -= 1
+            await self.run_operation(session, random.choices(operations, weights)[0])
+
+    async def run(self):
+        timeout = aiohttp.ClientTimeout(total=self.args.timeout)
+        connector = aiohttp.TCPConnector(limit=self.args.concurrency)
+        async with aiohttp.ClientSession(timeout=timeout, connector=connector,
+                                         cookie_jar=aiohttp.CookieJar(unsafe=True)) as session:
+            await self.authenticate(session)
+            await self.setup(session)
+            self.stats = Stats()
+            budget = [self.args.requests] if self.args.requests else None
+            started = time.monotonic()
+            deadline = started + self.args.duration
+            await asyncio.gather(*(self.worker(session, deadline, budget) for _i in range(self.args.concurrency)))
+            return self.stats.report(time.monotonic() - started)
+
+
+def format_report(report):
+    lines = [
+        f"{'route':<32} {'reqs':>7} {'errs':>6} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}",
+    ]
+    for row in report['routes']:
+        lines.append(
+            f"{row['route']:<32} {row['requests']:>7} {row['errors']:>6} {row['rps']:>8.1f} "
+            f"{row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f} {row['max_ms']:>8.1f}"
+        )
+    lines.append(
+        f"total: {report['total_requests']} requests, {report['total_errors']} errors, "
+        f"{report['total_rps']:.1f} req/s over {report['elapsed_s']:.1f}s"
+    )
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--url', default='http://localhost:8069', help='Odoo base URL')
+    parser.add_argument('--db', default='postgres', help='Database name')
+    parser.add_argument('--login', default='admin')
+    parser.add_argument('--password', default='admin')
+    parser.add_argument('--concurrency', type=int, default=16, help='Number of concurrent clients')
+    parser.add_argument('--duration', type=float, default=30.0, help='Run time in seconds')
+    parser.add_argument('--requests', type=int, default=0, help='Stop after this many requests (0: no limit)')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help='Weighted operation mix, e.g. materials.list=50,...')
+    parser.add_argument('--page-size', type=int, default=50, help='limit used for list calls')
+    parser.add_argument('--timeout', type=float, default=30.0, help='Per-request timeout in seconds')
+    parser.add_argument('--json', metavar='FILE', help='Also write the report as JSON to FILE')
+    parser.add_argument('--seed', type=int, help='Random seed for a reproducible operation sequence')
+    args = parser.parse_args(argv)
+
+    if aiohttp is None:
+        parser.error('aiohttp is required: pip install aiohttp')
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    report = asyncio.run(LoadHarness(args).run())
+    print(format_report(report))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 0 if report['total_requests'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
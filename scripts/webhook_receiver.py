@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""Minimal webhook receiver for trying out the material change outbox.
+
+Listens for the JSON batches POSTed by the outbox cron, prints one line per
+event and answers 204. With ``--secret`` the ``X-Material-Signature`` header
+is checked and batches with a wrong signature are refused with 401, which
+makes the sender retry later.
+
+Example::
+
+    python scripts/webhook_receiver.py --port 8075 --secret s3cret
+
+then add an endpoint with URL ``http://<host>:8075/`` under
+Configuration > Webhooks.
+"""
+
+import argparse
+import hashlib
+import hmac
+import json
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+
+def make_handler(secret=None, fail=False):
+    class WebhookHandler(BaseHTTPRequestHandler):
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+            if secret:
+                expected = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+                if not hmac.compare_digest(expected, self.headers.get('X-Material-Signature', '')):
+                    self.send_response(401)
+                    self.end_headers()
+                    print('Refused batch: bad signature')
+                    return
+            if fail:
+                self.send_response(503)
+                self.end_headers()
+                return
+            for event in json.loads(body)['events']:
+                print(f"#{event['id']} {event['model']} {event['res_id']} {event['event']}: "
+                      f"{json.dumps(event['data'])}")
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, format, *args):
+            pass
+
+    return WebhookHandler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Print material outbox webhook batches.')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=8075)
+    parser.add_argument('--secret', help='Shared secret of the endpoint, to verify signatures')
+    parser.add_argument('--fail', action='store_true', help='Answer 503 to every batch, to exercise retries')
+    opts = parser.parse_args(argv)
+    server = HTTPServer((opts.host, opts.port), make_handler(opts.secret, opts.fail))
+    print(f'Listening on http://{opts.host}:{opts.port}/')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
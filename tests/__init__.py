@@ -3,4 +3,16 @@
 from . import test_supplier_model
 from . import test_material_model
 from . import test_material_controller
-from . import test_supplier_controller 
\ No newline at end of file
+from . import test_supplier_controller
+from . import test_batch_controller 
+from . import test_seed
+from . import test_query_plans
+from . import test_query_budget
+from . import test_stock
+from . import test_outbox
+from . import test_stream
+from . import test_catalog
+from . import test_audit
+from . import test_profiling
+from . import test_integrity
+from . import test_load_harness
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+
+from contextlib import contextmanager
+from unittest.mock import patch
+
+
+@contextmanager
+def capture_queries(cr):
+    """Record every ``(query, params)`` executed on ``cr`` inside the block.
+
+    Yields the list the statements are appended to, in execution order.
+    """
+    queries = []
+    execute = cr.execute
+
+    def recording_execute(query, params=None, log_exceptions=None):
+        queries.append((query, params))
+        if log_exceptions is None:
+            return execute(query, params)
+        return execute(query, params, log_exceptions)
+
+    with patch.object(cr, 'execute', recording_execute):
+        yield queries
+
+
+def _format_queries(queries):
+    """Render captured queries, identical statements collapsed with a count."""
+    counts = {}
+    for query, _params in queries:
+        text = ' '.join(str(query if isinstance(query, str) else query.decode()).split())
+        counts[text] = counts.get(text, 0) + 1
+    return '\n'.join(f'  {count} x {text}' for text, count in counts.items())
+
+
+class QueryBudgetMixin(object):
+    """Assertions on the number of SQL queries a block of code runs.
+
+    Mix into a test case to catch N+1 patterns: ``assertQueryBudget`` caps
+    the queries of one block, ``assertQueriesFlat`` checks that the count
+    stays the same whatever the number of records involved.
+    """
+
+    @contextmanager
+    def assertQueryBudget(self, budget, cr=None):
+        """Fail, listing the SQL, if the block runs more than ``budget`` queries."""
+        with capture_queries(cr or self.env.cr) as queries:
+            yield queries
+        if len(queries) > budget:
+            self.fail(f'{len(queries)} queries executed, budget is {budget}:\n{_format_queries(queries)}')
+
+    def assertQueriesFlat(self, prepare, run, budget, sizes=(2, 10)):
+        """Check that ``run(prepare(size))`` costs the same, bounded, query count for every size.
+
+        ``prepare(size)`` builds ``size`` records and returns what ``run``
+        needs. The record cache is cleared before each ``run`` so that
+        prefetching is measured, not cache hits.
+        """
+        runs = []
+        for size in sizes:
+            target = prepare(size)
+            self.env['base'].flush()
+            self.env['base'].invalidate_cache()
+            with self.assertQueryBudget(budget) as queries:
+                run(target)
+            runs.append((size, queries))
+        (small, small_queries), (large, large_queries) = runs[0], runs[-1]
+        if len(large_queries) > len(small_queries):
+            self.fail(
+                f'Query count grows with the number of records: {len(small_queries)} for {small}, '
+                f'{len(large_queries)} for {large}:\n{_format_queries(large_queries)}'
+            )
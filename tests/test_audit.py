@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+
+import datetime
+import json
+import os
+from unittest.mock import patch
+
+from odoo.tests.common import HttpCase, TransactionCase
+
+from ..controllers import audit
+from ..models.audit import insert_audit_entries
+
+
+def _entry(date, path='/api/materials'):
+    return {
+        'date': date, 'user_id': None, 'login': 'auditor', 'method': 'GET', 'path': path,
+        'params': '{}', 'status': 200, 'duration_ms': 1.0, 'remote_addr': '127.0.0.1',
+    }
+
+
+class TestAuditBuffer(TransactionCase):
+    """Test cases for API audit buffering and retention."""
+
+    def _buffer(self, **settings):
+        buffer = audit.AuditBuffer()
+        # Pretend the flusher runs already: entries stay in memory
+        buffer._pid = os.getpid()
+        options = dict(buffer_size=3, flush_size=100, flush_interval=5.0, drop_policy='drop_oldest')
+        options.update(settings)
+        self.patch(audit, 'audit_settings', lambda: options)
+        written = []
+        self.patch(buffer, '_write', written.extend)
+        return buffer, written
+
+    def _paths(self, buffer):
+        return [entry['path'] for _db, entry in buffer._entries]
+
+    def test_drop_oldest(self):
+        buffer, written = self._buffer(drop_policy='drop_oldest')
+        for i in range(5):
+            buffer.add('db', _entry(None, f'/{i}'))
+        self.assertEqual(self._paths(buffer), ['/2', '/3', '/4'])
+        self.assertEqual(buffer.dropped, 2)
+        self.assertFalse(written)
+
+    def test_drop_newest(self):
+        buffer, written = self._buffer(drop_policy='drop_newest')
+        for i in range(5):
+            buffer.add('db', _entry(None, f'/{i}'))
+        self.assertEqual(self._paths(buffer), ['/0', '/1', '/2'])
+        self.assertEqual(buffer.dropped, 2)
+
+    def test_block_writes_synchronously(self):
+        buffer, written = self._buffer(drop_policy='block')
+        for i in range(5):
+            buffer.add('db', _entry(None, f'/{i}'))
+        self.assertEqual([entry['path'] for _db, entry in written], ['/0', '/1', '/2'])
+        self.assertEqual(self._paths(buffer), ['/3', '/4'])
+        self.assertEqual(buffer.dropped, 0)
+
+    def test_flush_size_wakes_flusher(self):
+        buffer, written = self._buffer(flush_size=2)
+        buffer.add('db', _entry(None))
+        self.assertFalse(buffer._wakeup.is_set())
+        buffer.add('db', _entry(None))
+        self.assertTrue(buffer._wakeup.is_set())
+        buffer.flush()
+        self.assertEqual(len(written), 2)
+        self.assertFalse(buffer._entries)
+
+    def test_purge_expired(self):
+        Audit = self.env['material.api.audit']
+        now = datetime.datetime.utcnow()
+        insert_audit_entries(self.env.cr, [
+            _entry(now - datetime.timedelta(days=40), '/old'),
+            _entry(now - datetime.timedelta(days=1), '/recent'),
+        ])
+        self.assertGreaterEqual(Audit._purge_expired(retention_days=30), 1)
+        self.assertFalse(Audit.search([('path', '=', '/old')]))
+        self.assertTrue(Audit.search([('path', '=', '/recent')]))
+
+
+class TestAuditApi(HttpCase):
+    """Test cases for recording API calls."""
+
+    def setUp(self):
+        super(TestAuditApi, self).setUp()
+        self.authenticate('admin', 'admin')
+        self.Audit = self.env['material.api.audit']
+
+    def test_calls_are_recorded(self):
+        start = self.Audit.search([], order='id desc', limit=1).id or 0
+        self.url_open('/api/materials?limit=5&material_type=jeans')
+        self.url_open('/api/suppliers/999999999')
+
+        entries = self.Audit.search([('id', '>', start)], order='id')
+        self.assertEqual(entries.mapped('path'), ['/api/materials', '/api/suppliers/999999999'])
+        self.assertEqual(entries.mapped('status'), [200, 404])
+        self.assertEqual(set(entries.mapped('login')), {'admin'})
+        self.assertEqual(json.loads(entries[0].params), {'limit': '5', 'material_type': 'jeans'})
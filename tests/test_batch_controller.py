@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+
+import json
+
+from odoo.tests.common import HttpCase
+from odoo.exceptions import ValidationError
+
+from ..controllers.batch_controller import BatchController
+
+
+class TestBatchController(HttpCase):
+    """Test cases for the batch API endpoint."""
+
+    def setUp(self):
+        """Set up test data."""
+        super(TestBatchController, self).setUp()
+        self.controller = BatchController()
+
+    def test_resolve_refs(self):
+        refs = {'sup': 42}
+        values = self.controller._resolve_refs({'supplier_id': '$sup', 'material_code': 'BATCH001'}, refs)
+        self.assertEqual(values, {'supplier_id': 42, 'material_code': 'BATCH001'})
+
+    def test_resolve_unknown_ref(self):
+        with self.assertRaises(ValidationError):
+            self.controller._resolve_refs({'supplier_id': '$missing'}, {})
+
+    def _post_batch(self, operations):
+        """POST a batch and return the HTTP status and JSON body of the response."""
+        self.authenticate('admin', 'admin')
+        response = self.url_open('/api/batch', data=json.dumps({'operations': operations}),
+                                 headers={'Content-Type': 'application/json'})
+        return response.status_code, response.json()
+
+    def _supplier_and_material_operations(self, code):
+        return [
+            {'ref': 'sup', 'model': 'material.supplier', 'method': 'create',
+             'values': {'name': f'Batch Supplier {code}', 'email': 'batch@supplier.com'}},
+            {'ref': 'mat', 'model': 'material.registration', 'method': 'create',
+             'values': {'material_code': code, 'material_name': 'Batch Material', 'material_type': 'fabric',
+                        'material_buy_price': 150.0, 'supplier_id': '$sup'}},
+        ]
+
+    def test_batch_chains_refs(self):
+        operations = self._supplier_and_material_operations('BATCH100') + [
+            {'model': 'material.registration', 'method': 'write', 'id': '$mat',
+             'values': {'material_buy_price': 300.0}},
+        ]
+        status, body = self._post_batch(operations)
+
+        self.assertEqual(status, 200)
+        self.assertTrue(body['success'])
+        material = self.env['material.registration'].search([('material_code', '=', 'BATCH100')])
+        self.assertEqual(material.material_buy_price, 300.0)
+        self.assertEqual(material.supplier_id.name, 'Batch Supplier BATCH100')
+        self.assertEqual([r['id'] for r in body['data']], [material.supplier_id.id, material.id, material.id])
+
+    def test_batch_is_all_or_nothing(self):
+        operations = self._supplier_and_material_operations('BATCH200') + [
+            {'model': 'material.registration', 'method': 'write', 'id': '$mat',
+             'values': {'material_buy_price': 50.0}},
+        ]
+        status, body = self._post_batch(operations)
+
+        self.assertEqual(status, 400)
+        self.assertFalse(body['success'])
+        self.assertEqual(body['operation_index'], 2)
+        # The supplier and material created by the first operations were rolled back
+        self.assertFalse(self.env['material.supplier'].search([('name', '=', 'Batch Supplier BATCH200')]))
+        self.assertFalse(self.env['material.registration'].search([('material_code', '=', 'BATCH200')]))
+
+    def test_batch_rejects_missing_operations(self):
+        status, body = self._post_batch([])
+        self.assertEqual(status, 400)
+        self.assertIsNone(body['operation_index'])
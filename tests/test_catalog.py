@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+
+import json
+from unittest.mock import patch
+
+from odoo.tests.common import HOST, PORT, HttpCase, TransactionCase
+
+
+class CatalogData(object):
+    """Builders shared by the catalog snapshot tests."""
+
+    def _make_supplier(self, name, material_count=2):
+        supplier = self.env['material.supplier'].create({'name': name, 'email': 'catalog@example.com'})
+        self.env['material.registration'].create([{
+            'material_code': f'CAT{supplier.id}-{i}',
+            'material_name': f'Catalog Material {i}',
+            'material_type': 'cotton',
+            'material_buy_price': 150.0 + i,
+            'supplier_id': supplier.id,
+        } for i in range(material_count)])
+        return supplier
+
+    def _catalog(self, supplier):
+        return self.env['material.supplier.catalog'].search([('supplier_id', '=', supplier.id)])
+
+
+class TestSupplierCatalog(CatalogData, TransactionCase):
+    """Test cases for the pre-rendered supplier catalog snapshots."""
+
+    def setUp(self):
+        """Set up test data."""
+        super(TestSupplierCatalog, self).setUp()
+        self.Catalog = self.env['material.supplier.catalog']
+        self.supplier = self._make_supplier('Catalog Supplier')
+        self.Catalog._refresh(limit=10000)
+
+    def test_refresh_builds_snapshot(self):
+        catalog = self._catalog(self.supplier)
+        self.assertFalse(catalog.stale_since)
+        self.assertEqual(json.loads(catalog.body), json.loads(json.dumps(self.supplier.get_supplier_summary())))
+        self.assertEqual(catalog.version, self.supplier.get_version())
+
+    def test_changes_mark_stale(self):
+        material = self.supplier.material_ids[0]
+        material.write({'material_buy_price': 300.0})
+        catalog = self._catalog(self.supplier)
+        catalog.invalidate_cache()
+        self.assertTrue(catalog.stale_since)
+        stale_body = json.loads(catalog.body)
+        self.assertNotIn(300.0, [m['material_buy_price'] for m in stale_body['materials']])
+
+        self.Catalog._refresh(limit=10000)
+        catalog.invalidate_cache()
+        self.assertFalse(catalog.stale_since)
+        self.assertIn(300.0, [m['material_buy_price'] for m in json.loads(catalog.body)['materials']])
+
+    def test_change_during_rebuild_keeps_snapshot_stale(self):
+        self.supplier.write({'phone': '+1-555-0100'})
+        build_bodies = type(self.Catalog)._build_bodies
+
+        def build_then_change(catalog, supplier_ids):
+            built = build_bodies(catalog, supplier_ids)
+            # A change committed while the bodies were being built
+            self.supplier.write({'phone': '+1-555-0101'})
+            return built
+
+        with patch.object(type(self.Catalog), '_build_bodies', build_then_change):
+            self.Catalog._refresh(limit=10000)
+        catalog = self._catalog(self.supplier)
+        catalog.invalidate_cache()
+        self.assertTrue(catalog.stale_since)
+
+
+class TestSupplierCatalogApi(CatalogData, HttpCase):
+    """Test cases for serving supplier details from catalog snapshots."""
+
+    def setUp(self):
+        """Set up test data."""
+        super(TestSupplierCatalogApi, self).setUp()
+        self.authenticate('admin', 'admin')
+        self.supplier = self._make_supplier('Catalog Api Supplier', material_count=3)
+
+    def _get(self, url):
+        self.env['base'].flush()
+        response = self.url_open(url)
+        self.assertEqual(response.status_code, 200, response.text)
+        return response, json.loads(response.text)
+
+    def test_snapshot_served_with_metadata(self):
+        # Not built yet: live data
+        _response, data = self._get(f'/api/suppliers/{self.supplier.id}')
+        self.assertIsNone(data['snapshot'])
+        self.assertEqual(len(data['data']['materials']), 3)
+
+        self.env['material.supplier.catalog']._refresh(limit=10000)
+        response, data = self._get(f'/api/suppliers/{self.supplier.id}')
+        self.assertFalse(data['snapshot']['stale'])
+        self.assertEqual(len(data['data']['materials']), 3)
+        self.assertIn('Age', response.headers)
+        # Snapshots have the same shape as the ?ids= listing
+        _response, listing = self._get(f'/api/suppliers?ids={self.supplier.id}')
+        self.assertEqual(data['data'], listing['data'][0])
+
+        self.supplier.write({'address': 'New Address'})
+        _response, data = self._get(f'/api/suppliers/{self.supplier.id}')
+        self.assertTrue(data['snapshot']['stale'])
+        self.assertFalse(data['data']['address'])
+
+        _response, data = self._get(f'/api/suppliers/{self.supplier.id}?fresh=1')
+        self.assertIsNone(data['snapshot'])
+        self.assertEqual(data['data']['address'], 'New Address')
+
+    def test_stale_snapshot_not_served_after_own_write(self):
+        self.env['material.supplier.catalog']._refresh(limit=10000)
+        self.env['base'].flush()
+        response = self.opener.put(f'http://{HOST}:{PORT}/api/suppliers/{self.supplier.id}',
+                                   json={'address': 'Own Address'})
+        self.assertEqual(response.status_code, 200, response.text)
+
+        # The snapshot is stale and this session just wrote: live data
+        _response, data = self._get(f'/api/suppliers/{self.supplier.id}')
+        self.assertIsNone(data['snapshot'])
+        self.assertEqual(data['data']['address'], 'Own Address')
+
+        # Once rebuilt, the snapshot is served again
+        self.env['material.supplier.catalog']._refresh(limit=10000)
+        _response, data = self._get(f'/api/suppliers/{self.supplier.id}')
+        self.assertFalse(data['snapshot']['stale'])
+        self.assertEqual(data['data']['address'], 'Own Address')
+
+    def test_snapshot_respects_record_rules(self):
+        self.env['material.supplier.catalog']._refresh(limit=10000)
+        self.env['ir.rule'].create({
+            'name': 'Hide catalog api supplier',
+            'model_id': self.env['ir.model']._get_id('material.supplier'),
+            'domain_force': f"[('id', '!=', {self.supplier.id})]",
+        })
+        self.env['base'].flush()
+        response = self.url_open(f'/api/suppliers/{self.supplier.id}')
+        self.assertEqual(response.status_code, 403, response.text)
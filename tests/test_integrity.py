@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+
+from odoo.tests.common import HttpCase, TransactionCase
+
+
+class TestIntegrityRepair(TransactionCase):
+    """Test cases for the chunked repair of stored denormalized fields."""
+
+    def setUp(self):
+        super(TestIntegrityRepair, self).setUp()
+        self.supplier = self.env['material.supplier'].create({'name': 'Integrity Supplier', 'email': 'integrity@supplier.com'})
+        self.materials = self.env['material.registration'].create([{
+            'material_code': f'INT00{i}',
+            'material_name': f'Integrity Material {i}',
+            'material_type': 'fabric',
+            'material_buy_price': 150.0 * i,
+            'supplier_id': self.supplier.id,
+        } for i in range(1, 4)])
+        self.env['base'].flush()
+        self.Run = self.env['material.integrity.run']
+
+    def _corrupt(self):
+        material1, material2 = self.materials[0], self.materials[1]
+        self.expected_band = material2.price_band_id
+        self.env.cr.execute("UPDATE material_registration SET supplier_name = 'Stale Name' WHERE id = %s", (material1.id,))
+        self.env.cr.execute("UPDATE material_registration SET price_band_id = NULL WHERE id = %s", (material2.id,))
+        self.env.cr.execute("UPDATE material_supplier SET material_count = 99 WHERE id = %s", (self.supplier.id,))
+        self.env['base'].invalidate_cache()
+
+    def _run_to_completion(self, run, chunk_size):
+        while run._run(chunk_size=chunk_size, time_budget=0):
+            pass
+        return run
+
+    def test_repairs_drifted_values(self):
+        self._corrupt()
+        run = self._run_to_completion(self.Run._get_or_start(restart=True), chunk_size=1000)
+
+        self.assertEqual(run.state, 'done')
+        self.assertEqual(self.materials[0].supplier_name, 'Integrity Supplier')
+        self.assertEqual(self.materials[1].price_band_id, self.expected_band)
+        self.assertEqual(self.supplier.material_count, 3)
+
+        report = run._get_api_data()['report']
+        self.assertIn({'id': self.materials[0].id, 'old': 'Stale Name', 'new': 'Integrity Supplier'},
+                      report['supplier_name']['samples'])
+        self.assertIn({'id': self.materials[1].id, 'old': None, 'new': self.expected_band.id},
+                      report['price_band_id']['samples'])
+        self.assertIn({'id': self.supplier.id, 'old': 99, 'new': 3}, report['material_count']['samples'])
+        self.assertGreaterEqual(run.rows_fixed, 3)
+
+        # Nothing left to fix on a second pass
+        run = self._run_to_completion(self.Run._get_or_start(restart=True), chunk_size=1000)
+        self.assertEqual(run.rows_fixed, 0)
+
+    def test_interrupted_run_resumes(self):
+        self._corrupt()
+        run = self.Run._get_or_start(restart=True)
+        self.assertTrue(run._run(chunk_size=1, time_budget=0))
+        self.assertEqual(run.state, 'running')
+        self.assertEqual(run.check_name, 'supplier_name')
+        position = run.last_id
+        self.assertTrue(position)
+
+        # A later call picks up the same run at its position
+        self.assertEqual(self.Run._get_or_start(), run)
+        run._run(chunk_size=1, time_budget=0)
+        self.assertGreater(run.last_id, position)
+
+        self._run_to_completion(run, chunk_size=2)
+        self.assertEqual(run.state, 'done')
+        self.assertEqual(self.materials[0].supplier_name, 'Integrity Supplier')
+        self.assertEqual(self.supplier.material_count, 3)
+
+
+class TestIntegrityApi(HttpCase):
+    """Test cases for the integrity repair endpoints."""
+
+    def test_repair_endpoint(self):
+        supplier = self.env['material.supplier'].create({'name': 'Integrity API Supplier', 'email': 'integrity-api@supplier.com'})
+        self.env['material.registration'].create({'material_code': 'INTAPI', 'material_name': 'Integrity API Material', 'material_type': 'jeans', 'material_buy_price': 150.0, 'supplier_id': supplier.id})
+        self.env['base'].flush()
+        self.env.cr.execute("UPDATE material_supplier SET material_count = 0 WHERE id = %s", (supplier.id,))
+
+        self.authenticate('admin', 'admin')
+        response = self.url_open('/api/integrity/repair?restart=1&time_budget=30', data={})
+        self.assertEqual(response.status_code, 200, response.text)
+        data = response.json()['data']
+        self.assertEqual(data['state'], 'done')
+        self.assertIn({'id': supplier.id, 'old': 0, 'new': 1}, data['report']['material_count']['samples'])
+
+        response = self.url_open('/api/integrity')
+        self.assertEqual(response.json()['data']['id'], data['id'])
+
+        response = self.url_open('/api/integrity/repair?chunk_size=0', data={})
+        self.assertEqual(response.status_code, 400)
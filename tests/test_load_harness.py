@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+
+from odoo.tests.common import TransactionCase
+
+from ..scripts.load_harness import parse_mix, percentile
+
+
+class TestLoadHarness(TransactionCase):
+    """Test cases for the load harness helpers."""
+
+    def test_parse_mix(self):
+        self.assertEqual(parse_mix('materials.list=40, suppliers.detail=5,,materials.create'),
+                         {'materials.list': 40.0, 'suppliers.detail': 5.0, 'materials.create': 1.0})
+        with self.assertRaises(ValueError):
+            parse_mix('materials.explode=1')
+        with self.assertRaises(ValueError):
+            parse_mix(' , ')
+
+    def test_percentile(self):
+        samples = list(range(1, 101))
+        self.assertEqual(percentile(samples, 0.50), 50)
+        self.assertEqual(percentile(samples, 0.95), 95)
+        self.assertEqual(percentile(samples, 0.99), 99)
+        self.assertEqual(percentile(samples, 1.0), 100)
+        self.assertEqual(percentile([7], 0.99), 7)
+        self.assertEqual(percentile([], 0.5), 0.0)
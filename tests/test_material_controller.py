@@ -1,8 +1,13 @@
 # -*- coding: utf-8 -*-
 
 import json
-from odoo.tests.common import HttpCase
+from unittest.mock import patch
+from odoo.tests.common import HOST, PORT, HttpCase
 from odoo.http import request
+from odoo.tools import config
+
+from ..controllers import concurrency, replica, schemas
+from ..controllers.openapi_controller import build_openapi_document
 
 
 class TestMaterialController(HttpCase):
@@ -27,6 +32,31 @@ class TestMaterialController(HttpCase):
         self.assertEqual(material.material_buy_price, 150.0)
         self.assertEqual(material.supplier_id.id, supplier.id)
 
+    def test_create_materials_over_http(self):
+        supplier = self.env['material.supplier'].create({'name': 'Test API Supplier', 'email': 'api@supplier.com'})
+        self.env['base'].flush()
+        headers = {'Content-Type': 'application/json'}
+
+        def payload(code):
+            return {'material_code': code, 'material_name': f'Bulk Material {code}', 'material_type': 'cotton',
+                    'material_buy_price': 150.0, 'supplier_id': supplier.id}
+
+        response = self.url_open('/api/materials', data=json.dumps(payload('BULK001')), headers=headers)
+        self.assertEqual(response.status_code, 200, response.text)
+        self.assertEqual(response.json()['data']['material_code'], 'BULK001')
+
+        response = self.url_open('/api/materials', data=json.dumps([payload('BULK002'), payload('BULK003')]),
+                                 headers=headers)
+        self.assertEqual(response.status_code, 200, response.text)
+        self.assertEqual([m['material_code'] for m in response.json()['data']], ['BULK002', 'BULK003'])
+
+        # A duplicate code in the list rejects the whole list
+        response = self.url_open('/api/materials', data=json.dumps([payload('BULK004'), payload('BULK001')]),
+                                 headers=headers)
+        self.assertEqual(response.status_code, 400, response.text)
+        self.assertEqual(response.json()['error_type'], 'validation')
+        self.assertFalse(self.env['material.registration'].search([('material_code', '=', 'BULK004')]))
+
     def test_create_material_validation_error(self):
         supplier = self.env['material.supplier'].create({'name': 'Test API Supplier', 'email': 'api@supplier.com'})
         with self.assertRaises(Exception):
@@ -47,10 +77,154 @@ class TestMaterialController(HttpCase):
         self.assertEqual(material.material_name, 'Updated Material')
         self.assertEqual(material.material_buy_price, 175.0)
 
+    def test_conditional_update(self):
+        supplier = self.env['material.supplier'].create({'name': 'Test API Supplier', 'email': 'api@supplier.com'})
+        material = self.env['material.registration'].create({'material_code': 'API001', 'material_name': 'API Test Material 1', 'material_type': 'fabric', 'material_buy_price': 150.0, 'supplier_id': supplier.id})
+        self.env['material.registration'].create({'material_code': 'API002', 'material_name': 'API Test Material 2', 'material_type': 'fabric', 'material_buy_price': 150.0, 'supplier_id': supplier.id})
+        self.env['base'].flush()
+        url = f'http://{HOST}:{PORT}/api/materials/{material.id}'
+
+        response = self.opener.put(url, json={'material_buy_price': 180.0},
+                                   headers={'If-Match': '"2000-01-01T00:00:00.000000"'})
+        self.assertEqual(response.status_code, 412, response.text)
+        self.assertFalse(response.json()['success'])
+
+        response = self.opener.put(url, json={'material_buy_price': 180.0},
+                                   headers={'If-Match': concurrency.etag_for(material)})
+        self.assertEqual(response.status_code, 200, response.text)
+        material.invalidate_cache()
+        self.assertEqual(material.material_buy_price, 180.0)
+        self.assertEqual(response.headers['ETag'], concurrency.etag_for(material))
+        self.assertEqual(response.json()['data']['material_buy_price'], 180.0)
+
+        # A failed model constraint leaves the row as it was
+        response = self.opener.put(url, json={'material_code': 'API002', 'material_buy_price': 190.0})
+        self.assertEqual(response.status_code, 400, response.text)
+        material.invalidate_cache()
+        self.assertEqual((material.material_code, material.material_buy_price), ('API001', 180.0))
+
+        response = self.opener.put(f'http://{HOST}:{PORT}/api/materials/{material.id + 1000}', json={})
+        self.assertEqual(response.status_code, 404, response.text)
+
+    def test_archive_and_unarchive_over_http(self):
+        supplier = self.env['material.supplier'].create({'name': 'Test API Supplier', 'email': 'api@supplier.com'})
+        material = self.env['material.registration'].create({'material_code': 'ARC001', 'material_name': 'Archived Material', 'material_type': 'fabric', 'material_buy_price': 150.0, 'supplier_id': supplier.id})
+        self.env['base'].flush()
+        headers = {'Content-Type': 'application/json'}
+        missing_id = material.id + 1000
+
+        response = self.url_open('/api/materials/archive', data=json.dumps({'ids': [material.id, missing_id]}),
+                                 headers=headers)
+        self.assertEqual(response.status_code, 200, response.text)
+        self.assertEqual(response.json()['data'], {'ids': [material.id], 'missing_ids': [missing_id]})
+        material.invalidate_cache()
+        self.assertFalse(material.active)
+
+        # The code was reused meanwhile: restoring it is refused
+        self.env['material.registration'].create({'material_code': 'ARC001', 'material_name': 'Replacement Material', 'material_type': 'fabric', 'material_buy_price': 150.0, 'supplier_id': supplier.id})
+        self.env['base'].flush()
+        response = self.url_open('/api/materials/unarchive', data=json.dumps({'ids': [material.id]}), headers=headers)
+        self.assertEqual(response.status_code, 400, response.text)
+        material.invalidate_cache()
+        self.assertFalse(material.active)
+
+        response = self.url_open('/api/materials/archive', data=json.dumps({'ids': 'all'}), headers=headers)
+        self.assertEqual(response.status_code, 400, response.text)
+
     def test_delete_material(self):
         supplier = self.env['material.supplier'].create({'name': 'Test API Supplier', 'email': 'api@supplier.com'})
         material = self.env['material.registration'].create({'material_code': 'API001', 'material_name': 'API Test Material 1', 'material_type': 'fabric', 'material_buy_price': 150.0, 'supplier_id': supplier.id})
         material_id = material.id
         material.unlink()
         deleted = self.env['material.registration'].search([('id', '=', material_id)])
-        self.assertEqual(len(deleted), 0) 
\ No newline at end of file
+        self.assertEqual(len(deleted), 0)
+
+    def test_replica_staleness_window(self):
+        session = {}
+        with patch.dict(config.options, {'material_replica_db': False}):
+            self.assertFalse(replica.should_use_replica(session))
+        with patch.dict(config.options, {'material_replica_db': 'replica_db', 'material_replica_stale_window': '5'}):
+            self.assertTrue(replica.should_use_replica(session))
+            replica.mark_write(session)
+            written_at = session[replica.LAST_WRITE_KEY]
+            self.assertFalse(replica.should_use_replica(session, now=written_at + 1))
+            self.assertTrue(replica.should_use_replica(session, now=written_at + 5))
+
+    def test_replica_read_routing(self):
+        """Reads run on a separate replica cursor, which is closed afterwards."""
+        supplier = self.env['material.supplier'].create({'name': 'Replica Supplier', 'email': 'replica@supplier.com'})
+        material = self.env['material.registration'].create({'material_code': 'REP001', 'material_name': 'Replica Material', 'material_type': 'fabric', 'material_buy_price': 150.0, 'supplier_id': supplier.id})
+        self.env['base'].flush()
+        url = f'/api/materials/{material.id}'
+        self.assertEqual(self.url_open(url).status_code, 200)
+
+        cursors = []
+        db_connect = replica.db_connect
+
+        def tracking_db_connect(*args, **kwargs):
+            connection = db_connect(*args, **kwargs)
+            cursor = connection.cursor
+
+            def tracked_cursor(*cursor_args, **cursor_kwargs):
+                cr = cursor(*cursor_args, **cursor_kwargs)
+                cursors.append(cr)
+                return cr
+            connection.cursor = tracked_cursor
+            return connection
+
+        options = {'material_replica_db': self.env.cr.dbname, 'material_replica_stale_window': '5'}
+        with patch.dict(config.options, options), patch.object(replica, '_replica_allowed', return_value=True), \
+                patch.object(replica, 'db_connect', tracking_db_connect):
+            # The replica connection cannot see the uncommitted test data
+            self.assertEqual(self.url_open(url).status_code, 404)
+            self.assertEqual(len(cursors), 1)
+            self.assertTrue(cursors[0].closed)
+            # A session that just wrote reads from the primary
+            self.opener.delete(f'http://{HOST}:{PORT}/api/materials/{material.id + 1000}')
+            self.assertEqual(self.url_open(url).status_code, 200)
+            self.assertEqual(len(cursors), 1)
+
+    def test_parse_preconditions(self):
+        version, since = concurrency.parse_preconditions({
+            'If-Match': '"2024-01-02T03:04:05.123456"',
+            'If-Unmodified-Since': 'Tue, 02 Jan 2024 03:04:05 GMT',
+        })
+        self.assertEqual(version, '2024-01-02T03:04:05.123456')
+        self.assertEqual(since.isoformat(), '2024-01-02T03:04:05')
+        self.assertEqual(concurrency.parse_preconditions({}), (None, None))
+        self.assertTrue(concurrency.wants_minimal({'Prefer': 'return=minimal'}))
+
+    def test_material_schema_validation(self):
+        values = schemas.MATERIAL_CREATE.validate({
+            'material_code': 'SCH001',
+            'material_name': 'Schema Material',
+            'material_type': 'fabric',
+            'material_buy_price': '150',
+            'supplier_id': 1,
+        })
+        self.assertEqual(values['material_buy_price'], 150.0)
+
+        with self.assertRaises(schemas.SchemaError) as cm:
+            schemas.MATERIAL_CREATE.validate_many([
+                {'material_code': 'SCH002', 'material_name': ' ', 'material_type': 'silk',
+                 'material_buy_price': -50, 'supplier_id': 1},
+                {'unknown': True},
+            ])
+        errors = {(e['index'], e['field']) for e in cm.exception.errors}
+        self.assertIn((0, 'material_name'), errors)
+        self.assertIn((0, 'material_type'), errors)
+        self.assertIn((0, 'material_buy_price'), errors)
+        self.assertIn((1, 'unknown'), errors)
+        self.assertIn((1, 'material_code'), errors)
+
+        self.assertEqual(schemas.MATERIAL_UPDATE.validate({'material_buy_price': 200}), {'material_buy_price': 200.0})
+        with self.assertRaises(schemas.SchemaError):
+            schemas.MATERIAL_UPDATE.validate({'material_name': None})
+
+    def test_openapi_document(self):
+        document = build_openapi_document()
+        self.assertIn('/api/materials', document['paths'])
+        self.assertEqual(
+            document['components']['schemas']['MaterialCreate']['properties']['material_type']['enum'],
+            ['fabric', 'jeans', 'cotton'])
+
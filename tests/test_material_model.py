@@ -1,5 +1,7 @@
 # -*- coding: utf-8 -*-
 
+import json
+
 from odoo.tests.common import TransactionCase
 from odoo.exceptions import ValidationError
 
@@ -199,6 +201,30 @@ class TestMaterialModel(TransactionCase):
                 'supplier_id': self.test_supplier.id
             })
 
+    def test_constraints_ignore_client_context(self):
+        """Test that a client-supplied context cannot switch the model checks off."""
+        Material = self.Material.with_context(schema_validated=True)
+        with self.assertRaises(ValidationError):
+            Material.create({
+                'material_code': 'CTX001',
+                'material_name': '  ',
+                'material_type': 'fabric',
+                'material_buy_price': 150.0,
+                'supplier_id': self.test_supplier.id
+            })
+        with self.assertRaises(ValidationError):
+            Material.create({
+                'material_code': 'CTX002',
+                'material_type': 'fabric',
+                'material_buy_price': 150.0,
+                'supplier_id': self.test_supplier.id
+            })
+        with self.assertRaises(ValidationError):
+            self.Supplier.with_context(schema_validated=True).create({
+                'name': 'Context Supplier',
+                'email': 'not-an-email'
+            })
+
     def test_material_update_price_validation(self):
         """Test price validation during update."""
         material = self.Material.create({
@@ -307,4 +333,261 @@ class TestMaterialModel(TransactionCase):
         self.assertEqual(summary['material_buy_price'], 350.0)
         self.assertEqual(summary['supplier_name'], 'Test Supplier')
         self.assertIn('create_date', summary)
-        self.assertIn('write_date', summary) 
\ No newline at end of file
+        self.assertIn('write_date', summary)
+
+    def test_get_material_summaries(self):
+        """Test fetching several material summaries in input order."""
+        material1 = self.Material.create({
+            'material_code': 'MULTI001',
+            'material_name': 'Multi Material 1',
+            'material_type': 'fabric',
+            'material_buy_price': 150.0,
+            'supplier_id': self.test_supplier.id
+        })
+        material2 = self.Material.create({
+            'material_code': 'MULTI002',
+            'material_name': 'Multi Material 2',
+            'material_type': 'jeans',
+            'material_buy_price': 250.0,
+            'supplier_id': self.test_supplier.id
+        })
+        missing_id = material2.id + 1000
+
+        summaries, missing_ids = self.Material.get_material_summaries([material2.id, missing_id, material1.id])
+
+        self.assertEqual([s['id'] for s in summaries], [material2.id, material1.id])
+        self.assertEqual(missing_ids, [missing_id])
+        self.assertEqual(summaries[0], material2.get_material_summary())
+
+    def test_api_domain_unknown_price_category(self):
+        """Test that an unknown price category code is rejected, not read as 'no band'."""
+        domain = self.Material._get_api_domain(price_category='standard')
+        self.assertIn(('price_band_id', '=', self.env.ref('material_registration.price_band_standard').id), domain)
+        with self.assertRaisesRegex(ValidationError, 'standard'):
+            self.Material._get_api_domain(price_category='nonexistent')
+
+    def test_price_band_reconfiguration(self):
+        """Test that changing price bands recategorizes existing materials."""
+        material = self.Material.create({
+            'material_code': 'BAND001',
+            'material_name': 'Band Material',
+            'material_type': 'fabric',
+            'material_buy_price': 800.0,
+            'supplier_id': self.test_supplier.id
+        })
+        self.assertEqual(material.price_band_id.code, 'standard')
+
+        premium = self.env.ref('material_registration.price_band_premium')
+        premium.write({'min_price': 750.0})
+        self.assertEqual(material.price_band_id, premium)
+        self.assertEqual(material.price_category, premium.name)
+
+        luxury = self.env['material.price.band'].create({
+            'name': 'Luxury (790+)',
+            'code': 'luxury',
+            'min_price': 790.0,
+        })
+        self.assertEqual(material.price_band_id, luxury)
+
+        luxury.unlink()
+        self.assertEqual(material.price_band_id, premium)
+
+    def test_autocomplete(self):
+        """Test prefix autocomplete on code and name, and cache invalidation."""
+        material = self.Material.create({
+            'material_code': 'AUTO001',
+            'material_name': 'Autumn Linen',
+            'material_type': 'fabric',
+            'material_buy_price': 150.0,
+            'supplier_id': self.test_supplier.id
+        })
+        self.Material.create({
+            'material_code': 'LIN001',
+            'material_name': 'Automatic Twill',
+            'material_type': 'jeans',
+            'material_buy_price': 150.0,
+            'supplier_id': self.test_supplier.id
+        })
+
+        results = self.Material.autocomplete('auto')
+        self.assertEqual([r['material_code'] for r in results], ['AUTO001', 'LIN001'])
+        self.assertEqual(self.Material.autocomplete('au_o'), [])
+
+        material.write({'material_code': 'ZED001'})
+        results = self.Material.autocomplete('auto')
+        self.assertEqual([r['material_code'] for r in results], ['LIN001'])
+
+    def test_archive_material(self):
+        """Test archived materials leave the live catalog but stay reachable."""
+        material = self.Material.create({
+            'material_code': 'ARCH001',
+            'material_name': 'Archived Material',
+            'material_type': 'cotton',
+            'material_buy_price': 150.0,
+            'supplier_id': self.test_supplier.id
+        })
+        material.action_archive()
+
+        self.assertFalse(self.Material.search([('material_code', '=', 'ARCH001')]))
+        self.assertEqual(self.Material.autocomplete('arch'), [])
+        self.assertEqual(self.test_supplier.material_count, 0)
+        summaries, missing_ids = self.Material.get_material_summaries([material.id])
+        self.assertFalse(summaries[0]['active'])
+
+        # The code of an archived material may be reused by an active one ...
+        replacement = self.Material.create({
+            'material_code': 'ARCH001',
+            'material_name': 'Replacement Material',
+            'material_type': 'cotton',
+            'material_buy_price': 150.0,
+            'supplier_id': self.test_supplier.id
+        })
+        # ... but then the archived one cannot be restored
+        with self.assertRaises(ValidationError):
+            material.action_unarchive()
+        replacement.unlink()
+        material.action_unarchive()
+        self.assertEqual(self.test_supplier.material_count, 1)
+
+    def test_unarchive_with_archived_duplicate(self):
+        """Test that an archived material sharing the code does not block unarchiving."""
+        materials = self.Material.browse()
+        for i in range(2):
+            material = self.Material.create({
+                'material_code': 'ARCH002',
+                'material_name': f'Archived Material {i}',
+                'material_type': 'cotton',
+                'material_buy_price': 150.0,
+                'supplier_id': self.test_supplier.id
+            })
+            material.action_archive()
+            materials |= material
+
+        # The unarchive API writes with active_test=False
+        materials[0].with_context(active_test=False).write({'active': True})
+        self.assertTrue(materials[0].active)
+        self.assertFalse(materials[1].active)
+
+    def test_lock_if_unmodified(self):
+        """Test write_date based preconditions for optimistic concurrency."""
+        material = self.Material.create({
+            'material_code': 'LOCK001',
+            'material_name': 'Versioned Material',
+            'material_type': 'fabric',
+            'material_buy_price': 150.0,
+            'supplier_id': self.test_supplier.id
+        })
+        material.flush()
+        version = material.get_version()
+        self.assertTrue(material._lock_if_unmodified(version=version))
+        self.assertTrue(material._lock_if_unmodified(unmodified_since=material.write_date))
+        self.assertFalse(material._lock_if_unmodified(version='2000-01-01T00:00:00.000000'))
+        self.assertFalse(material._lock_if_unmodified(version='not-a-version'))
+
+    def test_multi_currency_prices(self):
+        """Test rate conversion and the minimum price in the base currency."""
+        Rate = self.env['material.currency.rate']
+        base = self.env.company.currency_id
+        self.env['ir.config_parameter'].sudo().set_param('material_registration.base_currency', base.name)
+        other = self.env['res.currency'].with_context(active_test=False).search([('id', '!=', base.id)], limit=1)
+        Rate.create({'currency_id': other.id, 'date': '2000-01-01', 'rate': 0.5})
+        self.assertEqual(Rate._convert_amounts([100.0, 50.0, None], [other.id, base.id, other.id], base),
+                         [200.0, 50.0, None])
+        self.assertEqual(Rate._convert(200.0, base, other), 100.0)
+
+        foreign_supplier = self.Supplier.create({'name': 'Foreign Supplier', 'currency_id': other.id})
+        material = self.Material.create({
+            'material_code': 'CUR001',
+            'material_name': 'Imported Material',
+            'material_type': 'fabric',
+            'material_buy_price': 60.0,
+            'supplier_id': foreign_supplier.id
+        })
+        self.assertEqual(material.currency_id, other)
+        # 40 in the supplier currency is 80 in the base currency
+        with self.assertRaises(ValidationError):
+            material.write({'material_buy_price': 40.0})
+
+        # A newer rate replaces the cached one
+        Rate.create({'currency_id': other.id, 'date': '2001-01-01', 'rate': 0.25})
+        self.assertEqual(Rate._convert(100.0, other, base), 400.0)
+        material.write({'material_buy_price': 40.0})
+
+        unpriced = self.env['res.currency'].with_context(active_test=False).search(
+            [('id', 'not in', (base.id, other.id))], limit=1)
+        with self.assertRaises(ValidationError):
+            Rate._convert(100.0, unpriced, base)
+        with self.assertRaises(ValidationError):
+            Rate._get_currency('XXX-NOT-A-CODE')
+
+    def test_price_band_in_base_currency(self):
+        """Test that price bands compare buy prices converted to the base currency."""
+        Rate = self.env['material.currency.rate']
+        base = self.env.company.currency_id
+        self.env['ir.config_parameter'].sudo().set_param('material_registration.base_currency', base.name)
+        other = self.env['res.currency'].with_context(active_test=False).search([('id', '!=', base.id)], limit=1)
+        Rate.create({'currency_id': other.id, 'date': '2000-01-01', 'rate': 10.0})
+        foreign_supplier = self.Supplier.create({'name': 'Band Supplier', 'currency_id': other.id})
+        material = self.Material.create({
+            'material_code': 'BAND001',
+            'material_name': 'Banded Material',
+            'material_type': 'fabric',
+            'material_buy_price': 2000.0,
+            'supplier_id': foreign_supplier.id
+        })
+        # 2000 in the supplier currency is 200 in the base currency
+        budget = self.env.ref('material_registration.price_band_budget')
+        self.assertEqual(material.price_band_id, budget)
+        self.assertIn(material, self.Material.search(self.Material._get_api_domain(None, 'budget')))
+
+        # A new rate moves the material to the band of its new base price
+        Rate.create({'currency_id': other.id, 'date': '2001-01-01', 'rate': 2.0})
+        material.invalidate_cache(['price_band_id'])
+        self.assertEqual(material.price_band_id.code, 'premium')
+
+        # The integrity repair agrees with the bands assigned above
+        self.env.cr.execute("UPDATE material_registration SET price_band_id = %s WHERE id = %s",
+                            (budget.id, material.id))
+        run = self.env['material.integrity.run']._get_or_start(restart=True)
+        while run._step():
+            pass
+        premium = self.env.ref('material_registration.price_band_premium')
+        material.invalidate_cache(['price_band_id'])
+        self.assertEqual(material.price_band_id, premium)
+        self.assertIn({'id': material.id, 'old': budget.id, 'new': premium.id},
+                      json.loads(run.report)['price_band_id']['samples'])
+
+    def test_best_prices_across_equivalent_materials(self):
+        """Test the cheapest offer and spread per equivalence key, converted to the base currency."""
+        Rate = self.env['material.currency.rate']
+        base = self.env.company.currency_id
+        self.env['ir.config_parameter'].sudo().set_param('material_registration.base_currency', base.name)
+        other = self.env['res.currency'].with_context(active_test=False).search([('id', '!=', base.id)], limit=1)
+        Rate.create({'currency_id': other.id, 'date': '2000-01-01', 'rate': 2.0})
+        local = self.Supplier.create({'name': 'Local Denim Supplier'})
+        foreign = self.Supplier.create({'name': 'Foreign Denim Supplier', 'currency_id': other.id})
+        materials = self.Material.create([
+            {'material_code': 'BP001', 'material_name': 'Denim 12-oz', 'material_type': 'jeans',
+             'material_buy_price': 300.0, 'supplier_id': local.id},
+            # 500 in the foreign currency is 250 in the base currency
+            {'material_code': 'BP002', 'material_name': 'DENIM 12 oz', 'material_type': 'jeans',
+             'material_buy_price': 500.0, 'supplier_id': foreign.id},
+            {'material_code': 'BP003', 'material_name': 'Denim 12oz remnant', 'material_type': 'jeans',
+             'material_buy_price': 120.0, 'supplier_id': local.id, 'equivalence_group': 'Denim 12 oz'},
+            # Same name, other type: not equivalent
+            {'material_code': 'BP004', 'material_name': 'Denim 12 oz', 'material_type': 'cotton',
+             'material_buy_price': 110.0, 'supplier_id': local.id},
+        ])
+        self.assertEqual(materials[0].equivalence_key, materials[1].equivalence_key)
+        self.assertEqual(materials[2].equivalence_key, 'group:denim 12 oz')
+
+        denim, group, missing = self.Material.get_best_prices(
+            [materials[0].equivalence_key, 'group:denim 12 oz', 'jeans:no such material'])
+        self.assertEqual(denim['cheapest']['material_id'], materials[1].id)
+        self.assertEqual(denim['cheapest']['comparison_price'], 250.0)
+        self.assertEqual(denim['cheapest']['currency'], other.name)
+        self.assertEqual(denim['offer_count'], 2)
+        self.assertEqual((denim['min_price'], denim['max_price'], denim['spread']), (250.0, 300.0, 50.0))
+        self.assertEqual(group['cheapest']['material_id'], materials[2].id)
+        self.assertIsNone(missing['cheapest'])
+        self.assertEqual(missing['offer_count'], 0)
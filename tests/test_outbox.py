@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+
+import json
+from unittest.mock import patch
+
+from odoo.tests.common import TransactionCase
+
+
+class TestOutbox(TransactionCase):
+    """Test cases for the change outbox and webhook delivery."""
+
+    def setUp(self):
+        """Set up test data."""
+        super(TestOutbox, self).setUp()
+        self.Event = self.env['material.outbox.event']
+        self.Endpoint = self.env['material.webhook.endpoint']
+        # The active endpoint count is cached per process and survives the rollback
+        self.addCleanup(self.Endpoint.clear_caches)
+        self.supplier = self.env['material.supplier'].create({'name': 'Outbox Supplier'})
+        self.endpoint = self.Endpoint.create({'name': 'Receiver', 'url': 'http://receiver.example.com/hook'})
+
+    def _create_material(self, code='OUT001'):
+        return self.env['material.registration'].create({
+            'material_code': code,
+            'material_name': f'Outbox Material {code}',
+            'material_type': 'fabric',
+            'material_buy_price': 150.0,
+            'supplier_id': self.supplier.id,
+        })
+
+    def _events(self):
+        return self.Event.search([('id', '>', self.endpoint.last_event_id)])
+
+    def test_changes_are_recorded(self):
+        material = self._create_material()
+        material.write({'material_buy_price': 250.0})
+        material_id = material.id
+        material.unlink()
+
+        events = self._events().filtered(lambda e: e.model == 'material.registration')
+        self.assertEqual(events.mapped('event_type'), ['created', 'updated', 'deleted'])
+        self.assertEqual(set(events.mapped('res_id')), {material_id})
+        created, updated, deleted = (json.loads(e.payload) for e in events)
+        self.assertEqual(created['material_code'], 'OUT001')
+        self.assertEqual(updated['material_buy_price'], 250.0)
+        self.assertIn('material_buy_price', updated['changed_fields'])
+        self.assertEqual(deleted, {'id': material_id})
+
+    def test_no_events_without_endpoint(self):
+        self.endpoint.active = False
+        start = self.Event.search([], order='id desc', limit=1).id
+        self._create_material()
+        self.assertFalse(self.Event.search([('id', '>', start)]))
+
+    def test_dispatch_in_order(self):
+        self._create_material('OUT001')
+        self._create_material('OUT002')
+        expected = self._events().ids
+        batches = []
+        with patch.object(type(self.Endpoint), '_post_batch', lambda endpoint, body: batches.append(body)):
+            self.Event._dispatch(batch_size=1)
+
+        delivered = [event['id'] for body in batches for event in json.loads(body)['events']]
+        self.assertEqual(delivered, expected)
+        self.assertEqual(len(batches), len(expected))
+        self.assertEqual(self.endpoint.last_event_id, expected[-1])
+        self.assertFalse(self.Event.browse(expected).exists())
+
+    def test_failed_delivery_backs_off(self):
+        self._create_material()
+        position = self.endpoint.last_event_id
+
+        def refuse(endpoint, body):
+            raise ConnectionError('refused')
+
+        with patch.object(type(self.Endpoint), '_post_batch', refuse):
+            self.Event._dispatch()
+        self.assertEqual(self.endpoint.failure_count, 1)
+        self.assertTrue(self.endpoint.next_attempt_at)
+        self.assertEqual(self.endpoint.last_event_id, position)
+        self.assertTrue(self._events())
+
+        # Not due yet: skipped without another attempt
+        with patch.object(type(self.Endpoint), '_post_batch', refuse):
+            self.Event._dispatch()
+        self.assertEqual(self.endpoint.failure_count, 1)
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+
+import json
+
+from odoo import sql_db
+from odoo.tests.common import HttpCase, new_test_user
+
+from ..controllers.profiling import SqlTrace
+
+
+class TestRequestProfiling(HttpCase):
+    """Test cases for on-demand request profiling."""
+
+    def setUp(self):
+        super(TestRequestProfiling, self).setUp()
+        supplier = self.env['material.supplier'].create({'name': 'Profiled Supplier', 'email': 'profiled@supplier.com'})
+        self.env['material.registration'].create({'material_code': 'PRF001', 'material_name': 'Profiled Material', 'material_type': 'fabric', 'material_buy_price': 150.0, 'supplier_id': supplier.id})
+        self.Profile = self.env['material.request.profile']
+        self.env['base'].flush()
+
+    def test_header_stores_profile(self):
+        self.authenticate('admin', 'admin')
+        response = self.url_open('/api/materials?material_type=fabric', headers={'X-Material-Profile': '1'})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('sql;dur=', response.headers['Server-Timing'])
+
+        profile = self.Profile.browse(int(response.headers['X-Profile-Id']))
+        self.assertEqual(profile.path, '/api/materials')
+        self.assertEqual(profile.status, 200)
+        self.assertIn('get_materials', profile.python_profile)
+        statements = json.loads(profile.sql_trace)
+        self.assertEqual(len(statements), profile.query_count)
+        self.assertTrue(any('material_registration' in statement['query'] for statement in statements))
+
+        response = self.url_open(f'/api/profiles/{profile.id}')
+        data = response.json()['data']
+        self.assertEqual(data['query_count'], profile.query_count)
+        self.assertEqual(len(data['sql_trace']), profile.query_count)
+
+    def test_query_flag_stores_profile(self):
+        self.authenticate('admin', 'admin')
+        response = self.url_open('/api/suppliers?profile=1')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(self.Profile.browse(int(response.headers['X-Profile-Id'])).exists())
+
+    def test_not_profiled_without_flag_or_for_users(self):
+        count = self.Profile.search_count([])
+        self.authenticate('admin', 'admin')
+        response = self.url_open('/api/materials')
+        self.assertNotIn('X-Profile-Id', response.headers)
+
+        new_test_user(self.env, login='profiling_user', password='profiling_user', groups='base.group_user')
+        self.authenticate('profiling_user', 'profiling_user')
+        response = self.url_open('/api/materials', headers={'X-Material-Profile': '1'})
+        self.assertNotIn('X-Profile-Id', response.headers)
+        self.assertEqual(self.Profile.search_count([]), count)
+        self.assertEqual(self.url_open('/api/profiles/1').status_code, 403)
+
+    def test_sql_trace_restores_cursor(self):
+        original = sql_db.Cursor.execute
+        with SqlTrace() as trace:
+            self.assertIsNot(sql_db.Cursor.execute, original)
+            self.env.cr.execute("SELECT 1")
+        self.assertIs(sql_db.Cursor.execute, original)
+        self.assertEqual(len(trace.statements), 1)
+        self.assertIn('SELECT 1', trace.statements[0]['query'])
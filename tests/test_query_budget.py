@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+
+import json
+
+from odoo.tests.common import HttpCase, TransactionCase
+
+from .common import QueryBudgetMixin
+
+
+class QueryBudgetData(object):
+    """Builders for suppliers and materials used by the query budget tests."""
+
+    _sequence = 0
+
+    def _make_supplier(self, material_count=0):
+        QueryBudgetData._sequence += 1
+        tag = f'QB{QueryBudgetData._sequence:04d}'
+        supplier = self.env['material.supplier'].create({'name': f'Budget Supplier {tag}', 'email': f'{tag}@budget.com'})
+        self.env['material.registration'].create([{
+            'material_code': f'{tag}-{i:03d}',
+            'material_name': f'Budget Material {tag} {i}',
+            'material_type': ('fabric', 'jeans', 'cotton')[i % 3],
+            'material_buy_price': 100.0 + 250 * i,
+            'supplier_id': supplier.id,
+        } for i in range(material_count)])
+        return supplier
+
+
+class TestModelQueryBudget(QueryBudgetMixin, QueryBudgetData, TransactionCase):
+    """Query budgets of model methods: the count must not grow with the records."""
+
+    def test_get_materials_by_type_budget(self):
+        self.assertQueriesFlat(
+            lambda size: self._make_supplier(size),
+            lambda supplier: self.env['material.registration'].get_materials_by_type('jeans'),
+            budget=4,
+        )
+
+    def test_material_name_search_budget(self):
+        self.assertQueriesFlat(
+            lambda size: self._make_supplier(size).material_ids[:1].material_code.split('-')[0],
+            lambda tag: self.env['material.registration'].name_search(tag),
+            budget=4,
+        )
+
+    def test_material_name_get_budget(self):
+        self.assertQueriesFlat(
+            lambda size: self._make_supplier(size).material_ids,
+            lambda materials: materials.name_get(),
+            budget=2,
+        )
+
+    def test_supplier_name_search_budget(self):
+        self.assertQueriesFlat(
+            lambda size: [self._make_supplier() for _i in range(size)],
+            lambda suppliers: self.env['material.supplier'].name_search('Budget Supplier'),
+            budget=4,
+        )
+
+    def test_unique_constraints_budget(self):
+        self.assertQueriesFlat(
+            lambda size: self._make_supplier(size).material_ids,
+            lambda materials: materials._check_unique_material_code(),
+            budget=3,
+        )
+        self.assertQueriesFlat(
+            lambda size: self.env['material.supplier'].concat(*[self._make_supplier() for _i in range(size)]),
+            lambda suppliers: suppliers._check_unique_name(),
+            budget=3,
+        )
+
+    def test_supplier_summaries_budget(self):
+        self.assertQueriesFlat(
+            lambda size: [self._make_supplier(size).id for _i in range(size)],
+            lambda ids: self.env['material.supplier'].get_supplier_summaries(ids),
+            budget=8,
+        )
+
+    def test_read_with_materials_budget(self):
+        self.assertQueriesFlat(
+            lambda size: [self._make_supplier(size).id for _i in range(size)],
+            lambda ids: self.env['material.supplier'].read_with_materials(
+                [('id', 'in', ids)], ['name', 'currency_id', 'material_count'],
+                ['material_code', 'material_buy_price'], 5),
+            budget=8,
+        )
+
+    def test_material_summaries_budget(self):
+        self.assertQueriesFlat(
+            lambda size: self._make_supplier(size).material_ids.ids,
+            lambda ids: self.env['material.registration'].get_material_summaries(ids),
+            budget=8,
+        )
+
+    def test_supplier_unlink_budget(self):
+        self.assertQueriesFlat(
+            lambda size: self.env['material.supplier'].concat(*[self._make_supplier() for _i in range(size)]),
+            lambda suppliers: suppliers.unlink(),
+            budget=20,
+        )
+
+    def test_material_unlink_budget(self):
+        self.assertQueriesFlat(
+            lambda size: self._make_supplier(size).material_ids,
+            lambda materials: materials.unlink(),
+            budget=25,
+        )
+
+
+class TestApiQueryBudget(QueryBudgetMixin, QueryBudgetData, HttpCase):
+    """Query budgets of the REST endpoints, including session handling."""
+
+    # Authentication, session and access checks cost a fixed number of queries
+    REQUEST_BUDGET = 40
+
+    def setUp(self):
+        super(TestApiQueryBudget, self).setUp()
+        self.authenticate('admin', 'admin')
+        # Warm up the registry-level caches shared by every request
+        self.url_open('/api/materials/types')
+
+    def _get_json(self, url):
+        response = self.url_open(url)
+        self.assertEqual(response.status_code, 200, response.text)
+        return json.loads(response.text)
+
+    def test_get_materials_budget(self):
+        self.assertQueriesFlat(
+            lambda size: self._make_supplier(size),
+            lambda supplier: self._get_json('/api/materials?limit=1000'),
+            budget=self.REQUEST_BUDGET,
+        )
+
+    def test_get_materials_by_ids_budget(self):
+        self.assertQueriesFlat(
+            lambda size: self._make_supplier(size).material_ids.ids,
+            lambda ids: self._get_json('/api/materials?ids=' + ','.join(map(str, ids))),
+            budget=self.REQUEST_BUDGET,
+        )
+
+    def test_get_suppliers_budget(self):
+        self.assertQueriesFlat(
+            lambda size: [self._make_supplier(2) for _i in range(size)],
+            lambda suppliers: self._get_json('/api/suppliers?limit=1000'),
+            budget=self.REQUEST_BUDGET,
+        )
+
+    def test_get_suppliers_by_ids_budget(self):
+        self.assertQueriesFlat(
+            lambda size: [self._make_supplier(size).id for _i in range(size)],
+            lambda ids: self._get_json('/api/suppliers?ids=' + ','.join(map(str, ids))),
+            budget=self.REQUEST_BUDGET,
+        )
+
+    def test_get_supplier_budget(self):
+        def run(supplier):
+            data = self._get_json(f'/api/suppliers/{supplier.id}')['data']
+            self.assertEqual(len(data['materials']), len(supplier.material_ids))
+        self.assertQueriesFlat(lambda size: self._make_supplier(size), run, budget=self.REQUEST_BUDGET)
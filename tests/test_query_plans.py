@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+
+from odoo.tests.common import SavepointCase
+
+from ..cli.seed import seed_dataset
+from .common import capture_queries
+
+
+class TestQueryPlans(SavepointCase):
+    """Plan regression tests for the domains issued by the API and the models.
+
+    A dataset large enough for the planner to prefer indexes is seeded once.
+    Each test captures the SQL a code path really runs, EXPLAINs it and
+    checks that it uses one of the expected indexes, never scans the whole
+    table, and stays well below the cost of a sequential scan.
+    """
+
+    # Plans may cost at most this fraction of a full sequential scan
+    MAX_COST_RATIO = 0.5
+
+    @classmethod
+    def setUpClass(cls):
+        super(TestQueryPlans, cls).setUpClass()
+        # Jeans and cotton are rare, so filtering on them is selective
+        seed_dataset(cls.env, 5000, 50000, prefix='PLAN', type_weights='fabric=998,jeans=1,cotton=1',
+                     price_distribution='uniform:100:2000', seed=39)
+        cls.Material = cls.env['material.registration']
+        cls.Supplier = cls.env['material.supplier']
+
+    def _first_select(self, queries, table):
+        """Return the first SELECT on ``table`` among captured queries."""
+        for query, params in queries:
+            text = query if isinstance(query, str) else query.decode()
+            if text.lstrip().upper().startswith('SELECT') and f'FROM "{table}"' in text:
+                return text, params
+        self.fail(f'No SELECT on {table} was executed')
+
+    def _explain(self, query, params=None):
+        self.env.cr.execute('EXPLAIN (FORMAT JSON) ' + query, params)
+        return self.env.cr.fetchone()[0][0]['Plan']
+
+    def _plan_nodes(self, plan):
+        yield plan
+        for child in plan.get('Plans', []):
+            yield from self._plan_nodes(child)
+
+    def assertPlanUsesIndex(self, queries, table, indexes):
+        """Check the first SELECT on ``table`` in ``queries`` against its plan."""
+        query, params = self._first_select(queries, table)
+        plan = self._explain(query, params)
+        nodes = list(self._plan_nodes(plan))
+        seq_scans = [n for n in nodes if n['Node Type'] == 'Seq Scan' and n.get('Relation Name') == table]
+        self.assertFalse(seq_scans, f'Sequential scan on {table} for:\n{query}')
+        used = {n['Index Name'] for n in nodes if 'Index Name' in n}
+        self.assertTrue(used & set(indexes), f'Expected one of {indexes}, plan used {used or "no index"} for:\n{query}')
+        full_scan_cost = self._explain(f'SELECT * FROM "{table}"')['Total Cost']
+        self.assertLess(plan['Total Cost'], full_scan_cost * self.MAX_COST_RATIO,
+                        f'Estimated cost {plan["Total Cost"]} too close to a full scan ({full_scan_cost}) for:\n{query}')
+
+    def test_get_materials_plan(self):
+        domain = self.Material._get_api_domain()
+        with capture_queries(self.env.cr) as queries:
+            self.Material.search(domain, limit=100)
+        self.assertPlanUsesIndex(queries, 'material_registration', ['material_registration_code_active_idx'])
+
+    def test_get_materials_by_type_filter_plan(self):
+        domain = self.Material._get_api_domain('jeans')
+        with capture_queries(self.env.cr) as queries:
+            self.Material.search(domain, limit=100)
+        self.assertPlanUsesIndex(queries, 'material_registration', ['material_registration_type_code_active_idx'])
+
+    def test_get_materials_by_band_plan(self):
+        domain = self.Material._get_api_domain(price_category='budget')
+        with capture_queries(self.env.cr) as queries:
+            self.Material.search(domain, limit=100)
+        # The band must narrow the scan, not be applied as a filter over a code-order scan
+        self.assertPlanUsesIndex(queries, 'material_registration', [
+            'material_registration_band_code_active_idx', 'material_registration_price_band_id_index',
+        ])
+
+    def test_autocomplete_plan(self):
+        # Short prefixes match most rows: the indexes must return them in order, not sort them all
+        for prefix in ('plan-000', 'fabric material'):
+            with capture_queries(self.env.cr) as queries:
+                self.Material.autocomplete(prefix, limit=10)
+            query, params = next((q, p) for q, p in queries if 'LIKE %(pattern)s' in str(q))
+            nodes = list(self._plan_nodes(self._explain(query, params)))
+            self.assertFalse([n for n in nodes if n['Node Type'] == 'Seq Scan'], f'Sequential scan for {prefix!r}')
+            used = {n['Index Name'] for n in nodes if 'Index Name' in n}
+            self.assertEqual(used, {'material_registration_code_prefix_active_idx',
+                                    'material_registration_name_prefix_active_idx'})
+            sorts = [n for n in nodes if n['Node Type'] == 'Sort' and n['Plan Rows'] > 100]
+            self.assertFalse(sorts, f'Matches of {prefix!r} are sorted before the limit')
+
+    def test_get_materials_by_type_plan(self):
+        with capture_queries(self.env.cr) as queries:
+            self.Material.get_materials_by_type('jeans')
+        self.assertPlanUsesIndex(queries, 'material_registration', ['material_registration_type_code_active_idx'])
+
+    def test_material_name_search_plan(self):
+        with capture_queries(self.env.cr) as queries:
+            self.Material.name_search('PLAN-0004242')
+        self.assertPlanUsesIndex(queries, 'material_registration', [
+            'material_registration_code_trgm_active_idx', 'material_registration_name_trgm_active_idx',
+            'material_registration_code_active_idx',
+        ])
+
+    def test_material_unique_code_plan(self):
+        material = self.Material.search([('material_code', '=', 'PLAN-00004242')])
+        material.read(['material_code', 'active'])
+        with capture_queries(self.env.cr) as queries:
+            material._check_unique_material_code()
+        self.assertPlanUsesIndex(queries, 'material_registration', ['material_registration_code_active_idx'])
+
+    def test_get_suppliers_search_plan(self):
+        domain = self.Supplier._get_api_domain('Supplier 0004242')
+        with capture_queries(self.env.cr) as queries:
+            self.Supplier.search(domain, limit=100)
+        self.assertPlanUsesIndex(queries, 'material_supplier', [
+            'material_supplier_name_search_trgm_idx', 'material_supplier_name_index',
+        ])
+
+    def test_get_suppliers_plan(self):
+        with capture_queries(self.env.cr) as queries:
+            self.Supplier.search(self.Supplier._get_api_domain(), limit=100)
+        self.assertPlanUsesIndex(queries, 'material_supplier', ['material_supplier_name_index'])
+
+    def test_supplier_name_search_plan(self):
+        with capture_queries(self.env.cr) as queries:
+            self.Supplier.name_search('Supplier 0004242')
+        self.assertPlanUsesIndex(queries, 'material_supplier', [
+            'material_supplier_name_search_trgm_idx', 'material_supplier_email_search_trgm_idx',
+            'material_supplier_name_index',
+        ])
+
+    def test_supplier_unique_name_plan(self):
+        supplier = self.Supplier.search([('name', '=', 'PLAN Supplier 0004242')])
+        supplier.read(['name'])
+        with capture_queries(self.env.cr) as queries:
+            supplier._check_unique_name()
+        self.assertPlanUsesIndex(queries, 'material_supplier', ['material_supplier_name_index'])
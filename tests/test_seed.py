@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+
+import random
+
+from odoo.tests.common import TransactionCase
+
+from ..cli.seed import parse_weights, price_sampler, seed_dataset
+from ..models.material import equivalence_key
+
+
+class TestSeed(TransactionCase):
+    """Test cases for the bulk seed command."""
+
+    def test_parse_weights(self):
+        self.assertEqual(parse_weights('fabric=3,cotton=1', ('fabric', 'jeans', 'cotton')), [3.0, 0.0, 1.0])
+        with self.assertRaises(ValueError):
+            parse_weights('silk=1', ('fabric', 'jeans', 'cotton'))
+
+    def test_price_sampler_respects_minimum(self):
+        draw = price_sampler('uniform:0:150', random.Random(1))
+        self.assertTrue(all(draw() >= 100 for _i in range(100)))
+
+    def test_seed_dataset(self):
+        result = seed_dataset(self.env, 5, 50, prefix='TSEED', seed=1)
+        self.assertEqual(result['suppliers'], 5)
+        self.assertEqual(result['materials'], 50)
+
+        suppliers = self.env['material.supplier'].search([('name', '=like', 'TSEED Supplier %')])
+        materials = self.env['material.registration'].search([('material_code', '=like', 'TSEED-%')])
+        self.assertEqual(len(suppliers), 5)
+        self.assertEqual(len(materials), 50)
+        self.assertEqual(sum(suppliers.mapped('material_count')), 50)
+        for material in materials:
+            self.assertEqual(material.supplier_name, material.supplier_id.name)
+            self.assertEqual(material.price_band_id,
+                             self.env['material.price.band']._find_band(material.material_buy_price))
+            self.assertEqual(material.equivalence_key,
+                             equivalence_key(material.material_name, material.material_type))
+        for supplier in suppliers.filtered('material_ids'):
+            self.assertEqual(supplier.material_price_min, min(supplier.material_ids.mapped('material_buy_price')))
+
+    def test_seed_dataset_rejects_reused_prefix(self):
+        seed_dataset(self.env, 1, 1, prefix='TSEED2', seed=1)
+        with self.assertRaises(ValueError):
+            seed_dataset(self.env, 1, 1, prefix='TSEED2', seed=1)
+
+    def test_seed_dataset_rejects_reused_supplier_prefix(self):
+        self.env['material.supplier'].create({'name': 'TSEED3 Supplier Manual'})
+        with self.assertRaisesRegex(ValueError, 'Suppliers with prefix "TSEED3"'):
+            seed_dataset(self.env, 1, 1, prefix='TSEED3', seed=1)
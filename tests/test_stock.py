@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+
+import json
+
+from odoo.tests.common import HttpCase, TransactionCase
+from odoo.exceptions import ValidationError
+
+
+class TestStockLedger(TransactionCase):
+    """Test cases for the material stock ledger."""
+
+    def setUp(self):
+        """Set up test data."""
+        super(TestStockLedger, self).setUp()
+        self.Move = self.env['material.stock.move']
+        self.Snapshot = self.env['material.stock.snapshot']
+        supplier = self.env['material.supplier'].create({'name': 'Stock Supplier'})
+        self.fabric, self.jeans = self.env['material.registration'].create([{
+            'material_code': code,
+            'material_name': f'Stock Material {code}',
+            'material_type': material_type,
+            'material_buy_price': 150.0,
+            'supplier_id': supplier.id,
+        } for code, material_type in (('STK001', 'fabric'), ('STK002', 'jeans'))])
+
+    def test_post_moves_and_balances(self):
+        move_ids = self.Move.post_moves([
+            {'material_code': 'STK001', 'quantity': 10.0, 'reference': 'SCAN-1'},
+            {'material_id': self.jeans.id, 'quantity': 4.0},
+            {'material_code': 'STK001', 'quantity': -3.0},
+        ])
+        self.assertEqual(len(move_ids), 3)
+        self.assertEqual(self.Move.browse(move_ids[0]).reference, 'SCAN-1')
+        self.assertEqual(self.Move.get_balances([self.fabric.id, self.jeans.id]),
+                         {self.fabric.id: 7.0, self.jeans.id: 4.0})
+        self.assertEqual(self.fabric.stock_balance, 7.0)
+
+    def test_post_moves_validation(self):
+        with self.assertRaises(ValidationError):
+            self.Move.post_moves([{'material_code': 'STK001', 'quantity': 1.0},
+                                  {'material_code': 'NOPE', 'quantity': 1.0}])
+        with self.assertRaises(ValidationError):
+            self.Move.post_moves([{'material_id': self.fabric.id, 'quantity': 0}])
+        self.assertEqual(self.Move.get_balances([self.fabric.id]), {self.fabric.id: 0.0})
+
+    def test_moves_are_append_only(self):
+        move = self.Move.browse(self.Move.post_moves([{'material_id': self.fabric.id, 'quantity': 5.0}]))
+        with self.assertRaises(ValidationError):
+            move.write({'quantity': 50.0})
+        with self.assertRaises(ValidationError):
+            move.unlink()
+
+    def test_snapshots(self):
+        self.Move.post_moves([{'material_id': self.fabric.id, 'quantity': 10.0},
+                              {'material_id': self.jeans.id, 'quantity': 2.0}])
+        self.assertEqual(self.Snapshot._take_snapshots(), 2)
+        # Nothing new since the last run
+        self.assertEqual(self.Snapshot._take_snapshots(), 0)
+
+        self.Move.post_moves([{'material_id': self.fabric.id, 'quantity': -4.0}])
+        self.assertEqual(self.Move.get_balances([self.fabric.id, self.jeans.id]),
+                         {self.fabric.id: 6.0, self.jeans.id: 2.0})
+
+        # Only the material with new moves gets a new snapshot
+        self.assertEqual(self.Snapshot._take_snapshots(), 1)
+        latest = self.Snapshot.search([('material_id', '=', self.fabric.id)], limit=1)
+        self.assertEqual(latest.balance, 6.0)
+        self.assertEqual(self.Move.get_balances([self.fabric.id, self.jeans.id]),
+                         {self.fabric.id: 6.0, self.jeans.id: 2.0})
+
+    def test_snapshots_skip_when_moves_are_busy(self):
+        self.Move.post_moves([{'material_id': self.fabric.id, 'quantity': 10.0}])
+        self.env['base'].flush()
+        # Another transaction is posting moves: the run gives up instead of queueing
+        with self.registry.cursor() as cr:
+            cr.execute("LOCK TABLE material_stock_move IN ROW EXCLUSIVE MODE")
+            self.assertEqual(self.Snapshot._take_snapshots(), 0)
+            cr.rollback()
+        self.assertEqual(self.Snapshot._take_snapshots(), 1)
+
+
+class TestStockApi(HttpCase):
+    """Test cases for the stock ledger endpoints."""
+
+    def test_post_moves_endpoint(self):
+        supplier = self.env['material.supplier'].create({'name': 'Stock API Supplier'})
+        material = self.env['material.registration'].create({
+            'material_code': 'STKAPI',
+            'material_name': 'Stock API Material',
+            'material_type': 'cotton',
+            'material_buy_price': 150.0,
+            'supplier_id': supplier.id,
+        })
+        self.env['base'].flush()
+        self.authenticate('admin', 'admin')
+        headers = {'Content-Type': 'application/json'}
+
+        body = {'moves': [{'material_code': 'STKAPI', 'quantity': 12, 'reference': 'SCAN-API'},
+                          {'material_id': material.id, 'quantity': -2}]}
+        response = self.url_open('/api/stock/moves', data=json.dumps(body), headers=headers)
+        self.assertEqual(response.status_code, 200, response.text)
+        move_ids = response.json()['data']['ids']
+        self.assertEqual(len(move_ids), 2)
+        self.assertEqual(sum(self.env['material.stock.move'].browse(move_ids).mapped('quantity')), 10.0)
+
+        body = {'moves': [{'material_code': 'STKAPI', 'quantity': 1}, {'material_code': 'NOPE', 'quantity': 1}]}
+        response = self.url_open('/api/stock/moves', data=json.dumps(body), headers=headers)
+        self.assertEqual(response.status_code, 400, response.text)
+        self.assertFalse(response.json()['success'])
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+import json
+
+from odoo.tests.common import TransactionCase
+
+from .common import capture_queries
+from ..controllers.common import MAX_IDS_PER_REQUEST, parse_ids
+from ..controllers.stream import EventStream, RESYNC, Subscriber
+from ..models.outbox import STREAM_CHANNEL
+
+
+class TestChangeStream(TransactionCase):
+    """Test cases for the change notifications behind /api/stream."""
+
+    def setUp(self):
+        """Set up test data."""
+        super(TestChangeStream, self).setUp()
+        self.supplier = self.env['material.supplier'].create({'name': 'Stream Supplier'})
+        self.other_supplier = self.env['material.supplier'].create({'name': 'Other Stream Supplier'})
+
+    def _notifications(self, queries):
+        return [
+            json.loads(payload)
+            for query, params in queries if 'pg_notify' in query and params[0] == STREAM_CHANNEL
+            for payload in params[1]
+        ]
+
+    def test_changes_are_notified(self):
+        with capture_queries(self.env.cr) as queries:
+            material = self.env['material.registration'].create({
+                'material_code': 'STR001',
+                'material_name': 'Stream Material',
+                'material_type': 'fabric',
+                'material_buy_price': 150.0,
+                'supplier_id': self.supplier.id,
+            })
+            material.write({'supplier_id': self.other_supplier.id})
+            material.unlink()
+
+        notifications = [n for n in self._notifications(queries) if n['model'] == 'material.registration']
+        self.assertEqual([n['event'] for n in notifications], ['created', 'updated', 'deleted'])
+        created, updated, deleted = notifications
+        self.assertEqual(created['records'], [[material.id, self.supplier.id, 'fabric']])
+        # Moving a material is announced to the old and the new supplier
+        self.assertEqual(updated['records'], [[material.id, self.other_supplier.id, 'fabric'],
+                                              [material.id, self.supplier.id, 'fabric']])
+        self.assertEqual(deleted['records'], [[material.id, self.other_supplier.id, 'fabric']])
+
+    def test_subscriber_filters(self):
+        message = {'model': 'material.registration', 'event': 'updated', 'records': [
+            [1, self.supplier.id, 'fabric'], [2, self.other_supplier.id, 'jeans'], [3, self.supplier.id, 'jeans'],
+        ]}
+        self.assertEqual(Subscriber('db').match(message), [1, 2, 3])
+        self.assertEqual(Subscriber('db', supplier_ids=[self.supplier.id]).match(message), [1, 3])
+        self.assertEqual(Subscriber('db', material_type='jeans').match(message), [2, 3])
+        self.assertEqual(Subscriber('db', [self.supplier.id], 'jeans').match(message), [3])
+        supplier_message = {'model': 'material.supplier', 'event': 'created',
+                            'records': [[self.supplier.id, self.supplier.id, None]]}
+        self.assertEqual(Subscriber('db', material_type='fabric').match(supplier_message), [])
+
+    def test_supplier_filter_parsing(self):
+        ids = f'{self.supplier.id},{self.other_supplier.id},{self.supplier.id}'
+        self.assertEqual(parse_ids(ids, name='supplier_id'), [self.supplier.id, self.other_supplier.id])
+        with self.assertRaisesRegex(ValueError, 'supplier_id must be'):
+            parse_ids('1,x', name='supplier_id')
+        with self.assertRaisesRegex(ValueError, f'At most {MAX_IDS_PER_REQUEST} supplier_id'):
+            parse_ids(','.join(['1'] * (MAX_IDS_PER_REQUEST + 1)), name='supplier_id')
+
+    def test_event_stream(self):
+        subscriber = Subscriber('db', material_type='fabric')
+        subscriber.push({'model': 'material.registration', 'event': 'created', 'records': [[5, 1, 'jeans']]})
+        subscriber.push({'model': 'material.registration', 'event': 'created', 'records': [[6, 1, 'fabric']]})
+        subscriber.push(RESYNC)
+        stream = iter(EventStream(subscriber, heartbeat=0.01))
+        self.assertEqual(next(stream), 'retry: 10\n\n')
+        self.assertEqual(next(stream), 'event: change\ndata: {"model": "material.registration", '
+                                       '"event": "created", "ids": [6]}\n\n')
+        self.assertEqual(next(stream), 'event: resync\ndata: {}\n\n')
+        self.assertEqual(next(stream), ': heartbeat\n\n')
@@ -1,7 +1,11 @@
 # -*- coding: utf-8 -*-
 
 import json
-from odoo.tests.common import HttpCase
+from unittest.mock import patch
+
+from odoo.tests.common import HOST, PORT, HttpCase
+
+from ..controllers.concurrency import etag_for
 
 
 class TestSupplierController(HttpCase):
@@ -16,4 +20,98 @@ class TestSupplierController(HttpCase):
         # Authenticate user
         self.authenticate('admin', 'admin')
 
-    # Semua test dihapus karena tidak relevan dengan kebutuhan client. 
\ No newline at end of file
+    # Semua test dihapus karena tidak relevan dengan kebutuhan client. 
+
+    def test_delete_checks_materials_once(self):
+        Supplier = self.env['material.supplier']
+        blocked = Supplier.create({'name': 'Blocked Supplier'})
+        free = Supplier.create({'name': 'Free Supplier'})
+        self.env['material.registration'].create({
+            'material_code': 'DEL001',
+            'material_name': 'Blocking Material',
+            'material_type': 'fabric',
+            'material_buy_price': 150.0,
+            'supplier_id': blocked.id,
+        })
+        self.env['base'].flush()
+        counts = type(Supplier)._get_blocking_material_counts
+        calls = []
+
+        def counting(suppliers):
+            calls.append(suppliers.ids)
+            return counts(suppliers)
+
+        url = f'http://{HOST}:{PORT}/api/suppliers'
+        with patch.object(type(Supplier), '_get_blocking_material_counts', counting):
+            response = self.opener.delete(f'{url}?ids={blocked.id},{free.id}')
+            self.assertEqual(response.status_code, 400, response.text)
+            data = json.loads(response.text)
+            self.assertEqual(data['blocking'], [{'id': blocked.id, 'name': 'Blocked Supplier', 'material_count': 1}])
+            self.assertEqual(len(calls), 1)
+
+            response = self.opener.delete(f'{url}/{blocked.id}')
+            self.assertEqual(response.status_code, 400, response.text)
+            self.assertIn('1 associated materials', json.loads(response.text)['error'])
+            self.assertEqual(len(calls), 2)
+
+            response = self.opener.delete(f'{url}/{free.id}')
+            self.assertEqual(response.status_code, 200, response.text)
+            self.assertEqual(len(calls), 3)
+        self.assertFalse(free.exists())
+
+    def test_query_suppliers(self):
+        supplier = self.env['material.supplier'].create({'name': 'Query Supplier', 'email': 'query@supplier.com'})
+        self.env['material.registration'].create([{
+            'material_code': f'QRY00{i}',
+            'material_name': f'Query Material {i}',
+            'material_type': 'fabric',
+            'material_buy_price': price,
+            'supplier_id': supplier.id,
+        } for i, price in enumerate([150.0, 5000.0])])
+        self.env['base'].flush()
+
+        url = '/api/suppliers/query'
+        headers = {'Content-Type': 'application/json'}
+        body = {
+            'ids': [supplier.id],
+            'fields': ['name', 'material_count'],
+            'materials': {'fields': ['material_code'], 'order': 'material_buy_price desc'},
+        }
+        response = self.url_open(url, data=json.dumps(body), headers=headers)
+        self.assertEqual(response.status_code, 200, response.text)
+        data = response.json()['data']
+        self.assertEqual([(s['name'], s['material_count']) for s in data], [('Query Supplier', 2)])
+        self.assertEqual([m['material_code'] for m in data[0]['materials']], ['QRY001', 'QRY000'])
+
+        body['materials']['price_category'] = 'unknown'
+        response = self.url_open(url, data=json.dumps(body), headers=headers)
+        self.assertEqual(response.status_code, 400, response.text)
+        self.assertFalse(response.json()['success'])
+
+    def test_conditional_update(self):
+        supplier = self.env['material.supplier'].create({'name': 'Update Supplier', 'email': 'update@supplier.com'})
+        self.env['base'].flush()
+        url = f'http://{HOST}:{PORT}/api/suppliers/{supplier.id}'
+
+        response = self.opener.put(url, json={'phone': '+1-555-0199'},
+                                   headers={'If-Match': '"2000-01-01T00:00:00.000000"'})
+        self.assertEqual(response.status_code, 412, response.text)
+
+        response = self.opener.put(url, json={'phone': '+1-555-0199'},
+                                   headers={'If-Match': etag_for(supplier), 'Prefer': 'return=minimal'})
+        self.assertEqual(response.status_code, 200, response.text)
+        supplier.invalidate_cache()
+        self.assertEqual(supplier.phone, '+1-555-0199')
+        self.assertEqual(response.json()['data'], {'id': supplier.id, 'version': supplier.get_version()})
+        self.assertEqual(response.headers['ETag'], etag_for(supplier))
+
+    def test_create_supplier(self):
+        headers = {'Content-Type': 'application/json'}
+        response = self.url_open('/api/suppliers', data=json.dumps({'name': 'Created Supplier'}), headers=headers)
+        self.assertEqual(response.status_code, 200, response.text)
+        data = response.json()['data']
+        self.assertEqual(self.env['material.supplier'].browse(data['id']).name, 'Created Supplier')
+
+        response = self.url_open('/api/suppliers', data=json.dumps({'email': 'nameless@supplier.com'}),
+                                 headers=headers)
+        self.assertEqual(response.status_code, 400, response.text)
@@ -105,6 +105,34 @@ class TestSupplierModel(TransactionCase):
         with self.assertRaises(ValidationError):
             supplier.unlink()
 
+    def test_supplier_bulk_delete_reports_all_blockers(self):
+        """Test that bulk deletion reports every supplier that has materials."""
+        Material = self.env['material.registration']
+        blocked1 = self.Supplier.create({'name': 'Blocked Supplier One'})
+        blocked2 = self.Supplier.create({'name': 'Blocked Supplier Two'})
+        free = self.Supplier.create({'name': 'Free Supplier'})
+        for code, supplier in [('BLK001', blocked1), ('BLK002', blocked2), ('BLK003', blocked2)]:
+            Material.create({
+                'material_code': code,
+                'material_name': 'Blocking Material',
+                'material_type': 'fabric',
+                'material_buy_price': 150.0,
+                'supplier_id': supplier.id
+            })
+
+        suppliers = blocked1 | blocked2 | free
+        self.assertEqual(suppliers._get_blocking_material_counts(), {blocked1.id: 1, blocked2.id: 2})
+
+        with self.assertRaises(ValidationError) as cm:
+            suppliers.unlink()
+        self.assertIn('Blocked Supplier One', str(cm.exception))
+        self.assertIn('Blocked Supplier Two', str(cm.exception))
+        self.assertEqual(cm.exception.blocking, {blocked1.id: 1, blocked2.id: 2})
+
+        # Suppliers without materials can still be deleted in bulk
+        free.unlink()
+        self.assertFalse(free.exists())
+
     def test_supplier_delete_without_materials(self):
         """Test that supplier can be deleted if it has no materials."""
         supplier = self.Supplier.create({'name': 'Deletable Supplier'})
@@ -168,4 +196,134 @@ class TestSupplierModel(TransactionCase):
         
         # Try to update supplier2 to have same name as supplier1
         with self.assertRaises(ValidationError):
-            supplier2.write({'name': 'First Supplier'}) 
\ No newline at end of file
+            supplier2.write({'name': 'First Supplier'})
+
+    def test_get_supplier_summaries(self):
+        """Test fetching several suppliers with their materials in input order."""
+        supplier1 = self.Supplier.create({'name': 'Multi Supplier 1'})
+        supplier2 = self.Supplier.create({'name': 'Multi Supplier 2'})
+        self.env['material.registration'].create({
+            'material_code': 'MSUP001',
+            'material_name': 'Multi Supplier Material',
+            'material_type': 'cotton',
+            'material_buy_price': 150.0,
+            'supplier_id': supplier2.id
+        })
+        missing_id = supplier2.id + 1000
+
+        summaries, missing_ids = self.Supplier.get_supplier_summaries([supplier2.id, supplier1.id, missing_id])
+
+        self.assertEqual([s['id'] for s in summaries], [supplier2.id, supplier1.id])
+        self.assertEqual(missing_ids, [missing_id])
+        self.assertEqual(summaries[0]['material_count'], 1)
+        self.assertEqual(summaries[0]['materials'][0]['material_code'], 'MSUP001')
+        self.assertEqual(summaries[1]['materials'], [])
+
+    def test_read_with_materials(self):
+        """Test nested reads limit and sort the materials of each supplier."""
+        supplier1 = self.Supplier.create({'name': 'Nested Supplier 1'})
+        supplier2 = self.Supplier.create({'name': 'Nested Supplier 2'})
+        supplier3 = self.Supplier.create({'name': 'Nested Supplier 3'})
+        self.env['material.registration'].create([{
+            'material_code': f'NEST{supplier.id}-{i}',
+            'material_name': f'Nested Material {i}',
+            'material_type': 'jeans' if i % 2 else 'fabric',
+            'material_buy_price': 100.0 + 10 * i,
+            'supplier_id': supplier.id,
+        } for supplier in (supplier1, supplier2) for i in range(4)])
+
+        rows = self.Supplier.read_with_materials(
+            [('name', 'like', 'Nested Supplier')], ['name'], ['material_code', 'material_buy_price'], 2,
+            material_order='material_buy_price desc', order='name',
+        )
+
+        self.assertEqual([row['name'] for row in rows], ['Nested Supplier 1', 'Nested Supplier 2', 'Nested Supplier 3'])
+        self.assertEqual([m['material_buy_price'] for m in rows[0]['materials']], [130.0, 120.0])
+        self.assertEqual([m['material_code'] for m in rows[1]['materials']],
+                         [f'NEST{supplier2.id}-3', f'NEST{supplier2.id}-2'])
+        self.assertEqual(rows[2]['materials'], [])
+
+        jeans = self.Supplier.read_with_materials(
+            [('id', '=', supplier1.id)], ['name'], ['material_type'], 10,
+            material_domain=[('material_type', '=', 'jeans')],
+        )
+        self.assertEqual([m['material_type'] for m in jeans[0]['materials']], ['jeans', 'jeans'])
+
+    def test_supplier_price_aggregates(self):
+        """Test price aggregates follow material create, reprice, reassign and delete."""
+        Material = self.env['material.registration']
+        supplier = self.Supplier.create({'name': 'Aggregate Supplier'})
+        other = self.Supplier.create({'name': 'Other Aggregate Supplier'})
+        cheap = Material.create({
+            'material_code': 'AGG001',
+            'material_name': 'Cheap Material',
+            'material_type': 'fabric',
+            'material_buy_price': 100.0,
+            'supplier_id': supplier.id
+        })
+        Material.create({
+            'material_code': 'AGG002',
+            'material_name': 'Expensive Material',
+            'material_type': 'jeans',
+            'material_buy_price': 300.0,
+            'supplier_id': supplier.id
+        })
+        self.assertEqual(supplier.material_price_min, 100.0)
+        self.assertEqual(supplier.material_price_max, 300.0)
+        self.assertEqual(supplier.material_price_avg, 200.0)
+        self.assertEqual((supplier.fabric_count, supplier.jeans_count, supplier.cotton_count), (1, 1, 0))
+
+        cheap.write({'material_buy_price': 500.0})
+        self.assertEqual(supplier.material_price_min, 300.0)
+        self.assertEqual(supplier.material_price_max, 500.0)
+
+        cheap.write({'supplier_id': other.id})
+        self.assertEqual(supplier.material_price_avg, 300.0)
+        self.assertEqual(supplier.fabric_count, 0)
+        self.assertEqual(other.material_price_avg, 500.0)
+        self.assertEqual(other.fabric_count, 1)
+
+        cheap.unlink()
+        self.assertEqual(other.material_price_avg, 0.0)
+        self.assertEqual(other.fabric_count, 0)
+
+    def test_rebuild_price_aggregates(self):
+        """Test the full SQL rebuild repairs drifted aggregates."""
+        supplier = self.Supplier.create({'name': 'Rebuild Supplier'})
+        self.env['material.registration'].create({
+            'material_code': 'RBD001',
+            'material_name': 'Rebuild Material',
+            'material_type': 'cotton',
+            'material_buy_price': 400.0,
+            'supplier_id': supplier.id
+        })
+        self.Supplier.flush()
+        self.env.cr.execute(
+            "UPDATE material_supplier SET material_price_avg = 0, cotton_count = 0 WHERE id = %s",
+            (supplier.id,))
+        self.Supplier.invalidate_cache()
+
+        self.Supplier._rebuild_price_aggregates()
+
+        self.assertEqual(supplier.material_price_avg, 400.0)
+        self.assertEqual(supplier.cotton_count, 1)
+
+    def test_find_duplicate_suppliers(self):
+        """Test near-duplicate detection by name, email and phone."""
+        original = self.Supplier.create({
+            'name': 'Dup Check Textiles Ltd.',
+            'email': 'sales@dupcheck.com',
+            'phone': '+1-555-0199'
+        })
+        variant = self.Supplier.create({'name': 'Dup Check Textiles Ltd'})
+        same_phone = self.Supplier.create({'name': 'Completely Different Co', 'phone': '+1 555 0199'})
+
+        pairs = self.Supplier.find_duplicate_pairs()
+        pair_ids = {tuple(pair['supplier_ids']): pair for pair in pairs}
+        self.assertIn('name', pair_ids[(original.id, variant.id)]['reasons'])
+        self.assertIn('phone', pair_ids[(original.id, same_phone.id)]['reasons'])
+
+        similar = self.Supplier.find_similar_suppliers('dup check textiles ltd', email='SALES@dupcheck.com')
+        self.assertEqual(similar[0]['id'], original.id)
+        self.assertEqual(sorted(similar[0]['reasons']), ['email', 'name'])
+        self.assertIn(variant.id, [s['id'] for s in similar])